@@ -0,0 +1,142 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import zipfile
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_FIXTURE_PATH = "benchmarking/fixtures/mlb_api.zip"
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class FixtureStore:
+    """
+    Recorded MLB API responses, stored in a single deflate-compressed zip: an index.json that maps
+    every request (path + query parameters) to its status code, and one body file per request.
+    Bodies are read lazily, so opening a store with a full box score history stays cheap.
+    """
+
+    def __init__(self, path=DEFAULT_FIXTURE_PATH):
+        self.path = path
+        self.index = {}
+        self.new_bodies = {}
+        self.lock = threading.Lock()
+        self.archive = None
+
+        if os.path.exists(path):
+            self.archive = zipfile.ZipFile(path, "r")
+            self.index = json.loads(self.archive.read("index.json"))
+            logger.debug(f"Loaded {len(self.index)} recorded responses from {path}")
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, request):
+        path, params = request
+        return fixtureKey(path, params) in self.index
+
+    def get(self, path, params=None):
+        """
+        :param path: Request path relative to the API root (e.g. "schedule", "game/1234/boxscore")
+        :param params: Query parameters
+        :returns: Tuple of (status code, body bytes), or None if the request was never recorded
+        """
+        key = fixtureKey(path, params)
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+
+        with self.lock:
+            body = self.new_bodies.get(key)
+            if body is None:
+                body = self.archive.read(f"bodies/{key}.json")
+        return entry["status"], body
+
+    def put(self, path, params, status, body):
+        key = fixtureKey(path, params)
+        with self.lock:
+            self.index[key] = {"path": normalizePath(path), "params": normalizeParams(params), "status": status}
+            self.new_bodies[key] = body
+
+    def entries(self):
+        # (path, params) of every recorded request
+        return [(entry["path"], entry["params"]) for entry in self.index.values()]
+
+    def save(self):
+        """
+        Writes the store back to disk, keeping every previously recorded body.
+
+        :returns: None
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp"
+
+        with self.lock, zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for key in self.index:
+                body = self.new_bodies.get(key)
+                if body is None:
+                    body = self.archive.read(f"bodies/{key}.json")
+                archive.writestr(f"bodies/{key}.json", body)
+            archive.writestr("index.json", json.dumps(self.index))
+
+        if self.archive is not None:
+            self.archive.close()
+        os.replace(temp_path, self.path)
+
+        self.archive = zipfile.ZipFile(self.path, "r")
+        self.new_bodies = {}
+        logger.debug(f"Saved {len(self.index)} recorded responses to {self.path}")
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def normalizePath(path):
+    # "/api/v1/schedule" and "schedule" are the same request
+    path = path.split("?", 1)[0].strip("/")
+    if path.startswith("api/v1/"):
+        path = path[len("api/v1/"):]
+    return path
+
+def normalizeParams(params):
+    # parse_qs gives lists, requests gives scalars, both are stored as sorted scalar strings
+    normalized = {}
+    for name, value in (params or {}).items():
+        if isinstance(value, (list, tuple)):
+            value = value[0] if len(value) == 1 else ",".join(str(v) for v in value)
+        normalized[name] = str(value)
+    return dict(sorted(normalized.items()))
+
+def fixtureKey(path, params=None):
+    query = urlencode(normalizeParams(params))
+    return hashlib.sha1(f"{normalizePath(path)}?{query}".encode("utf-8")).hexdigest()
+
+def trimBoxScorePayload(body):
+    """
+    Drops the player level data from a recorded box score, the pipeline only reads team stats
+    and it is most of the payload.
+
+    :param body: Raw box score response body
+    :returns: Trimmed body bytes
+    """
+    data = json.loads(body)
+    for side in ("home", "away"):
+        team = data.get("teams", {}).get(side, {})
+        for key in list(team.keys()):
+            if key not in ("team", "teamStats"):
+                del team[key]
+    return json.dumps({"teams": data.get("teams", {})}, separators=(",", ":")).encode("utf-8")
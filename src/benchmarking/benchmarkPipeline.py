@@ -0,0 +1,425 @@
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import argparse
+import platform
+import tempfile
+import contextlib
+import multiprocessing
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_BASELINE_PATH = "benchmarking/baseline.json"
+DEFAULT_REPORT_PATH = "benchmarking/reports/latest.json"
+
+DEFAULT_SEASONS = ["2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024"]
+DEFAULT_DATASET_SIZES = [1, 5, 10]
+DEFAULT_REPEATS = 3
+
+# pipeline stages in the order main() runs them, plus the evaluator. The last season plays the current
+# season for current_schedule and daily_prediction, its games are already in OldGames and FeatureStore
+STAGES = ["teams", "schedule", "current_schedule", "features", "evaluation", "daily_prediction"]
+
+# stages that return None when they caught an error, and the table each one must leave rows in
+STAGES_RETURNING_NONE_ON_ERROR = ("schedule", "current_schedule", "features")
+STAGE_TABLES = {
+    "teams": "Teams",
+    "schedule": "OldGames",
+    "current_schedule": "CurrentSchedule",
+    "features": "FeatureStore",
+}
+
+# the model's feature columns, the daily prediction stage reads the same ones without the model
+FEATURE_NAMES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "modelDevelopment", "training", "model_files", "feature_names_diff.pkl")
+
+# how much worse than the baseline a metric may get before the run fails (0.25 = 25% slower)
+REGRESSION_THRESHOLDS = {
+    "wall_time_s": 0.25,
+    "peak_rss_mb": 0.20,
+    "sqlite_statements": 0.10,
+    "http_calls": 0.0,
+}
+
+# timings this short are mostly noise, they never fail the run
+MIN_WALL_TIME_S = 0.05
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def countSQLiteStatements():
+    """
+    Wraps sqlite3.connect so every connection opened afterwards (in this process) counts the
+    statements it runs. The pipeline opens its own connections, so this is the only place to hook in.
+
+    :returns: Single element list holding the running count
+    """
+    counter = [0]
+    connect = sqlite3.connect
+
+    def countingConnect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(lambda statement: counter.__setitem__(0, counter[0] + 1))
+        return conn
+
+    sqlite3.connect = countingConnect
+    return counter
+
+def captureErrorLogs():
+    """
+    Keeps the pipeline's logging quiet except for errors, which are collected. The stages catch
+    their own exceptions and only log them, so this is how a broken stage fails the benchmark
+    instead of showing up as a very fast run.
+
+    :returns: List the error messages are appended to
+    """
+    errors = []
+    handler = logging.Handler(logging.ERROR)
+    handler.emit = lambda record: errors.append(f"logged error in {record.name}: {record.getMessage()}")
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.ERROR)
+    return errors
+
+def peakRSSMegabytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+def runStage(stage, workdir, fixtures_path, seasons, replay_options):
+    """
+    Runs one pipeline stage against the replay server and measures it. Called in a fresh process
+    per stage so peak RSS and the statement count belong to that stage only.
+
+    :returns: Dictionary of metrics
+    """
+    os.chdir(workdir)
+    errors = captureErrorLogs()
+    statements = countSQLiteStatements()
+
+    from benchmarking.apiFixtures import FixtureStore
+    from benchmarking.replayServer import ReplayServer
+
+    server = ReplayServer(FixtureStore(fixtures_path), **replay_options).start()
+    run = stageFunction(stage, server.base_url, seasons)
+    extra = {}
+
+    # the pipeline prints progress for every game, keep it out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        try:
+            result = run()
+        except Exception as e:
+            # reported with the stage's other failures, the later stages still run and fail on their own
+            errors.append(f"raised {e!r}"[:500])
+            result = None
+        wall_time = time.perf_counter() - start
+
+    if stage in ("evaluation", "daily_prediction"):
+        extra["games"] = result
+
+    server.stop()
+
+    metrics = {
+        "wall_time_s": round(wall_time, 4),
+        "peak_rss_mb": round(peakRSSMegabytes(), 1) if resource is not None else None,
+        "sqlite_statements": statements[0],
+        "http_calls": sum(count for endpoint, count in server.counts.items() if endpoint not in ("misses", "injected_errors")),
+        "http_misses": server.counts["misses"],
+        **extra
+    }
+    metrics["failures"] = stageFailures(stage, result, metrics, errors)
+    return metrics
+
+def stageFailures(stage, result, metrics, errors):
+    """
+    Checks that a stage actually did its work: nothing logged as an error, every request answered
+    from the fixtures, a result and rows in the table it fills.
+
+    :returns: List of human readable failures, empty if the stage succeeded
+    """
+    from database.connection import connect
+
+    failures = list(errors)
+
+    if metrics["http_misses"]:
+        failures.append(f"{metrics['http_misses']} requests were missing from the fixtures")
+
+    if stage in STAGES_RETURNING_NONE_ON_ERROR and result is None:
+        failures.append("returned None")
+
+    if stage in ("evaluation", "daily_prediction") and not result:
+        failures.append("evaluated no games")
+
+    table = STAGE_TABLES.get(stage)
+    if table is not None:
+        conn = connect(readonly=True)
+        try:
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        except sqlite3.OperationalError:
+            row_count = 0
+        finally:
+            conn.close()
+        if row_count == 0:
+            failures.append(f"left no rows in {table}")
+
+    return failures
+
+def stageFunction(stage, base_url, seasons):
+    """
+    Imports the stage up front so module import time isn't part of its timing.
+
+    :returns: Callable running the stage
+    """
+    if stage == "teams":
+        from teamsInitializer.initializeTeams import fetchMLBTeams
+        return lambda: fetchMLBTeams(base_url)
+
+    if stage == "schedule":
+        from scheduleUpdater.fetchOldSeasons import fetchAndUpdateOldSeasons
+        return lambda: fetchAndUpdateOldSeasons(seasons, base_url)
+
+    if stage == "current_schedule":
+        from scheduleUpdater.fetchCurrentSchedule import fetchAndUpdateCurrentSchedule
+        return lambda: fetchAndUpdateCurrentSchedule(seasons[-1], base_url, full_refresh=True)
+
+    if stage == "features":
+        from featureEngineering.createFeatures import engineerFeatures
+        return lambda: engineerFeatures(rolling_window_size=5, base_url=base_url, seasons=seasons)
+
+    if stage == "evaluation":
+        import modelDevelopment.utils.featureCache, modelDevelopment.evaluating.backtest  # noqa: F401
+        return runEvaluationStage
+
+    if stage == "daily_prediction":
+        import dailyPrediction.computeDailyPredictions  # noqa: F401
+        return runDailyPredictionStage
+
+    raise ValueError(f"Unknown stage {stage}")
+
+def runEvaluationStage():
+    """
+    The evaluator without a trained model: builds the cached feature matrix from FeatureStore and
+    backtests seeded pseudo probabilities over every game, so it scales with the dataset like
+    calculateTotalProfit does.
+
+    :returns: Number of games evaluated
+    """
+    import numpy as np
+    from scheduleUpdater.fetchCurrentSchedule import createCurrentScheduleTable
+    from modelDevelopment.utils.featureCache import loadFeatureMatrix
+    from modelDevelopment.evaluating.backtest import runBacktest
+    from database.connection import connect
+
+    conn = connect()
+    try:
+        # the feature cache joins CurrentSchedule for game dates
+        createCurrentScheduleTable(conn.cursor())
+        feature_matrix = loadFeatureMatrix(conn, "diff", cache_dir="databases/feature_cache")
+    finally:
+        conn.close()
+
+    num_games = len(feature_matrix.game_ids)
+    rng = np.random.default_rng(0)
+    home_proba = rng.uniform(0.3, 0.7, num_games)
+    home_odds = np.where(rng.random(num_games) < 0.5, -1, 1) * rng.integers(100, 250, num_games)
+    away_odds = np.where(home_odds < 0, 1, -1) * rng.integers(100, 250, num_games)
+
+    runBacktest(home_proba, 1 - home_proba, home_odds, away_odds, feature_matrix.labels.astype(bool))
+    return num_games
+
+def runDailyPredictionStage():
+    """
+    The daily predictions without the model or the odds prompts: every game day of the current
+    schedule is read the way computeDailyPredictions reads today, and a bet is sized for every
+    game from seeded pseudo probabilities and odds.
+
+    :returns: Number of games predicted
+    """
+    import pickle
+    import numpy as np
+    from dailyPrediction.computeDailyPredictions import loadDailyGames
+    from odds.calculateUnitSize import calculateUnitSize
+    from database.connection import sharedConnection, closeSharedConnections
+
+    with open(FEATURE_NAMES_PATH, "rb") as f:
+        feature_names = pickle.load(f)
+
+    rng = np.random.default_rng(0)
+    conn = sharedConnection(readonly=True)
+    num_games = 0
+    try:
+        game_days = [row[0] for row in conn.execute("SELECT DISTINCT local_game_date FROM CurrentSchedule ORDER BY local_game_date")]
+        for game_day in game_days:
+            game_info, X_features = loadDailyGames(conn, game_day, feature_names)
+            for _ in range(len(X_features)):
+                home_proba = rng.uniform(0.3, 0.7)
+                calculateUnitSize(home_proba, 1 - home_proba, f"-{rng.integers(100, 250)}", f"+{rng.integers(100, 250)}")
+            num_games += len(game_info)
+    finally:
+        closeSharedConnections()
+
+    return num_games
+
+def runStageInSubprocess(stage, workdir, fixtures_path, seasons, replay_options):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(runStage, (stage, workdir, fixtures_path, seasons, replay_options))
+
+def runDataset(fixtures_path, seasons, replay_options):
+    """
+    Runs every stage once, in order, in a new working directory with an empty database and HTTP cache.
+
+    :returns: Dictionary mapping stage -> metrics
+    """
+    workdir = tempfile.mkdtemp(prefix=f"mlb_benchmark_{len(seasons)}_")
+    os.makedirs(os.path.join(workdir, "databases"))
+    try:
+        return {stage: runStageInSubprocess(stage, workdir, fixtures_path, seasons, replay_options) for stage in STAGES}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def runBenchmarks(fixtures_path, seasons=DEFAULT_SEASONS, dataset_sizes=DEFAULT_DATASET_SIZES, replay_options=None, repeats=DEFAULT_REPEATS):
+    """
+    Runs every stage for the first N seasons, for each N in dataset_sizes.
+
+    :param fixtures_path: FixtureStore recorded with benchmarking.replayServer (or generated)
+    :param seasons: Seasons available in the fixtures, in order
+    :param dataset_sizes: Numbers of seasons to benchmark
+    :param replay_options: Extra ReplayServer arguments (latency, jitter, error_rate, ...)
+    :param repeats: Runs per dataset size, the fastest one is reported
+    :returns: Report dictionary
+    """
+    fixtures_path = os.path.abspath(fixtures_path)
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "fixtures": fixtures_path,
+        "replay_options": replay_options or {},
+        "repeats": repeats,
+        "failures": [],
+        "datasets": {}
+    }
+
+    for size in dataset_sizes:
+        if size > len(seasons):
+            print(f"Skipping {size} seasons, only {len(seasons)} available")
+            continue
+
+        results = {}
+        for _ in range(repeats):
+            for stage, metrics in runDataset(fixtures_path, seasons[:size], replay_options or {}).items():
+                # a failed stage fails the whole benchmark, whichever repeat it happened in
+                report["failures"].extend(f"{size} seasons / {stage}: {failure}" for failure in metrics.pop("failures"))
+                # keep the fastest run, everything else is deterministic
+                if stage not in results or metrics["wall_time_s"] < results[stage]["wall_time_s"]:
+                    results[stage] = metrics
+
+        for stage, metrics in results.items():
+            print(f"{size:>2} seasons  {stage:<16} {metrics['wall_time_s']:8.3f}s  {metrics['peak_rss_mb'] or 0:7.1f} MB  "
+                  f"{metrics['sqlite_statements']:7} stmts  {metrics['http_calls']:6} http")
+        report["datasets"][str(size)] = results
+
+    return report
+
+def compareToBaseline(report, baseline, thresholds=REGRESSION_THRESHOLDS):
+    """
+    :returns: List of human readable regressions, empty if every metric is within its threshold
+    """
+    regressions = []
+    for size, stages in report["datasets"].items():
+        for stage, metrics in stages.items():
+            baseline_metrics = baseline.get("datasets", {}).get(size, {}).get(stage)
+            if baseline_metrics is None:
+                continue
+
+            for metric, threshold in thresholds.items():
+                current, previous = metrics.get(metric), baseline_metrics.get(metric)
+                if current is None or previous is None:
+                    continue
+                if metric == "wall_time_s" and current < MIN_WALL_TIME_S:
+                    continue
+                if current > previous * (1 + threshold):
+                    regressions.append(f"{size} seasons / {stage}: {metric} {previous} -> {current} (allowed +{threshold:.0%})")
+
+    return regressions
+
+def main(argv=None):
+    """
+    Example, from src/ with fixtures recorded by benchmarking.replayServer:
+
+        python -m benchmarking.benchmarkPipeline --sizes 1 5 10
+        python -m benchmarking.benchmarkPipeline --update-baseline
+    """
+    from benchmarking.apiFixtures import DEFAULT_FIXTURE_PATH
+
+    parser = argparse.ArgumentParser(description="Benchmark the MLB pipeline stages against recorded API fixtures")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_PATH)
+    parser.add_argument("--seasons", nargs="+", default=DEFAULT_SEASONS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_DATASET_SIZES)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--report", default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = runBenchmarks(args.fixtures, args.seasons, args.sizes, {"latency": args.latency}, args.repeats)
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    # a stage that failed tends to be very fast, never let it pass as an improvement or become the baseline
+    if report["failures"]:
+        print("\nSTAGE FAILURES:")
+        for failure in report["failures"]:
+            print(f"  {failure}")
+        return 1
+
+    if args.update_baseline:
+        shutil.copyfile(args.report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNO BASELINE at {args.baseline}, nothing was checked for regressions. "
+              f"Run with --update-baseline on a known good commit to create one")
+        return 1
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+
+    regressions = compareToBaseline(report, baseline)
+    if regressions:
+        print("\nPERFORMANCE REGRESSIONS:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("No regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import requests
+from benchmarking.apiFixtures import FixtureStore, DEFAULT_FIXTURE_PATH, normalizePath, normalizeParams, trimBoxScorePayload
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_UPSTREAM_URL = "https://statsapi.mlb.com/api/v1/"
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class ReplayServer:
+    """
+    Local stand-in for the MLB Stats API. Serves responses from a FixtureStore, optionally with
+    added latency and injected errors, and in record mode forwards every request it hasn't seen
+    to the real API and stores the answer. Point any pipeline stage at base_url to run it offline.
+    """
+
+    def __init__(self, fixtures, upstream_url=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 seed=0, trim_box_scores=True, host="127.0.0.1", port=0):
+        """
+        :param fixtures: FixtureStore to serve from (and record into)
+        :param upstream_url: Real API root to record missing responses from, None to replay only
+        :param latency: Seconds added to every response
+        :param jitter: Extra random latency, uniform between 0 and jitter seconds
+        :param error_rate: Fraction of requests answered with error_status instead of the fixture
+        :param error_status: HTTP status used for injected errors
+        :param seed: Seed of the latency / error random generator, so runs are reproducible
+        :param trim_box_scores: Drop player level data from recorded box scores
+        """
+        self.fixtures = fixtures
+        self.upstream_url = upstream_url
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.trim_box_scores = trim_box_scores
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.session = requests.Session() if upstream_url else None
+
+        # request counts per endpoint ("schedule", "teams", "boxscore", ...) plus misses and errors
+        self.counts = Counter()
+
+        self.server = ThreadingHTTPServer((host, port), self.handlerClass())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.debug(f"Replay server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.upstream_url:
+            self.fixtures.save()
+            self.session.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handlerClass(self):
+        replay = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                status, body = replay.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return ReplayHandler
+
+    def respond(self, raw_path):
+        """
+        :param raw_path: Request path with query string, as received by the HTTP handler
+        :returns: Tuple of (status code, body bytes)
+        """
+        url = urlparse(raw_path)
+        path = normalizePath(url.path)
+        params = normalizeParams(parse_qs(url.query))
+        self.counts[path.rsplit("/", 1)[-1]] += 1
+
+        with self.random_lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            inject_error = self.error_rate and self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        if inject_error:
+            self.counts["injected_errors"] += 1
+            return self.error_status, json.dumps({"message": "injected error"}).encode("utf-8")
+
+        recorded = self.fixtures.get(path, params)
+        if recorded is None and "startDate" in params:
+            recorded = self.windowFromSeasonSchedule(path, params)
+        if recorded is None and self.upstream_url:
+            recorded = self.record(path, params)
+        if recorded is None:
+            self.counts["misses"] += 1
+            logger.debug(f"No recorded response for {path} {params}")
+            return 404, json.dumps({"message": f"no recorded response for {path}"}).encode("utf-8")
+
+        return recorded
+
+    def windowFromSeasonSchedule(self, path, params):
+        # windowed schedule requests depend on the day they're made, so answer them from the
+        # recorded full season schedule instead of requiring a recording for every date
+        season_params = {name: value for name, value in params.items() if name not in ("startDate", "endDate")}
+        recorded = self.fixtures.get(path, season_params)
+        if recorded is None or recorded[0] != 200:
+            return None
+
+        data = json.loads(recorded[1])
+        data["dates"] = [
+            day for day in data.get("dates", [])
+            if params["startDate"] <= day["date"] <= params["endDate"]
+        ]
+        return 200, json.dumps(data).encode("utf-8")
+
+    def record(self, path, params):
+        response = self.session.get(self.upstream_url + path, params=params)
+        body = response.content
+        if self.trim_box_scores and path.endswith("boxscore") and response.status_code == 200:
+            body = trimBoxScorePayload(body)
+
+        self.fixtures.put(path, params, response.status_code, body)
+        self.counts["recorded"] += 1
+        return response.status_code, body
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def main(argv=None):
+    """
+    Runs the replay server from the command line, e.g. from src/:
+
+        python -m benchmarking.replayServer record --fixtures benchmarking/fixtures/mlb_api.zip
+        python -m benchmarking.replayServer replay --latency 0.05 --error-rate 0.01
+
+    then set MLB_API_BASE_URL to the printed URL and run main.py as usual.
+    """
+    parser = argparse.ArgumentParser(description="Local MLB Stats API record / replay server")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_PATH)
+    parser.add_argument("--upstream", default=DEFAULT_UPSTREAM_URL)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = ReplayServer(
+        FixtureStore(args.fixtures),
+        upstream_url=args.upstream if args.mode == "record" else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        port=args.port
+    )
+
+    server.start()
+    print(f"{args.mode} server running at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Requests served: {dict(server.counts)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,566 @@
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from benchmarking.apiFixtures import FixtureStore
+from teamsInitializer.initializeTeams import createTeamsTable, INSERT_INTO_TEAMS
+from scheduleUpdater.fetchOldSeasons import createOldGamesTable
+from scheduleUpdater.fetchCurrentSchedule import createCurrentScheduleTable
+from scheduleUpdater.scheduleUpsert import scheduleGameRows, upsertSchedule
+from featureEngineering.createFeatures import createBoxScoreTable, flattenBoxScore, insertManyIntoBoxScoreTable
+from odds.oddsTable import createOddsTable, INSERT_INTO_ODDS
+from database.connection import connect
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# league wide averages the box scores are drawn around, roughly modern MLB
+RUNS_PER_GAME = 4.5
+HOME_FIELD_ADVANTAGE = 0.04        # log multiplier on the home team's expected runs
+TEAM_STRENGTH_SPREAD = 0.12        # std of a team's log offense / defense multiplier
+SEASON_STRENGTH_DRIFT = 0.06       # std of the season over season change of that multiplier
+BOOKMAKER_MARGIN = 0.045           # vig built into the generated moneylines
+MARKET_NOISE = 0.25                # std of the bookmaker's error on the true log odds
+
+# first game day of every season, with one game per team per day from there
+SEASON_START = (4, 1)
+NIGHT_GAME_TIME = (23, 5)
+DAY_GAME_TIME = (17, 5)
+DAY_GAME_RATE = 0.3
+
+# game ids are season * GAME_IDS_PER_SEASON + index, so they never collide across seasons
+GAME_IDS_PER_SEASON = 1_000_000
+FIRST_TEAM_ID = 1000
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class SyntheticLeague:
+    """
+    Generates statistically plausible seasons for a league of any size: schedules, final scores,
+    team box scores and moneylines, all shaped like the MLB API responses (or the rows built from
+    them), so the real pipeline code can consume them unchanged.
+
+    Every team has an offense and a defense strength that drift from season to season. Scores are
+    Poisson around those strengths, box scores are drawn to be consistent with the score, and the
+    odds are priced off the same strengths with some noise and a bookmaker margin, so a model has
+    something real (but not too much) to find. The same arguments always give the same league.
+    """
+
+    def __init__(self, num_teams=30, seasons=("2023", "2024", "2025"), games_per_team=162, seed=0,
+                 cancellation_rate=0.002, now=None):
+        """
+        :param num_teams: Number of teams in the league
+        :param seasons: Seasons as year strings, in order
+        :param games_per_team: Regular season games per team (one game day each, one team sits
+                               out every day if num_teams is odd)
+        :param seed: Seed of every random draw
+        :param cancellation_rate: Fraction of games marked Cancelled instead of played
+        :param now: UTC datetime separating played from scheduled games, defaults to the current time
+        """
+        if num_teams < 2:
+            raise ValueError("A league needs at least 2 teams")
+
+        self.num_teams = num_teams
+        self.seasons = [str(season) for season in seasons]
+        self.games_per_team = games_per_team
+        self.seed = seed
+        self.cancellation_rate = cancellation_rate
+        self.now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+
+        self.team_ids = np.arange(FIRST_TEAM_ID, FIRST_TEAM_ID + num_teams)
+        self.team_names = [f"Synthetic Team {team_id}" for team_id in self.team_ids]
+        self.team_abbreviations = [f"S{team_id}" for team_id in self.team_ids]
+
+        # random walk of team strengths over the seasons, shape (seasons, teams)
+        rng = np.random.default_rng([seed, 0])
+        base = rng.normal(0, TEAM_STRENGTH_SPREAD, (2, num_teams))
+        drift = rng.normal(0, SEASON_STRENGTH_DRIFT, (len(self.seasons), 2, num_teams))
+        drift[0] = 0
+        strengths = base + np.cumsum(drift, axis=0)
+        self.offense = dict(zip(self.seasons, strengths[:, 0]))
+        self.defense = dict(zip(self.seasons, strengths[:, 1]))
+
+        self._season_games = {}
+
+    def teams(self):
+        """
+        :returns: List of team dictionaries, shaped like the "teams" list of the MLB API teams endpoint
+        """
+        return [
+            {
+                "id": int(team_id),
+                "name": name,
+                "abbreviation": abbreviation,
+                "shortName": name.replace("Synthetic ", ""),
+                "sport": {"name": "Major League Baseball"}
+            }
+            for team_id, name, abbreviation in zip(self.team_ids, self.team_names, self.team_abbreviations)
+        ]
+
+    def seasonGames(self, season):
+        """
+        Draws (once) every game of a season: matchups, start times, status, scores and the odds.
+
+        :param season: Season year as a string
+        :returns: Dictionary of per game numpy arrays
+        """
+        season = str(season)
+        if season in self._season_games:
+            return self._season_games[season]
+
+        rng = np.random.default_rng([self.seed, int(season)])
+        games_per_day = self.num_teams // 2
+        num_days = self.games_per_team
+
+        # every day the teams are shuffled and paired up, the first of each pair at home
+        matchups = np.argsort(rng.random((num_days, self.num_teams)), axis=1)[:, :games_per_day * 2]
+        home = matchups[:, 0::2].ravel()
+        away = matchups[:, 1::2].ravel()
+        num_games = len(home)
+
+        first_day = datetime(int(season), *SEASON_START)
+        day_index = np.repeat(np.arange(num_days), games_per_day)
+        day_game = rng.random(num_games) < DAY_GAME_RATE
+        start_minutes = np.where(day_game, DAY_GAME_TIME[0] * 60 + DAY_GAME_TIME[1], NIGHT_GAME_TIME[0] * 60 + NIGHT_GAME_TIME[1])
+        start_times = [first_day + timedelta(days=int(day), minutes=int(minutes)) for day, minutes in zip(day_index, start_minutes)]
+
+        # expected runs from the batting team's offense against the fielding team's defense
+        home_rate = RUNS_PER_GAME * np.exp(self.offense[season][home] - self.defense[season][away] + HOME_FIELD_ADVANTAGE)
+        away_rate = RUNS_PER_GAME * np.exp(self.offense[season][away] - self.defense[season][home])
+        home_score = rng.poisson(home_rate)
+        away_score = rng.poisson(away_rate)
+
+        # extra innings, the better side is more likely to get the winning run
+        home_win_probability = winProbability(home_rate, away_rate)
+        tied = home_score == away_score
+        home_walk_off = rng.random(num_games) < home_win_probability
+        home_score = home_score + (tied & home_walk_off)
+        away_score = away_score + (tied & ~home_walk_off)
+
+        played = np.array([start_time < self.now for start_time in start_times])
+        cancelled = played & (rng.random(num_games) < self.cancellation_rate)
+
+        # the bookmaker prices a noisy estimate of the true probability
+        market_log_odds = np.log(home_win_probability / (1 - home_win_probability)) + rng.normal(0, MARKET_NOISE, num_games)
+        market_probability = 1 / (1 + np.exp(-market_log_odds))
+
+        games = {
+            "game_id": int(season) * GAME_IDS_PER_SEASON + np.arange(num_games),
+            "home": home,
+            "away": away,
+            "start_time": start_times,
+            "day_game": day_game,
+            "home_score": home_score,
+            "away_score": away_score,
+            "played": played & ~cancelled,
+            "cancelled": cancelled,
+            "home_odds": moneyLines(market_probability * (1 + BOOKMAKER_MARGIN / 2)),
+            "away_odds": moneyLines((1 - market_probability) * (1 + BOOKMAKER_MARGIN / 2))
+        }
+        self._season_games[season] = games
+        return games
+
+    def seasonSchedule(self, season):
+        """
+        :param season: Season year as a string
+        :returns: List of daily schedules, shaped like the "dates" list of the MLB API schedule endpoint
+        """
+        games = self.seasonGames(season)
+        dates = {}
+
+        for i, game_id in enumerate(games["game_id"]):
+            start_time = games["start_time"][i]
+            home, away = games["home"][i], games["away"][i]
+
+            game = {
+                "gamePk": int(game_id),
+                "season": str(season),
+                "gameType": "R",
+                "gameDate": start_time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status": {"detailedState": "Final" if games["played"][i] else "Cancelled" if games["cancelled"][i] else "Scheduled"},
+                "teams": {
+                    "home": {"team": {"id": int(self.team_ids[home]), "name": self.team_names[home]}},
+                    "away": {"team": {"id": int(self.team_ids[away]), "name": self.team_names[away]}}
+                },
+                "venue": {"id": int(self.team_ids[home])},
+                "dayNight": "day" if games["day_game"][i] else "night"
+            }
+            if games["played"][i]:
+                game["teams"]["home"]["score"] = int(games["home_score"][i])
+                game["teams"]["away"]["score"] = int(games["away_score"][i])
+
+            # the API groups games by their US date, not the UTC one
+            local_date = (start_time - timedelta(hours=4)).strftime("%Y-%m-%d")
+            dates.setdefault(local_date, []).append(game)
+
+        return [{"date": day, "games": day_games} for day, day_games in dates.items()]
+
+    def seasonBoxScores(self, season):
+        """
+        Draws the team box scores of every played game of a season, consistent with its final score.
+
+        :param season: Season year as a string
+        :returns: Dictionary mapping game id -> box score shaped like the trimmed MLB API response
+        """
+        games = self.seasonGames(season)
+        played = np.flatnonzero(games["played"])
+
+        # both sides are drawn at once, shape (games, 2) with home in column 0
+        rng = np.random.default_rng([self.seed, int(season), 1])
+        runs = np.stack([games["home_score"][played], games["away_score"][played]], axis=1)
+        batting = drawBattingLines(rng, runs)
+
+        # the home team doesn't bat in the bottom of the 9th when it's already ahead
+        home_skipped_ninth = runs[:, 0] > runs[:, 1]
+        outs = np.stack([np.full(len(played), 27), np.where(home_skipped_ninth, 24, 27)], axis=1)
+        fielding = drawFieldingLines(rng, outs)
+        # a team's pitchers face the other team's batters
+        opponent_batting = {name: values[:, ::-1] for name, values in batting.items()}
+        pitching = drawPitchingLines(rng, opponent_batting, outs)
+
+        box_scores = {}
+        for row, i in enumerate(played):
+            teams = {}
+            for column, side in enumerate(("home", "away")):
+                team_index = games[side][i]
+                teams[side] = {
+                    "team": {"id": int(self.team_ids[team_index])},
+                    "teamStats": {
+                        "batting": battingStats(batting, row, column),
+                        "pitching": pitchingStats(pitching, row, column),
+                        "fielding": fieldingStats(fielding, batting, row, column)
+                    }
+                }
+            box_scores[int(games["game_id"][i])] = {"teams": teams}
+
+        return box_scores
+
+    def seasonOdds(self, season):
+        """
+        :param season: Season year as a string
+        :returns: List of Odds rows (game_id, home_team, away_team, home_team_odds, away_team_odds),
+                  with team abbreviations like the scraper stores
+        """
+        games = self.seasonGames(season)
+        return [
+            (int(game_id), self.team_abbreviations[games["home"][i]], self.team_abbreviations[games["away"][i]],
+             formatMoneyLine(games["home_odds"][i]), formatMoneyLine(games["away_odds"][i]))
+            for i, game_id in enumerate(games["game_id"])
+            if not games["cancelled"][i]
+        ]
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def winProbability(home_rate, away_rate):
+    # normal approximation of the Skellam distribution of the run difference
+    z = (home_rate - away_rate) / np.sqrt(home_rate + away_rate)
+    return np.clip(1 / (1 + np.exp(-1.7 * z)), 0.05, 0.95)
+
+def moneyLines(probability):
+    # implied probability -> American moneyline, rounded to 5 like a sportsbook
+    probability = np.clip(probability, 0.02, 0.98)
+    favourite = -100 * probability / (1 - probability)
+    underdog = 100 * (1 - probability) / probability
+    odds = np.where(probability >= 0.5, favourite, underdog)
+    return (np.round(odds / 5) * 5).astype(int)
+
+def formatMoneyLine(odds):
+    return f"+{odds}" if odds > 0 else str(odds)
+
+def formatRate(value):
+    # the API sends rates as strings like ".312" or "1.045"
+    return f"{value:.3f}".lstrip("0") if value < 1 else f"{value:.3f}"
+
+def drawBattingLines(rng, runs):
+    """
+    :param rng: numpy Generator
+    :param runs: Integer array (games, 2) of runs scored
+    :returns: Dictionary of integer arrays (games, 2), one per batting stat
+    """
+    shape = runs.shape
+    walks = rng.poisson(3.1 + 0.25 * runs)
+    hit_by_pitch = rng.poisson(0.4, shape)
+    sac_flies = np.minimum(rng.poisson(0.25, shape), runs)
+    sac_bunts = rng.poisson(0.1, shape)
+    at_bats = 29 + rng.poisson(2 + 0.9 * runs)
+
+    # more runs come with more (and longer) hits
+    hits = rng.binomial(at_bats, np.clip(0.19 + 0.013 * runs, 0, 0.6))
+    doubles = rng.binomial(hits, 0.2)
+    triples = rng.binomial(hits - doubles, 0.02)
+    home_runs = np.minimum(rng.binomial(hits - doubles - triples, np.clip(0.1 + 0.012 * runs, 0, 0.5)), runs)
+
+    return {
+        "runs": runs,
+        "hits": hits,
+        "doubles": doubles,
+        "triples": triples,
+        "home_runs": home_runs,
+        "strikeouts": rng.binomial(at_bats - hits, 0.32),
+        "walks": walks,
+        "hit_by_pitch": hit_by_pitch,
+        "at_bats": at_bats,
+        "plate_appearances": at_bats + walks + hit_by_pitch + sac_flies + sac_bunts,
+        "total_bases": hits + doubles + 2 * triples + 3 * home_runs,
+        "sac_flies": sac_flies,
+        "sac_bunts": sac_bunts,
+        "rbi": runs - rng.binomial(runs, 0.05),
+        "left_on_base": rng.poisson(3 + 0.3 * (hits + walks)),
+        "stolen_bases": rng.poisson(0.5, shape),
+        "caught_stealing": rng.poisson(0.15, shape),
+        "ground_into_double_play": rng.poisson(0.8, shape),
+        "pickoffs": rng.poisson(0.05, shape)
+    }
+
+def drawPitchingLines(rng, opponent_batting, outs):
+    """
+    The pitching line of a team is its opponent's batting line, plus what only the pitchers track.
+
+    :param rng: numpy Generator
+    :param opponent_batting: Batting lines of the opposing team (see drawBattingLines)
+    :param outs: Integer array (games, 2) of outs recorded
+    :returns: Dictionary of arrays (games, 2), one per pitching stat
+    """
+    batters_faced = opponent_batting["plate_appearances"]
+    pitches = rng.poisson(3.85 * batters_faced)
+    strikes = rng.binomial(pitches, 0.64)
+    inherited_runners = rng.poisson(1.2, outs.shape)
+
+    earned_runs = opponent_batting["runs"] - rng.binomial(opponent_batting["runs"], 0.08)
+    return {
+        "earned_runs": earned_runs,
+        "outs": outs,
+        "batters_faced": batters_faced,
+        "strikes": strikes,
+        "balls": pitches - strikes,
+        "inherited_runners": inherited_runners,
+        "inherited_runners_scored": rng.binomial(inherited_runners, 0.3),
+        "pickoffs": rng.poisson(0.05, outs.shape),
+        "opponent": opponent_batting
+    }
+
+def drawFieldingLines(rng, outs):
+    errors = rng.poisson(0.55, outs.shape)
+    assists = rng.poisson(9, outs.shape)
+    return {
+        "errors": errors,
+        "assists": assists,
+        "put_outs": outs,
+        "chances": outs + assists + errors,
+        "passed_ball": rng.poisson(0.05, outs.shape)
+    }
+
+def battingStats(batting, row, column):
+    stat = {name: int(values[row, column]) for name, values in batting.items()}
+    on_base = stat["hits"] + stat["walks"] + stat["hit_by_pitch"]
+    obp = on_base / max(stat["at_bats"] + stat["walks"] + stat["hit_by_pitch"] + stat["sac_flies"], 1)
+    slg = stat["total_bases"] / max(stat["at_bats"], 1)
+    attempts = stat["stolen_bases"] + stat["caught_stealing"]
+
+    return {
+        "runs": stat["runs"],
+        "hits": stat["hits"],
+        "doubles": stat["doubles"],
+        "triples": stat["triples"],
+        "homeRuns": stat["home_runs"],
+        "strikeOuts": stat["strikeouts"],
+        "baseOnBalls": stat["walks"],
+        "hitByPitch": stat["hit_by_pitch"],
+        "atBats": stat["at_bats"],
+        "plateAppearances": stat["plate_appearances"],
+        "totalBases": stat["total_bases"],
+        "sacFlies": stat["sac_flies"],
+        "sacBunts": stat["sac_bunts"],
+        "obp": formatRate(obp),
+        "slg": formatRate(slg),
+        "ops": formatRate(obp + slg),
+        "avg": formatRate(stat["hits"] / max(stat["at_bats"], 1)),
+        "rbi": stat["rbi"],
+        "leftOnBase": stat["left_on_base"],
+        "caughtStealing": stat["caught_stealing"],
+        "stolenBases": stat["stolen_bases"],
+        "stolenBasePercentage": formatRate(stat["stolen_bases"] / attempts) if attempts else ".---",
+        "groundIntoDoublePlay": stat["ground_into_double_play"],
+        "groundIntoTriplePlay": 0,
+        "pickoffs": stat["pickoffs"]
+    }
+
+def pitchingStats(pitching, row, column):
+    opponent = {name: int(values[row, column]) for name, values in pitching["opponent"].items()}
+    outs = int(pitching["outs"][row, column])
+    innings = outs / 3
+    earned_runs = int(pitching["earned_runs"][row, column])
+    strikes = int(pitching["strikes"][row, column])
+    balls = int(pitching["balls"][row, column])
+    on_base = opponent["hits"] + opponent["walks"] + opponent["hit_by_pitch"]
+
+    return {
+        "earnedRuns": earned_runs,
+        "inningsPitched": f"{outs // 3}.{outs % 3}",
+        "strikeOuts": opponent["strikeouts"],
+        "baseOnBalls": opponent["walks"],
+        "hits": opponent["hits"],
+        "doubles": opponent["doubles"],
+        "triples": opponent["triples"],
+        "hitBatsmen": opponent["hit_by_pitch"],
+        "sacFlies": opponent["sac_flies"],
+        "atBats": opponent["at_bats"],
+        "homeRuns": opponent["home_runs"],
+        "era": f"{9 * earned_runs / innings:.2f}",
+        "whip": f"{(opponent['hits'] + opponent['walks']) / innings:.2f}",
+        "obp": formatRate(on_base / max(opponent["at_bats"] + opponent["walks"] + opponent["hit_by_pitch"] + opponent["sac_flies"], 1)),
+        "battersFaced": int(pitching["batters_faced"][row, column]),
+        "strikes": strikes,
+        "balls": balls,
+        "strikePercentage": formatRate(strikes / max(strikes + balls, 1)),
+        "pickoffs": int(pitching["pickoffs"][row, column]),
+        "inheritedRunners": int(pitching["inherited_runners"][row, column]),
+        "inheritedRunnersScored": int(pitching["inherited_runners_scored"][row, column])
+    }
+
+def fieldingStats(fielding, batting, row, column):
+    # the fielding team's stolen bases allowed are the other team's steals
+    opponent = 1 - column
+    stolen_bases = int(batting["stolen_bases"][row, opponent])
+    caught_stealing = int(batting["caught_stealing"][row, opponent])
+    attempts = stolen_bases + caught_stealing
+
+    return {
+        "errors": int(fielding["errors"][row, column]),
+        "assists": int(fielding["assists"][row, column]),
+        "putOuts": int(fielding["put_outs"][row, column]),
+        "chances": int(fielding["chances"][row, column]),
+        "passedBall": int(fielding["passed_ball"][row, column]),
+        "caughtStealing": caught_stealing,
+        "stolenBases": stolen_bases,
+        "stolenBasePercentage": formatRate(stolen_bases / attempts) if attempts else ".---",
+        "pickoffs": int(batting["pickoffs"][row, opponent])
+    }
+
+def writeSyntheticDatabase(league, db_path="databases/MLB_Betting.db", current_season=None):
+    """
+    Writes a synthetic league straight into the database: Teams, OldGames (or CurrentSchedule for
+    current_season), GameBoxScoreStats for every played game and Odds for every game, with the same
+    row builders the pipeline uses. engineerFeatures then finds every box score already stored.
+
+    :param league: SyntheticLeague to write
+    :param db_path: Path of the SQLite database
+    :param current_season: Season stored in CurrentSchedule instead of OldGames, None for all in OldGames
+    :returns: Dictionary with the number of games, box scores and odds written
+    """
+    counts = {"games": 0, "box_scores": 0, "odds": 0}
+
+    try:
+        conn = connect(db_path)
+        cursor = conn.cursor()
+
+        createTeamsTable(cursor)
+        createOldGamesTable(cursor)
+        createCurrentScheduleTable(cursor)
+        createBoxScoreTable(cursor)
+        createOddsTable(cursor)
+
+        cursor.execute("BEGIN TRANSACTION;")
+
+        cursor.executemany(INSERT_INTO_TEAMS, [
+            (team["id"], team["name"], team["abbreviation"], team["shortName"]) for team in league.teams()
+        ])
+
+        for season in league.seasons:
+            table = "CurrentSchedule" if season == current_season else "OldGames"
+            game_rows = scheduleGameRows(league.seasonSchedule(season))
+            upsertSchedule(cursor, table, game_rows)
+
+            box_scores = league.seasonBoxScores(season)
+            if box_scores:
+                insertManyIntoBoxScoreTable(cursor, [flattenBoxScore(game_id, game_data) for game_id, game_data in box_scores.items()])
+
+            odds = league.seasonOdds(season)
+            cursor.executemany(INSERT_INTO_ODDS, odds)
+
+            counts["games"] += len(game_rows)
+            counts["box_scores"] += len(box_scores)
+            counts["odds"] += len(odds)
+            print(f"Wrote synthetic season {season}: {len(game_rows)} games")
+
+        conn.commit()
+
+    except sqlite3.DatabaseError as db_err:
+        logger.error(f"Database error occurred when writing the synthetic league: {db_err}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return counts
+
+def writeSyntheticFixtures(league, fixtures):
+    """
+    Records a synthetic league as MLB API responses, so the replay server (and the benchmark) can
+    run the real pipeline on it: the teams, the regular season schedule of every season and the
+    box score of every played game.
+
+    :param league: SyntheticLeague to record
+    :param fixtures: FixtureStore to write into, saved at the end
+    :returns: Number of recorded responses
+    """
+    def put(path, params, data):
+        fixtures.put(path, params, 200, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    put("teams", {}, {"teams": league.teams()})
+
+    for season in league.seasons:
+        # same query the schedule updaters send, windowed requests are cut from it by the replay server
+        put("schedule", {"sportId": 1, "season": season, "gameType": "R"}, {"dates": league.seasonSchedule(season)})
+
+        for game_id, box_score in league.seasonBoxScores(season).items():
+            put(f"game/{game_id}/boxscore", {}, box_score)
+
+        print(f"Recorded synthetic season {season}")
+
+    fixtures.save()
+    return len(fixtures)
+
+def seasonRange(value):
+    # "2015-2024" -> ["2015", ..., "2024"], "2023" -> ["2023"]
+    first, _, last = value.partition("-")
+    return [str(season) for season in range(int(first), int(last or first) + 1)]
+
+def main(argv=None):
+    """
+    Generates a synthetic league from the command line, e.g. from src/:
+
+        python -m benchmarking.syntheticSeasons fixtures --teams 30 --seasons 2015-2024 --out benchmarking/fixtures/synthetic.zip
+        python -m benchmarking.syntheticSeasons database --teams 300 --seasons 2015-2025 --current-season 2025
+    """
+    parser = argparse.ArgumentParser(description="Generate synthetic MLB seasons for scale testing")
+    parser.add_argument("target", choices=["fixtures", "database"])
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--seasons", type=seasonRange, default=seasonRange("2015-2024"))
+    parser.add_argument("--games-per-team", type=int, default=162)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--current-season", help="Season stored in CurrentSchedule (database only)")
+    parser.add_argument("--out", help="FixtureStore zip or SQLite database path")
+    args = parser.parse_args(argv)
+
+    league = SyntheticLeague(args.teams, args.seasons, args.games_per_team, args.seed)
+
+    if args.target == "fixtures":
+        responses = writeSyntheticFixtures(league, FixtureStore(args.out or "benchmarking/fixtures/synthetic.zip"))
+        print(f"Recorded {responses} responses")
+    else:
+        counts = writeSyntheticDatabase(league, args.out or "databases/MLB_Betting.db", args.current_season)
+        print(f"Wrote {counts['games']} games, {counts['box_scores']} box scores and {counts['odds']} odds")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,14 @@
-import sqlite3
 import pickle
 import os
 import sys
-import json
 import pandas as pd
 import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from odds.calculateUnitSize import calculateUnitSize, moneyLineToPayout
-from modelDevelopment.utils.featureExtraction import buildFeatures
+from odds.calculateUnitSize import calculateUnitSize, moneyLineToPayout, MIN_EXPECTED_ROI, MAX_EXPECTED_ROI
+from modelDevelopment.utils.featureExtraction import buildFeaturesFromFrame, selectFeatureStoreColumns, loadFeatureStoreFrame
+from database.migrations import localToday
+from database.connection import sharedConnection
 
 
 def get_valid_odds(prompt):
@@ -19,24 +19,37 @@ def get_valid_odds(prompt):
             return odds
         print("Invalid odds format. Please enter like +150 or -120.")
 
-def computeDailyPredictions():
+def loadDailyGames(conn, game_day, feature_names):
+    """
+    Reads the games of one game day with their stored features, in the model's column order.
 
-    fetch_games_today = """
-    SELECT F.game_id, CS.date_time, CS.season, CS.status_code, CS.home_team, CS.away_team, F.features_json
+    :param conn: SQLite database connection
+    :param game_day: US Eastern game day as "YYYY-MM-DD" (see localToday)
+    :param feature_names: Features the model was trained on
+    :returns: Tuple of (DataFrame of game info, float32 DataFrame of the model features)
+    """
+    feature_columns = ", ".join(f'F."{column}"' for column in selectFeatureStoreColumns(conn))
+    fetch_games_of_day = f"""
+    SELECT F.game_id, CS.date_time, CS.season, CS.status_code, CS.home_team, CS.away_team, {feature_columns}
     FROM CurrentSchedule AS CS
-    INNER JOIN Features AS F 
+    INNER JOIN FeatureStore AS F 
     ON CS.game_id = F.game_id
-    WHERE DATE(datetime(CS.date_time, '-4 hours')) = DATE(datetime('now', '-4 hours'))
+    WHERE CS.local_game_date = ?
     ORDER BY CS.date_time ASC; 
     """
 
-    conn = sqlite3.connect("databases/MLB_Betting.db")
-    cursor = conn.cursor()
+    df = loadFeatureStoreFrame(conn, fetch_games_of_day, params=(game_day,))
+
+    game_info = df[["game_id", "date_time", "season", "status_code", "home_team", "away_team"]]
+
+    X_all, _, _ = buildFeaturesFromFrame(df, method="diff")
+    X_features = X_all[feature_names]
+    # no need to scale for xgboost
+    return game_info, X_features.astype(np.float32)
 
-    cursor.execute(fetch_games_today)
-    games = cursor.fetchall()
+def computeDailyPredictions():
 
-    print(f"Games found today: {len(games)}")
+    conn = sharedConnection(readonly=True)
 
     # load the feature set
     with open(f"src/modelDevelopment/training/model_files/feature_names_diff.pkl", "rb") as f:
@@ -45,17 +58,12 @@ def computeDailyPredictions():
     # load the xgboost model
     with open(f"src/modelDevelopment/training/model_files/xgboost_base_96_profit.pkl", "rb") as f:
             model = pickle.load(f)
-    
-    df = pd.DataFrame(games, columns=[
-        "game_id", "date_time", "season", "status_code", "home_team", "away_team", "features_json"
-    ])
-    df["features_json"] = df["features_json"].apply(json.loads)
 
-    X_all, _, _ = buildFeatures(df, method="diff")
-    X_features = X_all[feature_names]
-    # no need to scale for xgboost
-    X_scaled = X_features.astype(np.float32)
-    df_final = pd.concat([df, X_scaled], axis = 1)
+    game_info, X_scaled = loadDailyGames(conn, localToday(), feature_names)
+
+    print(f"Games found today: {len(game_info)}")
+
+    df_final = pd.concat([game_info, X_scaled], axis = 1)
 
     unique_games = {}
 
@@ -84,7 +92,7 @@ def computeDailyPredictions():
         teamToBetOn, unit_size, expected_roi = calculateUnitSize(home_proba, away_proba, home_odds, away_odds)
 
         # if there is no play for that game, skip it 
-        if teamToBetOn is None or expected_roi < 35 or expected_roi > 65:
+        if teamToBetOn is None or expected_roi < MIN_EXPECTED_ROI or expected_roi > MAX_EXPECTED_ROI:
             print("skipped that game!")
             continue
 
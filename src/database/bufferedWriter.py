@@ -0,0 +1,69 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# rows buffered per statement before they're written with one executemany call
+DEFAULT_WRITE_BATCH_SIZE = int(os.environ.get("MLB_DATABASE_WRITE_BATCH_SIZE", 1000))
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class BufferedWriter:
+    """
+    Collects rows per INSERT statement and writes each statement's rows with a single executemany
+    once batch_size of them are waiting, so a rebuild costs one call into SQLite per batch instead
+    of one per row. Rows only reach the database on flush (or when their batch fills up), so
+    flush before reading back anything that was added.
+
+    Usage:
+        with BufferedWriter(cursor) as writer:
+            for game_id, features in feature_rows:
+                writer.add(INSERT_INTO_FEATURES, (game_id, json.dumps(features)))
+    """
+
+    def __init__(self, cursor, batch_size=DEFAULT_WRITE_BATCH_SIZE):
+        """
+        :param cursor: SQLite database cursor the rows are written with
+        :param batch_size: Rows per statement buffered before they're written
+        """
+        self.cursor = cursor
+        self.batch_size = batch_size
+        self.rows_written = 0
+
+        # statement -> rows waiting to be written, statements are flushed in the order they were first added
+        self.pending = {}
+
+    def add(self, statement, row):
+        """
+        :param statement: Parametrized INSERT statement, the same string for every row of a table
+        :param row: Tuple of values in the statement's placeholder order
+        :returns: None
+        """
+        rows = self.pending.setdefault(statement, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.writeRows(statement)
+
+    def writeRows(self, statement):
+        rows = self.pending.pop(statement, None)
+        if rows:
+            self.cursor.executemany(statement, rows)
+            self.rows_written += len(rows)
+
+    def flush(self):
+        for statement in list(self.pending):
+            self.writeRows(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # nothing half written is flushed on error, the caller rolls the transaction back anyway
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DATABASE_PATH = os.environ.get("MLB_DATABASE_PATH", "databases/MLB_Betting.db")
+
+# seconds a connection waits on another process' write lock before giving up with "database is locked"
+BUSY_TIMEOUT_S = float(os.environ.get("MLB_DATABASE_BUSY_TIMEOUT", 30))
+
+# prepared statements kept per connection, the feature and odds writers reuse a few dozen statements per game
+CACHED_STATEMENTS = 256
+
+# applied to every connection. WAL lets readers run while a writer holds the lock, and with WAL
+# synchronous=NORMAL only syncs at checkpoints, which is still safe against corruption
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",       # 64 MB page cache
+    "PRAGMA mmap_size = 268435456",     # 256 MB memory mapped reads
+    "PRAGMA temp_store = MEMORY",
+)
+
+# serializes writes between threads of this process, other processes wait on SQLite's lock (BUSY_TIMEOUT_S)
+WRITE_LOCK = threading.RLock()
+
+_shared = threading.local()
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def connect(db_path=None, readonly=False):
+    """
+    Opens a connection to the betting database with WAL journaling and the tuned pragmas.
+
+    :param db_path: Database file, defaults to MLB_DATABASE_PATH (databases/MLB_Betting.db)
+    :param readonly: Reject writes on this connection (PRAGMA query_only)
+    :returns: sqlite3 connection, closed by the caller
+    """
+    db_path = db_path or DATABASE_PATH
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S, cached_statements=CACHED_STATEMENTS)
+
+    # the journal mode is stored in the file, it only really changes the first time
+    if not readonly and db_path != ":memory:":
+        conn.execute("PRAGMA journal_mode = WAL")
+
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+
+    return conn
+
+def sharedConnection(db_path=None, readonly=False):
+    """
+    Same as connect, but the connection is opened once per thread and handed out again on the
+    next call, page cache and prepared statements included. Don't close it, see closeSharedConnections.
+
+    :returns: sqlite3 connection owned by the calling thread
+    """
+    key = (db_path or DATABASE_PATH, readonly)
+    connections = getattr(_shared, "connections", None)
+    if connections is None:
+        connections = _shared.connections = {}
+
+    if key not in connections:
+        connections[key] = connect(*key)
+    return connections[key]
+
+def closeSharedConnections():
+    # closes the shared connections of the calling thread
+    for conn in getattr(_shared, "connections", {}).values():
+        conn.close()
+    _shared.connections = {}
+
+@contextmanager
+def writeTransaction(conn):
+    """
+    Runs a short write as its own transaction. The write lock is taken up front (BEGIN IMMEDIATE),
+    so the transaction waits for other writers instead of failing when it upgrades from a read to a write.
+
+    Usage:
+        with writeTransaction(conn) as cursor:
+            cursor.execute(...)
+
+    :param conn: sqlite3 connection without an open transaction
+    :returns: Cursor of the connection, committed on exit and rolled back on error
+    """
+    with WRITE_LOCK:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
@@ -0,0 +1,89 @@
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# game days follow the league office, a 10:10pm ET start in Seattle is still that day's game
+GAME_DAY_TIMEZONE = ZoneInfo("America/New_York")
+
+SCHEDULE_TABLES = ("OldGames", "CurrentSchedule")
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+ADD_LOCAL_GAME_DATE_COLUMN = """
+    ALTER TABLE {table} ADD COLUMN local_game_date TEXT
+    """
+
+SELECT_GAMES_WITHOUT_LOCAL_DATE = """
+    SELECT game_id, date_time FROM {table} WHERE local_game_date IS NULL AND date_time IS NOT NULL
+    """
+
+UPDATE_LOCAL_GAME_DATE = """
+    UPDATE {table} SET local_game_date = ? WHERE game_id = ?
+    """
+
+# every hot schedule query filters on one of these, the index names are prefixed by the table
+CREATE_SCHEDULE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_{table}_season_date_time ON {table} (season, date_time)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_local_game_date ON {table} (local_game_date)",
+    "CREATE INDEX IF NOT EXISTS idx_{table}_teams_date_time ON {table} (home_team, away_team, date_time)",
+)
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def localGameDate(date_time):
+    """
+    :param date_time: Game start as stored by the schedule, "YYYY-MM-DDTHH:MM:SSZ" in UTC
+    :returns: US Eastern calendar day of the game as "YYYY-MM-DD", daylight saving time included
+    """
+    if date_time is None:
+        return None
+
+    start = datetime.strptime(date_time, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    return start.astimezone(GAME_DAY_TIMEZONE).date().isoformat()
+
+def localToday():
+    return datetime.now(GAME_DAY_TIMEZONE).date().isoformat()
+
+def tableColumns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def migrateScheduleTable(cursor, table):
+    """
+    Brings an OldGames or CurrentSchedule table created by an older version up to date: adds the
+    local_game_date column, fills it in for the rows that don't have it yet and creates the indexes.
+    Safe to run on every start, a migrated table only costs the PRAGMA and one indexed lookup.
+
+    :param cursor: SQLite database cursor
+    :param table: "OldGames" or "CurrentSchedule"
+    :returns: Number of rows whose local_game_date was backfilled
+    """
+    if table not in SCHEDULE_TABLES:
+        raise ValueError(f"Unknown schedule table {table}")
+
+    if "local_game_date" not in tableColumns(cursor, table):
+        cursor.execute(ADD_LOCAL_GAME_DATE_COLUMN.format(table=table))
+        logger.info(f"Added local_game_date to {table}")
+
+    for statement in CREATE_SCHEDULE_INDEXES:
+        cursor.execute(statement.format(table=table))
+
+    cursor.execute(SELECT_GAMES_WITHOUT_LOCAL_DATE.format(table=table))
+    backfill = [(localGameDate(date_time), game_id) for game_id, date_time in cursor.fetchall()]
+    if backfill:
+        cursor.executemany(UPDATE_LOCAL_GAME_DATE.format(table=table), backfill)
+        # committed on its own, the callers start their own transaction right after creating the table
+        cursor.connection.commit()
+        logger.info(f"Backfilled local_game_date of {len(backfill)} {table} games")
+
+    return len(backfill)
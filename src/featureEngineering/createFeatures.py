@@ -1,10 +1,18 @@
 import requests
-import sqlite3
 import logging
-from collections import defaultdict, deque
 import json
 import os
+import hashlib
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
+from mlbApi.httpCache import DEFAULT_CACHE_DIR
+from database.migrations import localGameDate, localToday
+from database.connection import connect
+from database.bufferedWriter import BufferedWriter, DEFAULT_WRITE_BATCH_SIZE
+from featureEngineering.fetchBoxScores import fetchBoxScores, DEFAULT_MAX_WORKERS
+from featureEngineering.teamAccumulators import TeamStatsEngine, TEAM_STATE_VERSION, normalizeWindowSizes, rollingFeaturePrefixes, windowKey
+from featureEngineering.vectorizedFeatures import buildSeasonFeatures
+from featureEngineering.featureStore import createFeatureStoreTable, ensureFeatureStoreColumns, featureStoreRow, bumpFeatureStoreGeneration
 
 logger = logging.getLogger(__name__)
 
@@ -155,11 +163,75 @@ INSERT_INTO_FEATURES = """
     );
 """
 
+CREATE_FEATURE_CHECKPOINTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS FeatureCheckpoints
+    (
+        season TEXT,
+        rolling_window_size INTEGER,
+        checkpoint_date TEXT,
+        last_game_id INTEGER,
+        games_processed INTEGER,
+        games_hash TEXT,
+        team_state_json TEXT,
+        PRIMARY KEY (season, rolling_window_size)
+    )
+"""
+
+INSERT_INTO_FEATURE_CHECKPOINTS = """
+    INSERT OR REPLACE INTO FeatureCheckpoints (
+        season,
+        rolling_window_size,
+        checkpoint_date,
+        last_game_id,
+        games_processed,
+        games_hash,
+        team_state_json
+        ) VALUES (
+        ?, ?, ?, ?, ?, ?, ?
+    );
+"""
+
+SELECT_FEATURE_CHECKPOINT = """
+    SELECT checkpoint_date, last_game_id, games_processed, games_hash, team_state_json
+    FROM FeatureCheckpoints
+    WHERE season = ? AND rolling_window_size = ?
+"""
+
+SELECT_OTHER_FEATURE_CHECKPOINT = """
+    SELECT 1
+    FROM FeatureCheckpoints
+    WHERE season = ? AND rolling_window_size != ?
+    LIMIT 1
+"""
+
+DELETE_OTHER_FEATURE_CHECKPOINTS = """
+    DELETE FROM FeatureCheckpoints
+    WHERE season = ? AND rolling_window_size != ?
+"""
+
+DELETE_FROM_FEATURES = """
+    DELETE FROM Features WHERE game_id = ?
+"""
+
+DELETE_FROM_FEATURE_STORE = """
+    DELETE FROM FeatureStore WHERE game_id = ?
+"""
+
+# every stored box score of a season in one pass, replaces a lookup per game in the replay
+SELECT_SEASON_BOX_SCORES_IN_ORDER = """
+    SELECT B.*
+    FROM {table} AS G
+    INNER JOIN GameBoxScoreStats AS B
+    ON G.game_id = B.game_id
+    WHERE G.season = ?
+    ORDER BY G.date_time ASC, G.game_id ASC
+"""
+
 SELECT_OLD_SEASON_GAMES_IN_ORDER = """
     SELECT *
     FROM OldGames
     WHERE season = ? AND status_code != 'Cancelled'
-    ORDER BY date_time ASC
+    ORDER BY date_time ASC, game_id ASC
 """
 
 SELECT_CURRENT_SEASON_GAMES_IN_ORDER = """
@@ -167,33 +239,60 @@ SELECT_CURRENT_SEASON_GAMES_IN_ORDER = """
     FROM CurrentSchedule
     WHERE season = ?
     AND status_code NOT IN ('Cancelled', 'Postponed')
-    AND DATE(datetime(date_time, '-4 hours')) <= DATE(datetime('now', '-4 hours'))
-    ORDER BY date_time ASC;
+    AND local_game_date <= ?
+    ORDER BY date_time ASC, game_id ASC;
 """
 
 # ----------------------------- #
 #     FUNCTIONS START HERE      #
 # ----------------------------- #
 
-def engineerFeatures(rolling_window_size, base_url):
+def engineerFeatures(rolling_window_size, base_url, max_workers=DEFAULT_MAX_WORKERS, resume=True, batch_mode=True, seasons=None):
+    """
+    Builds the season-to-date and rolling features for every game and stores them in the Features table.
+
+    :param rolling_window_size: Number of games to include in rolling stats. Pass a list (e.g. [3, 5, 10, 20])
+                                to build every window in the same pass, stored side by side as rolling3_, rolling5_, ...
+    :param base_url: Base URL of the MLB API
+    :param max_workers: Maximum number of box score requests in flight at once
+    :param resume: Resume from saved checkpoints instead of rebuilding every season
+    :param batch_mode: Build finished seasons with the vectorized season builder
+    :param seasons: Seasons to build as strings, defaults to every season since 2015
+    :returns: Number of seasons built (intact finished seasons are skipped), or None if the build failed
+    """
+
+    # games are only stored once both teams have played enough games to fill the largest window
+    min_games_played = max(normalizeWindowSizes(rolling_window_size))
+    rolling_prefixes = rollingFeaturePrefixes(rolling_window_size)
+    checkpoint_key = windowKey(rolling_window_size)
 
     try:
-        conn = sqlite3.connect("databases/MLB_Betting.db")
+        conn = connect()
         cursor = conn.cursor()
         
         logger.debug("Creating Features table if it doesn't exist")
         createFeaturesTable(cursor)
+        logger.debug("Creating FeatureStore table if it doesn't exist")
+        createFeatureStoreTable(cursor)
+        ensureFeatureStoreColumns(cursor, featureNames(rolling_prefixes))
         logger.debug("Creating GameBoxScoreStats table if it doesn't exist")
         createBoxScoreTable(cursor)
+        logger.debug("Creating FeatureCheckpoints table if it doesn't exist")
+        createFeatureCheckpointsTable(cursor)
 
         cursor.execute("BEGIN TRANSACTION;")
 
         logger.debug("Attempting to engineer features for past seasons")
 
-        seasons = ["2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024", "2025"]
+        if seasons is None:
+            seasons = ["2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024", "2025"]
+
+        # features are written in batches, nothing in this pass reads them back
+        feature_writer = BufferedWriter(cursor)
+
+        # seasons are built one after the other, only one season's games and box scores are in memory at a time
+        seasons_built = 0
         for season in seasons:
-            
-            logger.debug(f"Engineering features for {season} season")
 
             # if it is the current season
             if (season == os.environ.get("CURRENT_SEASON")):
@@ -202,110 +301,92 @@ def engineerFeatures(rolling_window_size, base_url):
             else:
 
                 games = selectOldSeasonGames(cursor, season)
+
+            # Features and FeatureStore hold one row per game whatever the windows, so a checkpoint only describes
+            # the stored rows if no other window configuration wrote the season after it
+            checkpoint = selectFeatureCheckpoint(cursor, season, checkpoint_key) if resume else None
+            if not checkpointIsIntact(checkpoint, games) or otherFeatureCheckpointExists(cursor, season, checkpoint_key):
+                checkpoint = None
+
+            # finished seasons never change, so an intact checkpoint means there is nothing left to do
+            if (checkpoint is not None and checkpoint["games_processed"] == len(games) and
+                season != os.environ.get("CURRENT_SEASON")):
+                logger.debug(f"Checkpoint for {season} season is intact, skipping it")
+                continue
+
+            seasons_built += 1
+            start_index = checkpointGamesProcessed(checkpoint)
+
+            # this configuration is about to overwrite the season's rows, the other configurations' checkpoints stop being true
+            deleteOtherFeatureCheckpoints(cursor, season, checkpoint_key)
+
+            # and a season built from scratch starts from no rows, another configuration may have stored games this one doesn't
+            if start_index == 0:
+                deleteSeasonFeatures(cursor, games)
+
+            # download the season's missing box scores up front so the ordered pass below only reads local data
+            logger.debug(f"Prefetching {season} box scores missing from GameBoxScoreStats")
+            unsaved_box_scores = prefetchMissingBoxScores(cursor, {season: games[start_index:]}, base_url, max_workers)
+
+            logger.debug(f"Engineering features for {season} season")
+
+            # finished seasons built from scratch can be computed for every game at once
+            if batch_mode and start_index == 0 and season != os.environ.get("CURRENT_SEASON"):
+                season_features = buildSeasonFeatures(conn, season, rolling_window_size)
+                if season_features is not None:
+                    feature_rows, team_state = season_features
+                    logger.debug(f"Batch built features for {season} season ({len(games)} games)")
+                    for game_id, features in feature_rows:
+                        storeFeatures(feature_writer, game_id, features)
+                    if games:
+                        insertFeatureCheckpoint(cursor, season, checkpoint_key, games, json.dumps(team_state))
+                    continue
+
+            # otherwise replay the season game by game
+
+            # only games from previous days are final, so the current season checkpoint stops right before today's games
+            if season == os.environ.get("CURRENT_SEASON"):
+                today = localToday()
+                checkpoint_index = sum(1 for game in games if localGameDate(game[3]) < today)
+            else:
+                checkpoint_index = len(games)
         
             print('starting to build features for season ' + str(season))
-            print('there are this many games to process = ' + str(len(games)))
-
-            # Outer dict maps team_id → that team's season stats
-            team_season_stats = defaultdict(lambda: {
-
-                # GENERAL STATS
-                "gamesPlayed": 0,
-
-                # OFFENSIVE/BATTING STATS
-                "runsScored": 0,
-                "battingHits": 0,
-                "atBats": 0,
-                "battingWalks": 0,
-                "hitByPitch": 0,
-                "sacFlies": 0, 
-                "totalBases": 0,
-                "strikeouts": 0,
-                "plateAppearances": 0,
-                "homeRuns": 0, 
-                
-                # DEFENSIVE/PITCHING STATS
-                "runsGiven": 0,
-                "pitchingHits": 0,
-                "pitchingWalks": 0,
-                "earnedRuns": 0,
-                "inningsPitched": 0.0,
-                "pitchingHitBatsmen": 0,
-                "pitchingSacFlies": 0,
-                "pitchingAtBats": 0,
-                "pitchingDoubles": 0,
-                "pitchingTriples": 0,
-                "pitchingHomeRuns": 0,
-                "pitchingStrikeOuts": 0,
-                "pitchingBattersFaced": 0
-            })
-
-            team_rolling_stats = defaultdict(lambda: {
-                # keep a deque of the last N game stats for eeach team
-
-                # OFFENSIVE/BATTING STATS
-                "runsScored": deque(maxlen=rolling_window_size),
-                "battingHits": deque(maxlen=rolling_window_size),
-                "atBats": deque(maxlen=rolling_window_size),
-                "battingWalks": deque(maxlen=rolling_window_size),
-                "hitByPitch": deque(maxlen=rolling_window_size),
-                "sacFlies": deque(maxlen=rolling_window_size),
-                "totalBases": deque(maxlen=rolling_window_size),
-                "strikeouts": deque(maxlen=rolling_window_size),
-                "plateAppearances": deque(maxlen=rolling_window_size),
-                "homeRuns": deque(maxlen=rolling_window_size), 
-
-                # DEFENSIVE/PITCHING STATS
-                "runsGiven": deque(maxlen=rolling_window_size),
-                "pitchingHits": deque(maxlen=rolling_window_size),
-                "pitchingWalks": deque(maxlen=rolling_window_size),
-                "earnedRuns": deque(maxlen=rolling_window_size),
-                "inningsPitched": deque(maxlen=rolling_window_size),
-                "pitchingHitBatsmen": deque(maxlen=rolling_window_size),
-                "pitchingSacFlies": deque(maxlen=rolling_window_size),
-                "pitchingAtBats": deque(maxlen=rolling_window_size),
-                "pitchingDoubles": deque(maxlen=rolling_window_size),
-                "pitchingTriples": deque(maxlen=rolling_window_size),
-                "pitchingHomeRuns": deque(maxlen=rolling_window_size),
-                "pitchingStrikeOuts": deque(maxlen=rolling_window_size),
-                "pitchingBattersFaced": deque(maxlen=rolling_window_size)
-            })
+            print('there are this many games to process = ' + str(len(games) - start_index))
+
+            if checkpoint:
+                logger.debug(f"Resuming {season} season from checkpoint after game {checkpoint['last_game_id']}")
+                team_stats = TeamStatsEngine.fromState(checkpoint["team_state"])
+            else:
+                team_stats = TeamStatsEngine(rolling_window_size)
 
+            # stored box scores come straight off one query, already flat like extractTeamStats returns them
+            season_box_scores = selectSeasonBoxScores(cursor, season)
+
+            checkpoint_state = None
             numGamesProcessed = 0
-            for game in games:
-                
+            for index in range(start_index, len(games)):
+
+                # snapshot the accumulators right before the first game past the checkpoint
+                if index == checkpoint_index:
+                    checkpoint_state = json.dumps(team_stats.toState())
+
+                game = games[index]
                 game_id = game[0]
 
                 if season == os.environ.get("CURRENT_SEASON"):
                     print(game_id)
 
-                game_data = None
-
-                if (boxScoreExists(cursor, game_id)):
-
-                    if season == os.environ.get("CURRENT_SEASON"):
-                        print('box score existed current season game, getting from DB')
-                    game_data = reconstructGameDataFromSQL(cursor, game_id)
-                  
+                # recent current season games aren't stored in the box score table, so they only live in memory
+                game_data = unsaved_box_scores.get(game_id)
+                if game_data is not None:
+                    # fetch all the stats from boxscore for each team
+                    home_stats = extractTeamStats(game_data["teams"]["home"], "home")
+                    away_stats = extractTeamStats(game_data["teams"]["away"], "away")
+                elif game_id in season_box_scores:
+                    home_stats, away_stats = season_box_scores[game_id]
                 else:
-                    response = requests.get(f"{base_url}game/{game_id}/boxscore")
-                    game_data = response.json()
-                    if season == os.environ.get("CURRENT_SEASON"):
-                        print('box score did not exist for current season game, fetching from API')
-                    
-                    game_date = datetime.strptime(game[3], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-                    now = datetime.now(timezone.utc)
-
-                     # Only store in box score table if it's a historic game (finished season) or
-                     # an older current season game
-                    if season != os.environ.get("CURRENT_SEASON") or (now - game_date > timedelta(days=14)):
-                        if (season == os.environ.get("CURRENT_SEASON")):
-                            print('hey, we found an old game (2 weeks an inserted into box score)')
-                        insertIntoBoxScoreTable(cursor, game_id, game_data)
-
-                # fetch all the stats from boxscore for each team
-                home_stats = extractTeamStats(game_data["teams"]["home"], "home")
-                away_stats = extractTeamStats(game_data["teams"]["away"], "away")
+                    raise ValueError(f"No box score found for game_id {game_id}")
 
                 # extract the ids
                 home_team_id = home_stats["home_team_id"]
@@ -318,29 +399,43 @@ def engineerFeatures(rolling_window_size, base_url):
                 # if the total number of games played for that team after updating becomes greater than N (rolling size window), 
                 # then we actually store that game with features in the Features DB with rolling average equal to season average
                 # till now
-                if (team_season_stats[home_team_id]["gamesPlayed"] >= rolling_window_size and 
-                    team_season_stats[away_team_id]["gamesPlayed"] >= rolling_window_size):
+                if (team_stats.gamesPlayed(home_team_id) >= min_games_played and 
+                    team_stats.gamesPlayed(away_team_id) >= min_games_played):
 
                     # only build features if it wasn't a tie
                     if (home_runs_scored != away_runs_scored):
-                        features = buildFeatures(team_season_stats, team_rolling_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored)
-                        insertIntoFeaturesTable(cursor, game_id, features)
+                        features = buildFeatures(team_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored, rolling_prefixes)
+                        storeFeatures(feature_writer, game_id, features)
 
                     # or if it was a tie but the game is still going on
                     if (home_runs_scored == away_runs_scored and season == os.environ.get("CURRENT_SEASON")):
-                        features = buildFeatures(team_season_stats, team_rolling_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored)
-                        insertIntoFeaturesTable(cursor, game_id, features)
+                        features = buildFeatures(team_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored, rolling_prefixes)
+                        storeFeatures(feature_writer, game_id, features)
                     
-                # After saving the feature, update season totals to include this game for both teams
-                updateTeamSeasonStats(team_season_stats, home_team_id, away_team_id, home_stats, away_stats)   
-                # also update rolling averages
-                updateTeamRollingStats(team_rolling_stats, home_team_id, away_team_id, home_stats, away_stats)
+                # After saving the feature, update season totals and rolling window to include this game for both teams
+                team_stats.update(home_team_id, away_team_id, home_stats, away_stats)
 
                 numGamesProcessed += 1
                 if season == os.environ.get("CURRENT_SEASON"):
                     print('numGamesProcessed = ' + str(numGamesProcessed))
+
+            if checkpoint_index == len(games):
+                checkpoint_state = json.dumps(team_stats.toState())
+
+            # save where this season got to, unless nothing new became final since the last checkpoint
+            if checkpoint_state is not None and checkpoint_index > start_index:
+                insertFeatureCheckpoint(cursor, season, checkpoint_key, games[:checkpoint_index], checkpoint_state)
+
+        feature_writer.flush()
+
+        # let cached feature matrices know FeatureStore changed
+        if seasons_built:
+            bumpFeatureStoreGeneration(cursor)
+
         conn.commit() 
 
+        return seasons_built
+
     except requests.exceptions.HTTPError as http_err:
         logger.error(f"HTTP error occurred while fetching MLB boxscore data: {http_err}")
         conn.rollback()
@@ -353,116 +448,163 @@ def engineerFeatures(rolling_window_size, base_url):
 def createFeaturesTable(cursor):
     cursor.execute(CREATE_FEATURES_TABLE)
 
+def createFeatureCheckpointsTable(cursor):
+    cursor.execute(CREATE_FEATURE_CHECKPOINTS_TABLE)
+
 def createBoxScoreTable(cursor):
     cursor.execute(CREATE_BOXSCORE_TABLE)
 
-def boxScoreExists(cursor, game_id):
-    cursor.execute("SELECT 1 FROM GameBoxScoreStats WHERE game_id = ?", (game_id,))
-    return cursor.fetchone() is not None
+def storeFeatures(writer, game_id, features_dict):
+    """
+    Queues one game's features for both feature tables, typed columns for the prediction/evaluation
+    readers and json kept for the training notebook.
+
+    :param writer: BufferedWriter of the feature build's transaction
+    :param game_id: MLB game id
+    :param features_dict: Features built by buildFeatures
+    :returns: None
+    """
+    writer.add(*featureStoreRow(game_id, features_dict))
+    writer.add(INSERT_INTO_FEATURES, (game_id, json.dumps(features_dict)))
+
+def featureNames(rolling_prefixes):
+    # same names and order as buildFeatures produces
+    metric_names = list(calculate_metrics({}).keys())
+    names = []
+    for team_type in ("home", "away"):
+        names.append(f"{team_type}_team_id")
+        names.extend(f"season_{team_type}_avg_{key}" for key in metric_names)
+        for _, prefix in rolling_prefixes:
+            names.extend(f"{prefix}_{team_type}_avg_{key}" for key in metric_names)
+    names.append("label")
+    return names
+
+def selectStoredBoxScoreIds(cursor):
+    cursor.execute("SELECT game_id FROM GameBoxScoreStats")
+    return {row[0] for row in cursor.fetchall()}
+
+def prefetchMissingBoxScores(cursor, season_games, base_url, max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_WRITE_BATCH_SIZE, http_cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Works out which games are missing from GameBoxScoreStats, downloads them concurrently and
+    writes the ones that should be persisted in bulk.
+
+    Only historic games (finished season) or current season games older than 2 weeks are stored,
+    since recent box scores can still be corrected. Those recent games are returned instead so the
+    ordered feature pass doesn't have to go back to the API for them.
+
+    :param cursor: SQLite database cursor
+    :param season_games: Dictionary mapping season -> list of game rows (OldGames/CurrentSchedule schema)
+    :param base_url: Base URL of the MLB API
+    :param max_workers: Maximum number of box score requests in flight at once
+    :param batch_size: Number of box scores written per executemany call
+    :param http_cache_dir: Directory of the on-disk HTTP cache, None to always download
+    :returns: Dictionary mapping game_id -> box score for fetched games that were not stored
+    """
+    current_season = os.environ.get("CURRENT_SEASON")
+    now = datetime.now(timezone.utc)
+    stored_ids = selectStoredBoxScoreIds(cursor)
+
+    # game_id -> whether it should be stored in the box score table once fetched
+    missing_games = {}
+    for season, games in season_games.items():
+        for game in games:
+            game_id = game[0]
+            if game_id in stored_ids:
+                continue
+            game_date = datetime.strptime(game[3], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            missing_games[game_id] = season != current_season or (now - game_date > timedelta(days=14))
+
+    logger.debug(f"{len(missing_games)} box scores missing from GameBoxScoreStats")
+    print('box scores to fetch from API = ' + str(len(missing_games)))
+
+    unsaved_box_scores = {}
+    # finished box scores are cached on disk for good, recent ones are revalidated
+    final_game_ids = {game_id for game_id, store in missing_games.items() if store}
+    box_scores = fetchBoxScores(
+        missing_games.keys(), base_url, max_workers=max_workers,
+        http_cache_dir=http_cache_dir, final_game_ids=final_game_ids
+    )
+    # flushed on exit, the feature pass reads these rows back
+    with BufferedWriter(cursor, batch_size) as writer:
+        for game_id, game_data in box_scores:
+            if missing_games[game_id]:
+                writer.add(*boxScoreRow(flattenBoxScore(game_id, game_data)))
+            else:
+                unsaved_box_scores[game_id] = game_data
 
-def insertIntoFeaturesTable(cursor, game_id, features_dict):
-    features_json = json.dumps(features_dict)
-    cursor.execute(INSERT_INTO_FEATURES, (game_id, features_json))
+    return unsaved_box_scores
 
-def insertIntoBoxScoreTable(cursor, game_id, game_data):
+def flattenBoxScore(game_id, game_data):
     home = extractTeamStats(game_data["teams"]["home"], "home")
     away = extractTeamStats(game_data["teams"]["away"], "away")
 
-    data = {
+    return {
         "game_id": game_id,
         **home,
         **away
     }
 
-    # get the columns and corresponding values
-    keys = ", ".join(data.keys())
-    placeholders = ", ".join(["?"] * len(data))
-    cursor.execute(f"INSERT OR IGNORE INTO GameBoxScoreStats ({keys}) VALUES ({placeholders})", tuple(data.values()))
+@lru_cache(maxsize=None)
+def boxScoreInsertStatement(columns):
+    # every flattened box score has the same keys in the same order, so this is only built once
+    placeholders = ", ".join(["?"] * len(columns))
+    return f"INSERT OR IGNORE INTO GameBoxScoreStats ({', '.join(columns)}) VALUES ({placeholders})"
+
+def boxScoreRow(data):
+    """
+    :param data: Flattened box score (see flattenBoxScore)
+    :returns: Tuple of (insert statement for its columns, row values)
+    """
+    return boxScoreInsertStatement(tuple(data.keys())), tuple(data.values())
+
+def insertManyIntoBoxScoreTable(cursor, rows):
+    with BufferedWriter(cursor) as writer:
+        for row in rows:
+            writer.add(*boxScoreRow(row))
+
+@lru_cache(maxsize=None)
+def teamStatColumns(prefix):
+    """
+    :param prefix: "home" or "away"
+    :returns: Tuple of (GameBoxScoreStats columns of that team in extractTeamStats order,
+              the ones extractTeamStats reads with safe_float)
+    """
+    empty_team = {"team": {"id": None}, "teamStats": {"batting": {}, "pitching": {}, "fielding": {}}}
+    stats = extractTeamStats(empty_team, prefix)
+    return tuple(stats), frozenset(column for column, value in stats.items() if isinstance(value, float))
+
+def teamStatsFromRow(data, prefix):
+    """
+    Same dictionary extractTeamStats returned for the team when the box score was stored,
+    read back from its GameBoxScoreStats row.
+
+    :param data: Dictionary of a GameBoxScoreStats row
+    :param prefix: "home" or "away"
+    :returns: Dictionary of the team's stats
+    """
+    columns, float_columns = teamStatColumns(prefix)
+    return {
+        column: (float(data[column]) if data[column] is not None else 0.0) if column in float_columns else data[column]
+        for column in columns
+    }
 
-def reconstructGameDataFromSQL(cursor, game_id):
-    cursor.execute("SELECT * FROM GameBoxScoreStats WHERE game_id = ?", (game_id,))
-    row = cursor.fetchone()
-    if row is None:
-        raise ValueError(f"No box score found for game_id {game_id}")
+def selectSeasonBoxScores(cursor, season):
+    """
+    Loads every stored box score of a season with a single ordered query.
 
+    :param cursor: SQLite database cursor
+    :param season: Season year as a string, read from CurrentSchedule if it's CURRENT_SEASON, OldGames otherwise
+    :returns: Dictionary mapping game_id -> (home stats, away stats), see teamStatsFromRow
+    """
+    table = "CurrentSchedule" if season == os.environ.get("CURRENT_SEASON") else "OldGames"
+    cursor.execute(SELECT_SEASON_BOX_SCORES_IN_ORDER.format(table=table), (season,))
     col_names = [description[0] for description in cursor.description]
-    data = dict(zip(col_names, row))
 
-    # Rebuild the structure similar to what the MLB API returns
-    return {
-        "teams": {
-            "home": buildTeamStatsDict(data, "home"),
-            "away": buildTeamStatsDict(data, "away")
-        }
-    }
-def buildTeamStatsDict(data, prefix):
-    # Reverse map flattened stats to MLB API-style nested dict
-    return {
-        "team": {"id": data[f"{prefix}_team_id"]},
-        "teamStats": {
-            "batting": {
-                "runs": data[f"{prefix}_runs"],
-                "hits": data[f"{prefix}_hits"],
-                "doubles": data[f"{prefix}_doubles"],
-                "triples": data[f"{prefix}_triples"],
-                "homeRuns": data[f"{prefix}_home_runs"],
-                "strikeOuts": data[f"{prefix}_strikeouts"],
-                "baseOnBalls": data[f"{prefix}_walks"],
-                "hitByPitch": data[f"{prefix}_hit_by_pitch"],
-                "atBats": data[f"{prefix}_at_bats"],
-                "plateAppearances": data[f"{prefix}_plate_appearances"],
-                "totalBases": data[f"{prefix}_total_bases"],
-                "sacFlies": data[f"{prefix}_sac_flies"],
-                "sacBunts": data[f"{prefix}_sac_bunts"],
-                "obp": data[f"{prefix}_obp"],
-                "slg": data[f"{prefix}_slg"],
-                "ops": data[f"{prefix}_ops"],
-                "avg": data[f"{prefix}_avg"],
-                "rbi": data[f"{prefix}_rbi"],
-                "leftOnBase": data[f"{prefix}_left_on_base"],
-                "caughtStealing": data[f"{prefix}_caught_stealing"],
-                "stolenBases": data[f"{prefix}_stolen_bases"],
-                "stolenBasePercentage": data[f"{prefix}_stolen_base_percentage"],
-                "groundIntoDoublePlay": data[f"{prefix}_ground_into_double_play"],
-                "groundIntoTriplePlay": data[f"{prefix}_ground_into_triple_play"],
-                "pickoffs": data[f"{prefix}_pickoffs_batting"]
-            },
-            "pitching": {
-                "earnedRuns": data[f"{prefix}_earned_runs"],
-                "inningsPitched": data[f"{prefix}_innings_pitched"],
-                "strikeOuts": data[f"{prefix}_pitching_strikeouts"],
-                "baseOnBalls": data[f"{prefix}_pitching_walks"],
-                "hits": data[f"{prefix}_pitching_hits"],
-                "doubles": data[f"{prefix}_pitching_doubles"],
-                "triples": data[f"{prefix}_pitching_triples"],
-                "hitBatsmen": data[f"{prefix}_pitching_hit_batsmen"],
-                "sacFlies": data[f"{prefix}_pitching_sac_flies"],
-                "atBats": data[f"{prefix}_pitching_at_bats"],
-                "homeRuns": data[f"{prefix}_pitching_home_runs"],
-                "era": data[f"{prefix}_pitching_era"],
-                "whip": data[f"{prefix}_pitching_whip"],
-                "obp": data[f"{prefix}_pitching_obp"],
-                "battersFaced": data[f"{prefix}_pitching_batters_faced"],
-                "strikes": data[f"{prefix}_pitching_strikes"],
-                "balls": data[f"{prefix}_pitching_balls"],
-                "strikePercentage": data[f"{prefix}_pitching_strike_pct"],
-                "pickoffs": data[f"{prefix}_pitching_pickoffs"],
-                "inheritedRunners": data[f"{prefix}_pitching_inherited_runners"],
-                "inheritedRunnersScored": data[f"{prefix}_pitching_inherited_runners_scored"]
-            },
-            "fielding": {
-                "errors": data[f"{prefix}_errors"],
-                "assists": data[f"{prefix}_assists"],
-                "putOuts": data[f"{prefix}_putouts"],
-                "chances": data[f"{prefix}_fielding_chances"],
-                "passedBall": data[f"{prefix}_passed_ball"],
-                "caughtStealing": data[f"{prefix}_fielding_caught_stealing"],
-                "stolenBases": data[f"{prefix}_fielding_stolen_bases"],
-                "stolenBasePercentage": data[f"{prefix}_fielding_stolen_base_pct"],
-                "pickoffs": data[f"{prefix}_fielding_pickoffs"]
-            }
-        }
-    }
+    season_box_scores = {}
+    for row in cursor:
+        data = dict(zip(col_names, row))
+        season_box_scores[data["game_id"]] = (teamStatsFromRow(data, "home"), teamStatsFromRow(data, "away"))
+    return season_box_scores
 
 def extractTeamStats(team, prefix):
     batting = team["teamStats"]["batting"]
@@ -538,10 +680,62 @@ def selectOldSeasonGames(cursor, old_season):
     return games
 
 def selectCurrentSeasonGames(cursor, current_season):
-    cursor.execute(SELECT_CURRENT_SEASON_GAMES_IN_ORDER, (current_season,))
+    cursor.execute(SELECT_CURRENT_SEASON_GAMES_IN_ORDER, (current_season, localToday()))
     games = cursor.fetchall()
     return games
 
+def hashGameIds(games):
+    return hashlib.sha1(",".join(str(game[0]) for game in games).encode()).hexdigest()
+
+def selectFeatureCheckpoint(cursor, season, checkpoint_key):
+    cursor.execute(SELECT_FEATURE_CHECKPOINT, (season, checkpoint_key))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    return {
+        "checkpoint_date": row[0],
+        "last_game_id": row[1],
+        "games_processed": row[2],
+        "games_hash": row[3],
+        "team_state": json.loads(row[4])
+    }
+
+def checkpointIsIntact(checkpoint, games):
+    # the checkpoint is only usable if the games it covers are still exactly the first games of the season
+    if checkpoint is None or checkpoint["games_processed"] > len(games):
+        return False
+    if checkpoint["team_state"].get("version") != TEAM_STATE_VERSION:
+        return False
+    return hashGameIds(games[:checkpoint["games_processed"]]) == checkpoint["games_hash"]
+
+def otherFeatureCheckpointExists(cursor, season, checkpoint_key):
+    cursor.execute(SELECT_OTHER_FEATURE_CHECKPOINT, (season, checkpoint_key))
+    return cursor.fetchone() is not None
+
+def deleteOtherFeatureCheckpoints(cursor, season, checkpoint_key):
+    cursor.execute(DELETE_OTHER_FEATURE_CHECKPOINTS, (season, checkpoint_key))
+
+def deleteSeasonFeatures(cursor, games):
+    game_ids = [(game[0],) for game in games]
+    cursor.executemany(DELETE_FROM_FEATURES, game_ids)
+    cursor.executemany(DELETE_FROM_FEATURE_STORE, game_ids)
+
+def checkpointGamesProcessed(checkpoint):
+    return checkpoint["games_processed"] if checkpoint else 0
+
+def insertFeatureCheckpoint(cursor, season, checkpoint_key, processed_games, team_state_json):
+    last_game = processed_games[-1]
+    cursor.execute(INSERT_INTO_FEATURE_CHECKPOINTS, (
+        season,
+        checkpoint_key,
+        localGameDate(last_game[3]),
+        last_game[0],
+        len(processed_games),
+        hashGameIds(processed_games),
+        team_state_json
+    ))
+
 def calculate_metrics(stats, games=None):
     if games is None:
         games = stats.get("gamesPlayed", 0)
@@ -648,23 +842,19 @@ def calculate_metrics(stats, games=None):
         "hr_per_9": hr_per_9,
     }
 
-def buildFeatures(team_season_stats, team_rolling_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored):
+def buildFeatures(team_stats, home_team_id, away_team_id, home_runs_scored, away_runs_scored, rolling_prefixes=None):
+
+    if rolling_prefixes is None:
+        windows = team_stats.rolling_window_sizes
+        rolling_prefixes = rollingFeaturePrefixes(windows[0] if len(windows) == 1 else windows)
 
     features = {}
 
     for team_type, team_id in [("home", home_team_id), ("away", away_team_id)]:
         # Season stats
-        season_stats = team_season_stats[team_id]
+        season_stats = team_stats.seasonStats(team_id)
         season_metrics = calculate_metrics(season_stats)
 
-        # Rolling stats: convert deque/list stats to sums
-        rolling_stats = {
-            stat_name: sum(stat_values)
-            for stat_name, stat_values in team_rolling_stats[team_id].items()
-        }
-        number_rolling_games = len(team_rolling_stats[team_id]["runsScored"])
-        rolling_metrics = calculate_metrics(rolling_stats, games=number_rolling_games)
-
         # Add team IDs 
         features[f"{team_type}_team_id"] = team_id
 
@@ -672,126 +862,19 @@ def buildFeatures(team_season_stats, team_rolling_stats, home_team_id, away_team
         for key, val in season_metrics.items():
             features[f"season_{team_type}_avg_{key}"] = val
 
-        # Add rolling metrics with prefix 
-        for key, val in rolling_metrics.items():
-            features[f"rolling_{team_type}_avg_{key}"] = val
+        # Rolling stats: the engine keeps running sums over the last N games for every window
+        for window, prefix in rolling_prefixes:
+            rolling_stats, number_rolling_games = team_stats.rollingStats(team_id, window)
+            rolling_metrics = calculate_metrics(rolling_stats, games=number_rolling_games)
+
+            # Add rolling metrics with prefix 
+            for key, val in rolling_metrics.items():
+                features[f"{prefix}_{team_type}_avg_{key}"] = val
 
     features["label"] = 1 if home_runs_scored > away_runs_scored else 0
 
     return features
 
-def updateTeamSeasonStats(team_season_stats, home_team_id, away_team_id, home_stats, away_stats):
-    # Home team update
-    team_season_stats[home_team_id]["gamesPlayed"] += 1
-    team_season_stats[home_team_id]["runsScored"] += home_stats["home_runs"]
-    team_season_stats[home_team_id]["runsGiven"] += away_stats["away_runs"]
-    team_season_stats[home_team_id]["battingHits"] += home_stats["home_hits"]
-    team_season_stats[home_team_id]["atBats"] += home_stats["home_at_bats"]
-    team_season_stats[home_team_id]["battingWalks"] += home_stats["home_walks"]
-    team_season_stats[home_team_id]["hitByPitch"] += home_stats["home_hit_by_pitch"]
-    team_season_stats[home_team_id]["sacFlies"] += home_stats["home_sac_flies"]
-    team_season_stats[home_team_id]["totalBases"] += home_stats["home_total_bases"]
-    team_season_stats[home_team_id]["strikeouts"] += home_stats["home_strikeouts"]
-    team_season_stats[home_team_id]["plateAppearances"] += home_stats["home_plate_appearances"]
-    team_season_stats[home_team_id]["homeRuns"] += home_stats["home_home_runs"]
-
-    team_season_stats[home_team_id]["earnedRuns"] += home_stats["home_earned_runs"]
-    team_season_stats[home_team_id]["inningsPitched"] += home_stats["home_innings_pitched"]
-    team_season_stats[home_team_id]["pitchingHits"] += home_stats["home_pitching_hits"]
-    team_season_stats[home_team_id]["pitchingWalks"] += home_stats["home_pitching_walks"]
-    team_season_stats[home_team_id]["pitchingHitBatsmen"] += home_stats["home_pitching_hit_batsmen"]
-    team_season_stats[home_team_id]["pitchingSacFlies"] += home_stats["home_pitching_sac_flies"]
-    team_season_stats[home_team_id]["pitchingAtBats"] += home_stats["home_pitching_at_bats"]
-    team_season_stats[home_team_id]["pitchingDoubles"] += home_stats["home_pitching_doubles"]
-    team_season_stats[home_team_id]["pitchingTriples"] += home_stats["home_pitching_triples"]
-    team_season_stats[home_team_id]["pitchingHomeRuns"] += home_stats["home_pitching_home_runs"]
-    team_season_stats[home_team_id]["pitchingStrikeOuts"] += home_stats["home_pitching_strikeouts"]
-    team_season_stats[home_team_id]["pitchingBattersFaced"] += home_stats["home_pitching_batters_faced"]
-
-    # Away team update
-    team_season_stats[away_team_id]["gamesPlayed"] += 1
-    team_season_stats[away_team_id]["runsScored"] += away_stats["away_runs"]
-    team_season_stats[away_team_id]["runsGiven"] += home_stats["home_runs"]
-    team_season_stats[away_team_id]["battingHits"] += away_stats["away_hits"]
-    team_season_stats[away_team_id]["atBats"] += away_stats["away_at_bats"]
-    team_season_stats[away_team_id]["battingWalks"] += away_stats["away_walks"]
-    team_season_stats[away_team_id]["hitByPitch"] += away_stats["away_hit_by_pitch"]
-    team_season_stats[away_team_id]["sacFlies"] += away_stats["away_sac_flies"]
-    team_season_stats[away_team_id]["totalBases"] += away_stats["away_total_bases"]
-    team_season_stats[away_team_id]["strikeouts"] += away_stats["away_strikeouts"]
-    team_season_stats[away_team_id]["plateAppearances"] += away_stats["away_plate_appearances"]
-    team_season_stats[away_team_id]["homeRuns"] += away_stats["away_home_runs"]
-
-    team_season_stats[away_team_id]["earnedRuns"] += away_stats["away_earned_runs"]
-    team_season_stats[away_team_id]["inningsPitched"] += away_stats["away_innings_pitched"]
-    team_season_stats[away_team_id]["pitchingHits"] += away_stats["away_pitching_hits"]
-    team_season_stats[away_team_id]["pitchingWalks"] += away_stats["away_pitching_walks"]
-    team_season_stats[away_team_id]["pitchingHitBatsmen"] += away_stats["away_pitching_hit_batsmen"]
-    team_season_stats[away_team_id]["pitchingSacFlies"] += away_stats["away_pitching_sac_flies"]
-    team_season_stats[away_team_id]["pitchingAtBats"] += away_stats["away_pitching_at_bats"]
-    team_season_stats[away_team_id]["pitchingDoubles"] += away_stats["away_pitching_doubles"]
-    team_season_stats[away_team_id]["pitchingTriples"] += away_stats["away_pitching_triples"]
-    team_season_stats[away_team_id]["pitchingHomeRuns"] += away_stats["away_pitching_home_runs"]
-    team_season_stats[away_team_id]["pitchingStrikeOuts"] += away_stats["away_pitching_strikeouts"]
-    team_season_stats[away_team_id]["pitchingBattersFaced"] += away_stats["away_pitching_batters_faced"]
-
-def updateTeamRollingStats(team_rolling_stats, home_team_id, away_team_id, home_stats, away_stats):
-
-    # we can just append because dequeue has max_len of rolling window size so if it is at max (rolling window), then 
-    # it'll automatically pop the oldest game and append the newest game, keeping our rolling window of 5 most recent games
-
-    # Home team update
-    team_rolling_stats[home_team_id]["runsScored"].append(home_stats["home_runs"])
-    team_rolling_stats[home_team_id]["runsGiven"].append(away_stats["away_runs"])
-    team_rolling_stats[home_team_id]["battingHits"].append(home_stats["home_hits"])
-    team_rolling_stats[home_team_id]["atBats"].append(home_stats["home_at_bats"])
-    team_rolling_stats[home_team_id]["battingWalks"].append(home_stats["home_walks"])
-    team_rolling_stats[home_team_id]["hitByPitch"].append(home_stats["home_hit_by_pitch"])
-    team_rolling_stats[home_team_id]["sacFlies"].append(home_stats["home_sac_flies"])
-    team_rolling_stats[home_team_id]["totalBases"].append(home_stats["home_total_bases"])
-    team_rolling_stats[home_team_id]["strikeouts"].append(home_stats["home_strikeouts"])
-    team_rolling_stats[home_team_id]["plateAppearances"].append(home_stats["home_plate_appearances"])
-    team_rolling_stats[home_team_id]["homeRuns"].append(home_stats["home_home_runs"])
-    
-    team_rolling_stats[home_team_id]["earnedRuns"].append(home_stats["home_earned_runs"])
-    team_rolling_stats[home_team_id]["inningsPitched"].append(home_stats["home_innings_pitched"])
-    team_rolling_stats[home_team_id]["pitchingHits"].append(home_stats["home_pitching_hits"])
-    team_rolling_stats[home_team_id]["pitchingWalks"].append(home_stats["home_pitching_walks"])
-    team_rolling_stats[home_team_id]["pitchingHitBatsmen"].append(home_stats["home_pitching_hit_batsmen"])
-    team_rolling_stats[home_team_id]["pitchingSacFlies"].append(home_stats["home_pitching_sac_flies"])
-    team_rolling_stats[home_team_id]["pitchingAtBats"].append(home_stats["home_pitching_at_bats"])
-    team_rolling_stats[home_team_id]["pitchingDoubles"].append(home_stats["home_pitching_doubles"])
-    team_rolling_stats[home_team_id]["pitchingTriples"].append(home_stats["home_pitching_triples"])
-    team_rolling_stats[home_team_id]["pitchingHomeRuns"].append(home_stats["home_pitching_home_runs"])
-    team_rolling_stats[home_team_id]["pitchingStrikeOuts"].append(home_stats["home_pitching_strikeouts"])
-    team_rolling_stats[home_team_id]["pitchingBattersFaced"].append(home_stats["home_pitching_batters_faced"])
-
-    # Away team update
-    team_rolling_stats[away_team_id]["runsScored"].append(away_stats["away_runs"])
-    team_rolling_stats[away_team_id]["runsGiven"].append(home_stats["home_runs"])
-    team_rolling_stats[away_team_id]["battingHits"].append(away_stats["away_hits"])
-    team_rolling_stats[away_team_id]["atBats"].append(away_stats["away_at_bats"])
-    team_rolling_stats[away_team_id]["battingWalks"].append(away_stats["away_walks"])
-    team_rolling_stats[away_team_id]["hitByPitch"].append(away_stats["away_hit_by_pitch"])
-    team_rolling_stats[away_team_id]["sacFlies"].append(away_stats["away_sac_flies"])
-    team_rolling_stats[away_team_id]["totalBases"].append(away_stats["away_total_bases"])
-    team_rolling_stats[away_team_id]["strikeouts"].append(away_stats["away_strikeouts"])
-    team_rolling_stats[away_team_id]["plateAppearances"].append(away_stats["away_plate_appearances"])
-    team_rolling_stats[away_team_id]["homeRuns"].append(away_stats["away_home_runs"])
-
-    team_rolling_stats[away_team_id]["earnedRuns"].append(away_stats["away_earned_runs"])
-    team_rolling_stats[away_team_id]["inningsPitched"].append(away_stats["away_innings_pitched"])
-    team_rolling_stats[away_team_id]["pitchingHits"].append(away_stats["away_pitching_hits"])
-    team_rolling_stats[away_team_id]["pitchingWalks"].append(away_stats["away_pitching_walks"])
-    team_rolling_stats[away_team_id]["pitchingHitBatsmen"].append(away_stats["away_pitching_hit_batsmen"])
-    team_rolling_stats[away_team_id]["pitchingSacFlies"].append(away_stats["away_pitching_sac_flies"])
-    team_rolling_stats[away_team_id]["pitchingAtBats"].append(away_stats["away_pitching_at_bats"])
-    team_rolling_stats[away_team_id]["pitchingDoubles"].append(away_stats["away_pitching_doubles"])
-    team_rolling_stats[away_team_id]["pitchingTriples"].append(away_stats["away_pitching_triples"])
-    team_rolling_stats[away_team_id]["pitchingHomeRuns"].append(away_stats["away_pitching_home_runs"])
-    team_rolling_stats[away_team_id]["pitchingStrikeOuts"].append(away_stats["away_pitching_strikeouts"])
-    team_rolling_stats[away_team_id]["pitchingBattersFaced"].append(away_stats["away_pitching_batters_faced"])
-
 def calculate_obp(hits, walks, hbp, at_bats, sac_flies):
 
     # OBP = (Hits + Walks + Hit By Pitch) / (At Bats + Walks + Hit By Pitch + Sacrifice Flies)
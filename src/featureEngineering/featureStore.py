@@ -0,0 +1,116 @@
+import logging
+from functools import lru_cache
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+# bump whenever the meaning of an existing feature column changes (e.g. a metric formula)
+FEATURE_SCHEMA_VERSION = 1
+
+# feature dict keys that are stored as integers, everything else is a REAL column
+INTEGER_FEATURE_COLUMNS = ("home_team_id", "away_team_id", "label")
+
+CREATE_FEATURE_STORE_TABLE = """
+    CREATE TABLE IF NOT EXISTS FeatureStore
+    (
+        game_id INTEGER PRIMARY KEY,
+        schema_version INTEGER,
+        home_team_id INTEGER,
+        away_team_id INTEGER,
+        label INTEGER
+    )
+"""
+
+# generation counter bumped on every write, so caches built from FeatureStore know when they are stale
+CREATE_FEATURE_STORE_META_TABLE = """
+    CREATE TABLE IF NOT EXISTS FeatureStoreMeta
+    (
+        key TEXT PRIMARY KEY,
+        value INTEGER
+    )
+"""
+
+BUMP_FEATURE_STORE_GENERATION = """
+    INSERT INTO FeatureStoreMeta (key, value) VALUES ('generation', 1)
+    ON CONFLICT(key) DO UPDATE SET value = value + 1
+"""
+
+SELECT_FEATURE_STORE_COLUMNS = """
+    SELECT name FROM pragma_table_info('FeatureStore')
+"""
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def createFeatureStoreTable(cursor):
+    cursor.execute(CREATE_FEATURE_STORE_TABLE)
+    cursor.execute(CREATE_FEATURE_STORE_META_TABLE)
+
+def bumpFeatureStoreGeneration(cursor):
+    cursor.execute(BUMP_FEATURE_STORE_GENERATION)
+
+def selectFeatureStoreColumns(cursor):
+    cursor.execute(SELECT_FEATURE_STORE_COLUMNS)
+    return [row[0] for row in cursor.fetchall()]
+
+def ensureFeatureStoreColumns(cursor, feature_names):
+    """
+    Adds a REAL column to FeatureStore for every feature that doesn't have one yet,
+    e.g. the first time a new rolling window is built.
+
+    :param cursor: SQLite database cursor
+    :param feature_names: Feature names in the order buildFeatures produces them
+    :returns: None
+    """
+    existing_columns = set(selectFeatureStoreColumns(cursor))
+    for feature_name in feature_names:
+        if feature_name not in existing_columns:
+            logger.debug(f"Adding {feature_name} column to FeatureStore")
+            cursor.execute(f'ALTER TABLE FeatureStore ADD COLUMN "{feature_name}" REAL')
+
+@lru_cache(maxsize=None)
+def featureStoreInsertStatement(feature_names):
+    columns = ", ".join(f'"{feature_name}"' for feature_name in ("game_id", "schema_version") + feature_names)
+    placeholders = ", ".join(["?"] * (len(feature_names) + 2))
+    return f"INSERT OR REPLACE INTO FeatureStore ({columns}) VALUES ({placeholders})"
+
+def featureStoreRow(game_id, features_dict):
+    """
+    :param game_id: MLB game id
+    :param features_dict: Features built by buildFeatures
+    :returns: Tuple of (insert statement for these feature columns, row values)
+    """
+    statement = featureStoreInsertStatement(tuple(features_dict.keys()))
+    return statement, (game_id, FEATURE_SCHEMA_VERSION, *features_dict.values())
+
+def exportFeatureStore(conn, path):
+    """
+    Exports the whole FeatureStore table to a Parquet file, with the feature columns as float32.
+
+    :param conn: SQLite database connection
+    :param path: Path of the Parquet file to write
+    :returns: None
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to export the feature store, run pip install pyarrow")
+
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_sql_query("SELECT * FROM FeatureStore ORDER BY game_id", conn)
+    feature_columns = [
+        column for column in df.columns
+        if column not in ("game_id", "schema_version") + INTEGER_FEATURE_COLUMNS
+    ]
+    df[feature_columns] = df[feature_columns].astype(np.float32)
+    df.to_parquet(path, index=False)
@@ -0,0 +1,121 @@
+import requests
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from mlbApi.httpCache import HTTPCache
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# status codes from the MLB API that are worth retrying
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def createPooledSession(max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR):
+    """
+    Creates a requests Session whose connection pool is sized for max_workers concurrent requests
+    and which retries transient failures with exponential backoff.
+
+    :param max_workers: Number of threads that will share the session
+    :param max_retries: Number of retries per request before giving up
+    :param backoff_factor: Backoff factor between retries (sleep = factor * 2^(retry - 1))
+    :returns: Configured requests.Session
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"])
+    )
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetchBoxScore(session, base_url, game_id, http_cache=None, final=True):
+    """
+    Fetches the box score for a single game and trims it down to the team level stats.
+    The player level data makes up most of the payload and is never used, so it is dropped
+    to keep prefetched games cheap to hold in memory (and on disk when cached).
+
+    :param session: requests.Session used for the request
+    :param base_url: Base URL of the MLB API
+    :param game_id: MLB game id (gamePk)
+    :param http_cache: Optional HTTPCache, box scores are then read from / written to disk
+    :param final: Whether the box score can't change anymore (cached forever) or may still be corrected
+    :returns: Dictionary shaped like the MLB API box score, containing only team and teamStats
+    """
+    url = f"{base_url}game/{game_id}/boxscore"
+
+    if http_cache is not None:
+        endpoint_type = "boxscore_final" if final else "boxscore"
+        return http_cache.get(url, endpoint_type=endpoint_type, transform=trimBoxScore).data
+
+    response = session.get(url)
+    response.raise_for_status()
+    return trimBoxScore(response.json())
+
+def trimBoxScore(data):
+    return {
+        "teams": {
+            side: {
+                "team": {"id": data["teams"][side]["team"]["id"]},
+                "teamStats": data["teams"][side]["teamStats"]
+            }
+            for side in ("home", "away")
+        }
+    }
+
+def fetchBoxScores(game_ids, base_url, max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                   http_cache_dir=None, final_game_ids=None):
+    """
+    Downloads box scores for many games concurrently through a single pooled session.
+    Results are yielded as soon as each download completes, so callers can write them
+    out in batches instead of holding every payload at once.
+
+    :param game_ids: Iterable of MLB game ids to download
+    :param base_url: Base URL of the MLB API
+    :param max_workers: Maximum number of requests in flight at once
+    :param max_retries: Number of retries per request before giving up
+    :param backoff_factor: Backoff factor between retries
+    :param http_cache_dir: Directory of the on-disk HTTP cache, None to always download
+    :param final_game_ids: Games whose box scores can't change anymore, None if they all are final
+    :returns: Generator of (game_id, game_data) tuples in completion order
+    :raises requests.exceptions.HTTPError: If a box score still fails after all retries
+    """
+    game_ids = list(game_ids)
+    if not game_ids:
+        return
+
+    logger.debug(f"Fetching {len(game_ids)} box scores with {max_workers} workers")
+
+    session = createPooledSession(max_workers, max_retries, backoff_factor)
+    http_cache = HTTPCache(http_cache_dir, session) if http_cache_dir else None
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(
+                fetchBoxScore, session, base_url, game_id, http_cache,
+                final_game_ids is None or game_id in final_game_ids
+            ): game_id
+            for game_id in game_ids
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # don't keep downloading the rest of the queue if one request failed for good
+        executor.shutdown(wait=True, cancel_futures=True)
+        session.close()
@@ -0,0 +1,215 @@
+import numpy as np
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# bump whenever the serialized layout below changes so old checkpoints get rebuilt
+TEAM_STATE_VERSION = 2
+
+# every accumulated stat, in column order, with the box score column it comes from
+# and whether it is read from the team itself or from its opponent
+STAT_SOURCES = [
+
+    # OFFENSIVE/BATTING STATS
+    ("runsScored", "runs", "own"),
+    ("battingHits", "hits", "own"),
+    ("atBats", "at_bats", "own"),
+    ("battingWalks", "walks", "own"),
+    ("hitByPitch", "hit_by_pitch", "own"),
+    ("sacFlies", "sac_flies", "own"),
+    ("totalBases", "total_bases", "own"),
+    ("strikeouts", "strikeouts", "own"),
+    ("plateAppearances", "plate_appearances", "own"),
+    ("homeRuns", "home_runs", "own"),
+
+    # DEFENSIVE/PITCHING STATS
+    ("runsGiven", "runs", "opponent"),
+    ("pitchingHits", "pitching_hits", "own"),
+    ("pitchingWalks", "pitching_walks", "own"),
+    ("earnedRuns", "earned_runs", "own"),
+    ("inningsPitched", "innings_pitched", "own"),
+    ("pitchingHitBatsmen", "pitching_hit_batsmen", "own"),
+    ("pitchingSacFlies", "pitching_sac_flies", "own"),
+    ("pitchingAtBats", "pitching_at_bats", "own"),
+    ("pitchingDoubles", "pitching_doubles", "own"),
+    ("pitchingTriples", "pitching_triples", "own"),
+    ("pitchingHomeRuns", "pitching_home_runs", "own"),
+    ("pitchingStrikeOuts", "pitching_strikeouts", "own"),
+    ("pitchingBattersFaced", "pitching_batters_faced", "own")
+]
+
+STAT_NAMES = [stat_name for stat_name, _, _ in STAT_SOURCES]
+NUM_STATS = len(STAT_NAMES)
+
+# (side, key) pairs that fill each team's stat vector from the flattened box score stats
+HOME_VECTOR_KEYS = [("home", f"home_{column}") if source == "own" else ("away", f"away_{column}") for _, column, source in STAT_SOURCES]
+AWAY_VECTOR_KEYS = [("away", f"away_{column}") if source == "own" else ("home", f"home_{column}") for _, column, source in STAT_SOURCES]
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class TeamAccumulator:
+    """
+    Season totals and last N games for a single team, for several window sizes at once.
+
+    The last max(N) games live in one ring buffer of shape (max window, NUM_STATS) shared by
+    every window, next to a running sum vector per window, so adding a game and reading the
+    rolling totals are O(windows * NUM_STATS) no matter how long the season gets.
+    """
+
+    def __init__(self, rolling_window_sizes):
+        self.windows = np.asarray(rolling_window_sizes, dtype=np.int64)
+        self.games_played = 0
+        self.season_totals = np.zeros(NUM_STATS, dtype=np.float64)
+        self.history = np.zeros((self.windows.max(), NUM_STATS), dtype=np.float64)
+        self.rolling_sums = np.zeros((len(self.windows), NUM_STATS), dtype=np.float64)
+        # slot the next game is written to, and how many games each window holds
+        self.position = 0
+        self.rolling_counts = np.zeros(len(self.windows), dtype=np.int64)
+
+    def addGame(self, stat_vector):
+        self.games_played += 1
+        self.season_totals += stat_vector
+
+        # full windows drop the game that is exactly N games old before the new one comes in
+        full = self.rolling_counts == self.windows
+        if full.any():
+            oldest = (self.position - self.windows[full]) % len(self.history)
+            self.rolling_sums[full] -= self.history[oldest]
+        self.rolling_counts[~full] += 1
+
+        self.history[self.position] = stat_vector
+        self.rolling_sums += stat_vector
+        self.position = (self.position + 1) % len(self.history)
+
+    def historyOldestFirst(self):
+        stored = min(self.games_played, len(self.history))
+        if stored == 0:
+            return np.zeros((0, NUM_STATS), dtype=np.float64)
+        return np.roll(self.history, -self.position, axis=0)[-stored:]
+
+class TeamStatsEngine:
+    """
+    Per-team season-to-date and rolling window accumulators, keyed by team id.
+    Replaces the dict-of-deques state engineerFeatures used to keep per season.
+    """
+
+    def __init__(self, rolling_window_size):
+        self.rolling_window_sizes = normalizeWindowSizes(rolling_window_size)
+        self.teams = {}
+
+    def team(self, team_id):
+        accumulator = self.teams.get(team_id)
+        if accumulator is None:
+            accumulator = TeamAccumulator(self.rolling_window_sizes)
+            self.teams[team_id] = accumulator
+        return accumulator
+
+    def gamesPlayed(self, team_id):
+        accumulator = self.teams.get(team_id)
+        return accumulator.games_played if accumulator else 0
+
+    def update(self, home_team_id, away_team_id, home_stats, away_stats):
+        """
+        Adds one game to both teams' accumulators.
+
+        :param home_team_id: Home team id
+        :param away_team_id: Away team id
+        :param home_stats: Flattened home box score stats (see extractTeamStats)
+        :param away_stats: Flattened away box score stats (see extractTeamStats)
+        :returns: None
+        """
+        home_vector, away_vector = statVectors(home_stats, away_stats)
+        self.team(home_team_id).addGame(home_vector)
+        self.team(away_team_id).addGame(away_vector)
+
+    def seasonStats(self, team_id):
+        accumulator = self.team(team_id)
+        stats = dict(zip(STAT_NAMES, accumulator.season_totals.tolist()))
+        stats["gamesPlayed"] = accumulator.games_played
+        return stats
+
+    def rollingStats(self, team_id, rolling_window_size=None):
+        """
+        :param team_id: Team id
+        :param rolling_window_size: Which window to read, defaults to the first one
+        :returns: Tuple of (dict of rolling sums, number of games in the rolling window)
+        """
+        accumulator = self.team(team_id)
+        index = 0 if rolling_window_size is None else self.rolling_window_sizes.index(rolling_window_size)
+        return dict(zip(STAT_NAMES, accumulator.rolling_sums[index].tolist())), int(accumulator.rolling_counts[index])
+
+    def toState(self):
+        # ring buffers are stored oldest game first so they can be replayed on restore
+        return {
+            "version": TEAM_STATE_VERSION,
+            "rolling_window_sizes": self.rolling_window_sizes,
+            "teams": {
+                team_id: {
+                    "games_played": accumulator.games_played,
+                    "season_totals": accumulator.season_totals.tolist(),
+                    "rolling_sums": accumulator.rolling_sums.tolist(),
+                    "history": accumulator.historyOldestFirst().tolist()
+                }
+                for team_id, accumulator in self.teams.items()
+            }
+        }
+
+    @classmethod
+    def fromState(cls, state):
+        engine = cls(state["rolling_window_sizes"])
+        # json turns the team id keys into strings, so convert them back
+        for team_id, team_state in state["teams"].items():
+            accumulator = engine.team(int(team_id))
+            for stat_vector in team_state["history"]:
+                accumulator.addGame(np.asarray(stat_vector, dtype=np.float64))
+            accumulator.games_played = team_state["games_played"]
+            accumulator.season_totals = np.asarray(team_state["season_totals"], dtype=np.float64)
+            # restore the running sums as saved so a resumed run matches an uninterrupted one exactly
+            accumulator.rolling_sums = np.asarray(team_state["rolling_sums"], dtype=np.float64)
+        return engine
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def statVectors(home_stats, away_stats):
+    """
+    Builds the per-game stat vectors (in STAT_NAMES order) for both teams of a game.
+
+    :param home_stats: Flattened home box score stats (see extractTeamStats)
+    :param away_stats: Flattened away box score stats (see extractTeamStats)
+    :returns: Tuple of (home_vector, away_vector) as float64 arrays
+    """
+    stats = {"home": home_stats, "away": away_stats}
+    home_vector = np.array([stats[side][key] for side, key in HOME_VECTOR_KEYS], dtype=np.float64)
+    away_vector = np.array([stats[side][key] for side, key in AWAY_VECTOR_KEYS], dtype=np.float64)
+
+    return home_vector, away_vector
+
+def normalizeWindowSizes(rolling_window_size):
+    # a single window is passed as an int, several as a list
+    if isinstance(rolling_window_size, int):
+        return [rolling_window_size]
+    return sorted(set(int(window) for window in rolling_window_size))
+
+def rollingFeaturePrefixes(rolling_window_size):
+    """
+    Feature name prefix for each rolling window. A single int window keeps the original
+    "rolling" prefix so existing models keep working; a list of windows gets one prefix
+    per window (e.g. "rolling5", "rolling10") so they can be stored side by side.
+
+    :param rolling_window_size: Window size as an int, or a list of window sizes
+    :returns: List of (window size, prefix) tuples
+    """
+    if isinstance(rolling_window_size, int):
+        return [(rolling_window_size, "rolling")]
+    return [(window, f"rolling{window}") for window in normalizeWindowSizes(rolling_window_size)]
+
+def windowKey(rolling_window_size):
+    # how a window configuration is stored in FeatureCheckpoints
+    if isinstance(rolling_window_size, int):
+        return rolling_window_size
+    return "[" + ",".join(str(window) for window in normalizeWindowSizes(rolling_window_size)) + "]"
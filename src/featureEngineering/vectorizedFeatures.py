@@ -0,0 +1,226 @@
+import logging
+import numpy as np
+import pandas as pd
+from featureEngineering.teamAccumulators import STAT_SOURCES, STAT_NAMES, TEAM_STATE_VERSION, normalizeWindowSizes, rollingFeaturePrefixes
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+SELECT_OLD_SEASON_BOX_SCORES_IN_ORDER = """
+    SELECT B.*
+    FROM OldGames AS G
+    INNER JOIN GameBoxScoreStats AS B
+    ON G.game_id = B.game_id
+    WHERE G.season = ? AND G.status_code != 'Cancelled'
+    ORDER BY G.date_time ASC, G.game_id ASC
+"""
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def buildSeasonFeatures(conn, season, rolling_window_size):
+    """
+    Builds the features for every game of a finished season at once, instead of replaying
+    the season game by game. Produces the same rows as the per-game path in engineerFeatures:
+    season-to-date totals are shifted cumulative sums per team, rolling totals are the
+    difference of those sums N games apart, and the metrics are computed with array arithmetic.
+
+    :param conn: SQLite database connection
+    :param season: Season year as a string (e.g., "2015")
+    :param rolling_window_size: Number of games to include in rolling stats, or a list of window sizes
+    :returns: Tuple of (list of (game_id, features dict), end of season TeamStatsEngine state),
+              or None if some games of the season have no stored box score
+    """
+    box_scores = pd.read_sql_query(SELECT_OLD_SEASON_BOX_SCORES_IN_ORDER, conn, params=(season,))
+    num_games = conn.execute(
+        "SELECT COUNT(*) FROM OldGames WHERE season = ? AND status_code != 'Cancelled'", (season,)
+    ).fetchone()[0]
+
+    if len(box_scores) != num_games:
+        logger.debug(f"{num_games - len(box_scores)} box scores missing for {season} season, can't batch build it")
+        return None
+
+    windows = normalizeWindowSizes(rolling_window_size)
+    state = {"version": TEAM_STATE_VERSION, "rolling_window_sizes": windows, "teams": {}}
+
+    if num_games == 0:
+        return [], state
+
+    team_games = buildTeamGameFrame(box_scores)
+    stats = team_games[STAT_NAMES].to_numpy(dtype=np.float64)
+    team_ids = team_games["team_id"].to_numpy()
+
+    # per team running totals: totals before each game and, per window, the last N games before it.
+    # every window is read off the same prefix sums, so extra windows cost one subtraction each
+    prior_totals = np.zeros_like(stats)
+    rolling_totals = {window: np.zeros_like(stats) for window in windows}
+    games_played = np.zeros(len(team_games), dtype=np.int64)
+
+    for team_id, rows in team_games.groupby("team_id", sort=False).indices.items():
+        cumulative = np.cumsum(stats[rows], axis=0)
+        before = np.vstack([np.zeros((1, len(STAT_NAMES))), cumulative])
+
+        prior_totals[rows] = before[:-1]
+        for window in windows:
+            lagged = np.vstack([np.zeros((window, len(STAT_NAMES))), before])[:len(rows)]
+            rolling_totals[window][rows] = before[:-1] - lagged
+        games_played[rows] = np.arange(len(rows))
+
+        # end of season state, in the same layout TeamStatsEngine.toState writes for checkpoints
+        state["teams"][int(team_id)] = {
+            "games_played": len(rows),
+            "season_totals": cumulative[-1].tolist(),
+            "rolling_sums": [stats[rows][-window:].sum(axis=0).tolist() for window in windows],
+            "history": stats[rows][-max(windows):].tolist()
+        }
+
+    season_metrics = calculateMetricsArrays(dict(zip(STAT_NAMES, prior_totals.T)), games_played)
+    rolling_metrics = {
+        prefix: calculateMetricsArrays(dict(zip(STAT_NAMES, rolling_totals[window].T)), np.minimum(games_played, window))
+        for window, prefix in rollingFeaturePrefixes(rolling_window_size)
+    }
+
+    # team_games holds the home row then the away row of each game, in game order
+    home = np.arange(0, len(team_games), 2)
+    away = home + 1
+    home_runs = box_scores["home_runs"].to_numpy()
+    away_runs = box_scores["away_runs"].to_numpy()
+
+    # same rule as the per-game path: both teams filled the largest window already and the game wasn't a tie
+    keep = np.flatnonzero(
+        (games_played[home] >= max(windows)) &
+        (games_played[away] >= max(windows)) &
+        (home_runs != away_runs)
+    )
+
+    columns = {}
+    for team_type, side_rows in [("home", home), ("away", away)]:
+        columns[f"{team_type}_team_id"] = team_ids[side_rows][keep].tolist()
+        for key, values in season_metrics.items():
+            columns[f"season_{team_type}_avg_{key}"] = values[side_rows][keep].tolist()
+        for prefix, metrics in rolling_metrics.items():
+            for key, values in metrics.items():
+                columns[f"{prefix}_{team_type}_avg_{key}"] = values[side_rows][keep].tolist()
+    columns["label"] = (home_runs[keep] > away_runs[keep]).astype(int).tolist()
+
+    names = list(columns.keys())
+    game_ids = box_scores["game_id"].to_numpy()[keep].tolist()
+    rows = [
+        (game_id, dict(zip(names, values)))
+        for game_id, values in zip(game_ids, zip(*columns.values()))
+    ]
+
+    return rows, state
+
+def buildTeamGameFrame(box_scores):
+    """
+    Turns one row per game into two rows per game (home then away), each holding that team's
+    stats in STAT_NAMES order, the same way statVectors does for a single game.
+
+    :param box_scores: DataFrame of GameBoxScoreStats rows in game order
+    :returns: DataFrame with team_id and one column per stat
+    """
+    num_rows = 2 * len(box_scores)
+
+    # row 2i is the home team and row 2i + 1 the away team of game i
+    team_ids = np.empty(num_rows, dtype=np.int64)
+    team_ids[0::2] = box_scores["home_team_id"].to_numpy()
+    team_ids[1::2] = box_scores["away_team_id"].to_numpy()
+    columns = {"team_id": team_ids}
+
+    for stat_name, column, source in STAT_SOURCES:
+        values = np.empty(num_rows, dtype=np.float64)
+        if source == "own":
+            values[0::2] = box_scores[f"home_{column}"].to_numpy(dtype=np.float64)
+            values[1::2] = box_scores[f"away_{column}"].to_numpy(dtype=np.float64)
+        else:
+            values[0::2] = box_scores[f"away_{column}"].to_numpy(dtype=np.float64)
+            values[1::2] = box_scores[f"home_{column}"].to_numpy(dtype=np.float64)
+        columns[stat_name] = values
+
+    return pd.DataFrame(columns)
+
+def safeDivide(numerator, denominator):
+    # mirrors "x / y if y > 0 else 0" from calculate_metrics
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    result = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+def calculateMetricsArrays(stats, games):
+    """
+    Array version of calculate_metrics: every stat is a vector with one entry per team-game.
+
+    :param stats: Dictionary mapping stat name (STAT_NAMES) -> array of totals
+    :param games: Array with the number of games each total covers
+    :returns: Dictionary mapping metric name -> array, in the same order as calculate_metrics
+    """
+
+    # ----------------------------- #
+    #    BATTING / OFFENSIVE STATS  #
+    # ----------------------------- #
+
+    batting_hits = stats["battingHits"]
+    at_bats = stats["atBats"]
+    batting_walks = stats["battingWalks"]
+    hit_by_pitch = stats["hitByPitch"]
+    sac_flies = stats["sacFlies"]
+    plate_appearances = stats["plateAppearances"]
+    home_runs = stats["homeRuns"]
+    strikeouts = stats["strikeouts"]
+
+    avg_obp = safeDivide(batting_hits + batting_walks + hit_by_pitch, at_bats + batting_walks + hit_by_pitch + sac_flies)
+    avg_slg = safeDivide(stats["totalBases"], at_bats)
+
+    # ----------------------------- #
+    #    PITCHING / DEFENSIVE STATS #
+    # ----------------------------- #
+
+    innings_pitched = stats["inningsPitched"]
+    hits_allowed = stats["pitchingHits"]
+    walks_allowed = stats["pitchingWalks"]
+    pitching_hit_batsmen = stats["pitchingHitBatsmen"]
+    pitching_at_bats = stats["pitchingAtBats"]
+    pitching_doubles = stats["pitchingDoubles"]
+    pitching_triples = stats["pitchingTriples"]
+    pitching_home_runs = stats["pitchingHomeRuns"]
+    pitching_strikeouts = stats["pitchingStrikeOuts"]
+
+    opponent_obp = safeDivide(
+        hits_allowed + walks_allowed + pitching_hit_batsmen,
+        pitching_at_bats + walks_allowed + pitching_hit_batsmen + stats["pitchingSacFlies"]
+    )
+    pitching_singles = hits_allowed - pitching_doubles - pitching_triples - pitching_home_runs
+    total_bases_allowed = (
+        1 * pitching_singles +
+        2 * pitching_doubles +
+        3 * pitching_triples +
+        4 * pitching_home_runs
+    )
+    opponent_slg = safeDivide(total_bases_allowed, pitching_at_bats)
+
+    return {
+        "runs_scored": safeDivide(stats["runsScored"], games),
+        "batting_avg": safeDivide(batting_hits, at_bats),
+        "obp": avg_obp,
+        "slg": avg_slg,
+        "ops": avg_obp + avg_slg,
+        "batting_k_pct": safeDivide(strikeouts, plate_appearances),
+        "bb_pct": safeDivide(batting_walks, plate_appearances),
+        "babip": safeDivide(batting_hits - home_runs, at_bats - strikeouts - home_runs + sac_flies),
+        "runs_given": safeDivide(stats["runsGiven"], games),
+        "era": safeDivide(stats["earnedRuns"] * 9, innings_pitched),
+        "whip": safeDivide(hits_allowed + walks_allowed, innings_pitched),
+        "opponent_obp": opponent_obp,
+        "opponent_slg": opponent_slg,
+        "opponent_ops": opponent_obp + opponent_slg,
+        "k_per_9": safeDivide(pitching_strikeouts * 9, innings_pitched),
+        "pitching_k_pct": safeDivide(pitching_strikeouts, stats["pitchingBattersFaced"]),
+        "bb_per_9": safeDivide(walks_allowed * 9, innings_pitched),
+        "hr_per_9": safeDivide(pitching_home_runs * 9, innings_pitched),
+    }
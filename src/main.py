@@ -1,7 +1,7 @@
 
 from teamsInitializer.initializeTeams import fetchMLBTeams
 from scheduleUpdater.fetchCurrentSchedule import fetchAndUpdateCurrentSchedule
-from scheduleUpdater.fetchOldSeasons import fetchAndUpdateOldSeason
+from scheduleUpdater.fetchOldSeasons import fetchAndUpdateOldSeasons
 from featureEngineering.createFeatures import engineerFeatures
 from dailyPrediction.computeDailyPredictions import computeDailyPredictions
 import logging
@@ -28,7 +28,7 @@ def main():
 
     :calls: 
         - fetchMLBTeams(base_url): Loads all MLB team metadata.
-        - fetchAndUpdateOldSeason(season, base_url): Loads historical game data for past seasons.
+        - fetchAndUpdateOldSeasons(old_seasons, base_url): Loads historical game data for past seasons, all seasons fetched concurrently.
         - fetchAndUpdateCurrentSchedule(current_season, base_url): Loads the current season's game schedule.
         - engineerFeatures(rolling_window_size, base_url): Computes and stores features using a rolling window.
     
@@ -42,8 +42,7 @@ def main():
     print('here inside main')
     fetchMLBTeams(base_url)
     old_seasons = ["2015", "2016", "2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024"]
-    for season in old_seasons:
-        fetchAndUpdateOldSeason(season, base_url)
+    fetchAndUpdateOldSeasons(old_seasons, base_url)
     fetchAndUpdateCurrentSchedule(current_season, base_url)
     engineerFeatures(rolling_window_size=5, base_url = base_url)
 
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, NamedTuple
+from urllib.parse import urlencode
+import requests
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_CACHE_DIR = os.environ.get("MLB_HTTP_CACHE_DIR", "databases/http_cache")
+
+# how long a cached response is used without asking the API again, in seconds.
+# None never expires, 0 always revalidates (cheap when the API answers 304 Not Modified)
+ENDPOINT_TTLS = {
+    "teams": 14 * 24 * 3600,
+    "boxscore_final": None,
+    "boxscore": 3600,
+    "schedule_old": 24 * 3600,
+    "schedule": 5 * 60,
+    "schedule_window": 60,
+}
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class CachedResponse(NamedTuple):
+    data: Any               # parsed JSON payload (after transform)
+    changed: bool           # False if the payload is the same as the last one a caller committed (see HTTPCache.commit)
+    from_cache: bool        # True if no body was downloaded (fresh entry or 304 Not Modified)
+    content_hash: str
+
+class HTTPCache:
+    """
+    On-disk cache for GET requests to the MLB API. Entries live for a TTL that depends on the
+    endpoint type; once expired they are revalidated with If-None-Match / If-Modified-Since, and
+    every payload is hashed so callers can skip their own work when nothing changed.
+
+    A payload only counts as seen once the caller stored it: call commit() after the database
+    transaction built from the responses committed. Until then the same payload keeps coming back
+    with changed=True, so a rolled back update is retried on the next run instead of skipped.
+
+    Usage:
+        http_cache = HTTPCache()
+        response = http_cache.get(url, params=params)
+        if response.changed:
+            ...write response.data...
+        conn.commit()
+        http_cache.commit()
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, session=None, ttls=None):
+        self.cache_dir = cache_dir
+        self.session = session or requests.Session()
+        self.ttls = {**ENDPOINT_TTLS, **(ttls or {})}
+
+        # key -> content hash of every payload handed out since the last commit, gets are made from several threads
+        self.uncommitted = {}
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, endpoint_type=None, transform=None):
+        """
+        :param url: Full URL of the request
+        :param params: Query parameters
+        :param endpoint_type: Key of ENDPOINT_TTLS, defaults to a guess from the URL
+        :param transform: Optional function applied to the JSON payload before it's cached
+                          (e.g. to drop the parts of a box score that are never used)
+        :returns: CachedResponse
+        :raises requests.exceptions.HTTPError: If the API answers with an error status
+        """
+        endpoint_type = endpoint_type or endpointType(url)
+        ttl = self.ttls.get(endpoint_type, 0)
+        key = cacheKey(url, params)
+        meta, data = self.readEntry(key)
+
+        if meta is not None and (ttl is None or time.time() - meta["fetched_at"] < ttl):
+            return self.response(key, meta, data, meta["content_hash"], True)
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, params=params, headers=headers)
+
+        if response.status_code == 304 and meta is not None:
+            logger.debug(f"{url} not modified")
+            meta["fetched_at"] = time.time()
+            self.writeMeta(key, meta)
+            return self.response(key, meta, data, meta["content_hash"], True)
+
+        response.raise_for_status()
+        data = response.json()
+        if transform is not None:
+            data = transform(data)
+
+        body = json.dumps(data, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        content_hash = hashlib.sha256(body).hexdigest()
+
+        self.writeEntry(key, {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "committed_hash": meta.get("committed_hash") if meta is not None else None,
+            "fetched_at": time.time()
+        }, body)
+
+        return self.response(key, meta, data, content_hash, False)
+
+    def response(self, key, meta, data, content_hash, from_cache):
+        # entries cached before commit() existed have no committed_hash, they count as changed once
+        changed = meta is None or meta.get("committed_hash") != content_hash
+        with self.lock:
+            self.uncommitted[key] = content_hash
+        return CachedResponse(data, changed, from_cache, content_hash)
+
+    def commit(self):
+        """
+        Marks every payload returned since the last commit as stored, so fetching it again
+        gives changed=False. Call it after the database transaction that used them committed.
+
+        :returns: None
+        """
+        with self.lock:
+            uncommitted, self.uncommitted = self.uncommitted, {}
+
+        for key, content_hash in uncommitted.items():
+            meta_path, _ = self.entryPaths(key)
+            try:
+                with open(meta_path, "r") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta["committed_hash"] = content_hash
+            self.writeMeta(key, meta)
+
+    def entryPaths(self, key):
+        # shard by the first two hex digits so a full box score history doesn't end up in one directory
+        directory = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(directory, f"{key}.meta.json"), os.path.join(directory, f"{key}.json")
+
+    def readEntry(self, key):
+        meta_path, body_path = self.entryPaths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return None, None
+        return meta, data
+
+    def writeEntry(self, key, meta, body):
+        meta_path, body_path = self.entryPaths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        writeAtomically(body_path, body)
+        # the meta file goes last, an entry without it is treated as missing
+        self.writeMeta(key, meta)
+
+    def writeMeta(self, key, meta):
+        meta_path, _ = self.entryPaths(key)
+        writeAtomically(meta_path, json.dumps(meta).encode("utf-8"))
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def cacheKey(url, params=None):
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    return hashlib.sha1(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+def endpointType(url):
+    if url.rstrip("/").endswith("teams"):
+        return "teams"
+    if url.rstrip("/").endswith("boxscore"):
+        return "boxscore"
+    return "schedule"
+
+def writeAtomically(path, content):
+    # unique temp name per thread, box scores are cached from several threads at once
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
@@ -0,0 +1,234 @@
+import os
+import sys
+from typing import NamedTuple
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from odds.calculateUnitSize import calculateUnitSizeArrays, moneyLineToPayoutArray, MIN_EXPECTED_ROI, MAX_EXPECTED_ROI
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+DEFAULT_MIN_ROI = MIN_EXPECTED_ROI
+DEFAULT_MAX_ROI = MAX_EXPECTED_ROI
+DEFAULT_UNIT_MULTIPLIER = 5
+
+# Confidence bin setup (0.10 to 1.00 in steps of 0.05)
+CONFIDENCE_BIN_EDGES = np.arange(0.10, 1.01, 0.05)
+CONFIDENCE_BIN_LABELS = [
+    f"{CONFIDENCE_BIN_EDGES[i]:.2f}-{CONFIDENCE_BIN_EDGES[i+1]:.2f}" for i in range(len(CONFIDENCE_BIN_EDGES) - 1)
+]
+
+UNIT_SIZE_BUCKET_EDGES = np.array([0.5, 1, 2, 3])
+UNIT_SIZE_BUCKET_LABELS = ["0-0.49", "0.5-0.99", "1-1.99", "2-2.99", "3+"]
+
+# 0-5, 5-10, ..., 75-80, then everything else goes to 80+
+EXPECTED_ROI_BUCKET_EDGES = np.arange(0, 85, 5)
+EXPECTED_ROI_BUCKET_LABELS = [
+    f"{low}-{high}" for low, high in zip(EXPECTED_ROI_BUCKET_EDGES[:-1], EXPECTED_ROI_BUCKET_EDGES[1:])
+] + ["80+"]
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class BacktestResult(NamedTuple):
+    total_profit: float
+    total_bets: int
+    correct_bets: int
+    incorrect_bets: int
+    total_wagered: float
+    unit_size_won: float
+    unit_size_lost: float
+    skipped_games: int
+    home_bets: int
+    home_profit: float
+    home_correct: int
+    away_bets: int
+    away_profit: float
+    away_correct: int
+
+    # bucket label -> dict of per bucket arrays (count, profit, correct, wagered, ...)
+    confidence_bins: dict
+    unit_size_buckets: dict
+    expected_roi_buckets: dict
+
+    # one entry per game, in input order
+    bets: np.ndarray            # True if a bet was placed
+    side: np.ndarray            # 1 home, 0 away, -1 no positive EV side
+    unit_size: np.ndarray
+    expected_roi: np.ndarray
+    confidence: np.ndarray      # model probability of the side that was picked
+    profit: np.ndarray          # 0 for skipped games
+
+    @property
+    def hit_rate(self):
+        return self.correct_bets / self.total_bets if self.total_bets else 0
+
+    @property
+    def roi(self):
+        return self.total_profit / self.total_wagered if self.total_wagered else 0
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def runBacktest(home_proba, away_proba, home_odds, away_odds, home_won,
+                min_roi=DEFAULT_MIN_ROI, max_roi=DEFAULT_MAX_ROI, unit_multiplier=DEFAULT_UNIT_MULTIPLIER, side=None):
+    """
+    Simulates betting on a set of games with array arithmetic, same rules as the calculateTotalProfit loop:
+    bet the positive EV side (calculateUnitSize), skip it if its expected ROI is outside [min_roi, max_roi],
+    win unit_size * payout or lose unit_size.
+
+    :param home_proba: Model home win probabilities
+    :param away_proba: Model away win probabilities
+    :param home_odds: Home moneyline odds (numbers or strings like "+120")
+    :param away_odds: Away moneyline odds
+    :param home_won: True where the home team won
+    :param min_roi: Smallest expected ROI (in %) that still gets a bet
+    :param max_roi: Largest expected ROI (in %) that still gets a bet
+    :param unit_multiplier: Unit size is expected ROI times this
+    :param side: None to bet either side, "home" or "away" to only place bets on that side
+    :returns: BacktestResult
+    """
+    home_proba = np.asarray(home_proba, dtype=np.float64)
+    away_proba = np.asarray(away_proba, dtype=np.float64)
+    home_won = np.asarray(home_won, dtype=bool)
+
+    bet_side, unit_size, expected_roi = calculateUnitSizeArrays(home_proba, away_proba, home_odds, away_odds, unit_multiplier)
+    home_payout = moneyLineToPayoutArray(home_odds)
+    away_payout = moneyLineToPayoutArray(away_odds)
+
+    bets = (bet_side >= 0) & (expected_roi >= min_roi) & (expected_roi <= max_roi)
+    if side == "home":
+        bets &= bet_side == 1
+    elif side == "away":
+        bets &= bet_side == 0
+    elif side is not None:
+        raise ValueError("side must be None, 'home' or 'away'")
+
+    on_home = bet_side == 1
+    correct = bets & (on_home == home_won)
+    wagered = np.where(bets, unit_size, 0.0)
+    payout = np.where(on_home, home_payout, away_payout)
+    profit = np.where(correct, unit_size * payout, -wagered)
+    confidence = np.where(on_home, home_proba, away_proba)
+
+    home_bets = bets & on_home
+    away_bets = bets & ~on_home
+
+    # only placed bets go into the buckets
+    bet_rows = np.flatnonzero(bets)
+    bet_profit = profit[bet_rows]
+    bet_correct = correct[bet_rows].astype(np.float64)
+    bet_units = unit_size[bet_rows]
+    bet_confidence = confidence[bet_rows]
+
+    confidence_index = np.digitize(bet_confidence, CONFIDENCE_BIN_EDGES) - 1
+    in_range = (confidence_index >= 0) & (confidence_index < len(CONFIDENCE_BIN_LABELS))
+    confidence_bins = bucketStats(
+        confidence_index[in_range], CONFIDENCE_BIN_LABELS,
+        profit=bet_profit[in_range], correct=bet_correct[in_range], wagered=bet_units[in_range],
+        sum_confidence=bet_confidence[in_range]
+    )
+
+    unit_size_index = np.digitize(bet_units, UNIT_SIZE_BUCKET_EDGES)
+    unit_size_buckets = bucketStats(
+        unit_size_index, UNIT_SIZE_BUCKET_LABELS,
+        profit=bet_profit, correct=bet_correct, wagered=bet_units
+    )
+
+    roi_index = np.digitize(expected_roi[bet_rows], EXPECTED_ROI_BUCKET_EDGES) - 1
+    roi_index[roi_index < 0] = len(EXPECTED_ROI_BUCKET_LABELS) - 1
+    expected_roi_buckets = bucketStats(
+        roi_index, EXPECTED_ROI_BUCKET_LABELS,
+        profit=bet_profit, correct=bet_correct, wagered=bet_units
+    )
+
+    return BacktestResult(
+        total_profit=float(bet_profit.sum()),
+        total_bets=len(bet_rows),
+        correct_bets=int(correct.sum()),
+        incorrect_bets=int(len(bet_rows) - correct.sum()),
+        total_wagered=float(bet_units.sum()),
+        unit_size_won=float(unit_size[correct].sum()),
+        unit_size_lost=float(unit_size[bets & ~correct].sum()),
+        skipped_games=int(len(bets) - len(bet_rows)),
+        home_bets=int(home_bets.sum()),
+        home_profit=float(profit[home_bets].sum()),
+        home_correct=int((correct & on_home).sum()),
+        away_bets=int(away_bets.sum()),
+        away_profit=float(profit[away_bets].sum()),
+        away_correct=int((correct & ~on_home).sum()),
+        confidence_bins=confidence_bins,
+        unit_size_buckets=unit_size_buckets,
+        expected_roi_buckets=expected_roi_buckets,
+        bets=bets,
+        side=bet_side,
+        unit_size=unit_size,
+        expected_roi=expected_roi,
+        confidence=confidence,
+        profit=profit
+    )
+
+def bucketStats(bucket_index, labels, **weights):
+    # count plus the sum of every weight array per bucket, all in one bincount each
+    stats = {"labels": labels, "count": np.bincount(bucket_index, minlength=len(labels))}
+    for name, values in weights.items():
+        stats[name] = np.bincount(bucket_index, weights=values, minlength=len(labels))
+    return stats
+
+def printBacktestReport(result, model_name, feature_method):
+    """
+    Prints the summary and bucket tables of a backtest, in the same layout calculateTotalProfit always had.
+
+    :param result: BacktestResult from runBacktest
+    :param model_name: Model name, only printed
+    :param feature_method: Feature method, only printed
+    :returns: None
+    """
+    print("\nFINAL STATS")
+    print(f"Model: {model_name}")
+    print(f"Feature Method: {feature_method}")
+    print(f"Total Profit: {result.total_profit:.2f} units")
+    if result.total_bets > 0:
+        print(f"Hit Rate: {round(result.correct_bets / result.total_bets * 100, 2)}%")
+        print(f"ROI: {result.total_profit / result.total_wagered * 100:.2f}%")
+    print(f"Total Bets Placed: {result.total_bets}")
+    print(f"Amount Wagered: {result.total_wagered:.2f} units")
+    print(f"Correct Bets: {result.correct_bets}")
+    print(f"Incorrect Bets: {result.incorrect_bets}")
+    print(f"Correct Bets Avg Unit Size: {result.unit_size_won / result.correct_bets if result.correct_bets else 0:.2f}")
+    print(f"Wrong Bets Avg Unit Size: {result.unit_size_lost / result.incorrect_bets if result.incorrect_bets else 0:.2f}")
+    print(f"Skipped Games: {result.skipped_games}")
+    print(f"Home Bets: {result.home_bets}, Profit: {result.home_profit:.2f}, Correct: {result.home_correct}, Hit Rate: {result.home_correct/result.home_bets if result.home_bets else 0:.2%}")
+    print(f"Away Bets: {result.away_bets}, Profit: {result.away_profit:.2f}, Correct: {result.away_correct}, Hit Rate: {result.away_correct/result.away_bets if result.away_bets else 0:.2%}")
+
+    print("\nCONFIDENCE BINNING PROFIT ANALYSIS:")
+    print(f"{'Bin':<11} {'Count':>6} {'Avg Conf':>9} {'Win Rate':>9} {'Total Profit':>13} {'Avg Profit/Bet':>15}")
+    bins = result.confidence_bins
+    for i, bin_key in enumerate(bins["labels"]):
+        count = bins["count"][i]
+        if count == 0:
+            continue
+        avg_conf = bins["sum_confidence"][i] / count
+        win_rate = bins["correct"][i] / count
+        avg_profit_per_bet = bins["profit"][i] / count
+        print(f"{bin_key:<11} {count:6} {avg_conf:9.3f} {win_rate:9.3f} {bins['profit'][i]:13.2f} {avg_profit_per_bet:15.4f}")
+
+    print("\nPROFIT BY UNIT SIZE BUCKETS:")
+    print(f"{'Bucket':<10} {'Count':>6} {'Profit':>10} {'Wagered':>10} {'Hit Rate':>10}")
+    printBucketTable(result.unit_size_buckets)
+
+    print("\nPROFIT BY EXPECTED ROI BUCKETS:")
+    print(f"{'Bucket':<10} {'Count':>6} {'Profit':>10} {'Wagered':>10} {'Hit Rate':>10}")
+    printBucketTable(result.expected_roi_buckets)
+
+def printBucketTable(buckets):
+    for i, bucket_key in enumerate(buckets["labels"]):
+        count = buckets["count"][i]
+        if count == 0:
+            continue
+        hit_rate = buckets["correct"][i] / count
+        print(f"{bucket_key:<10} {count:6} {buckets['profit'][i]:10.2f} {buckets['wagered'][i]:10.2f} {hit_rate:10.2%}")
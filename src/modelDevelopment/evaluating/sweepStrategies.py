@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+# the evaluators run from src/modelDevelopment, their database is the repository's unless MLB_DATABASE_PATH says otherwise
+os.environ.setdefault("MLB_DATABASE_PATH", os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../databases/MLB_Betting.db')))
+from odds.calculateUnitSize import parseMoneyLineArray
+from modelDevelopment.evaluating.backtest import runBacktest
+from modelDevelopment.utils.featureCache import selectFeatureStoreFingerprint
+from database.connection import connect
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+PROBABILITY_CACHE_DIR = "evaluation_logs/probabilities"
+
+DEFAULT_MIN_ROIS = list(range(0, 60, 5))
+DEFAULT_MAX_ROIS = list(range(20, 105, 5)) + [np.inf]
+DEFAULT_UNIT_MULTIPLIERS = [1, 2.5, 5, 7.5, 10]
+DEFAULT_SIDES = [None, "home", "away"]
+
+# odds and results of every current season game that can be scored, the cached probabilities
+# (and the odds / outcomes stored next to them) are only reused while these stay the same
+SELECT_SCORED_GAMES_FINGERPRINT = """
+    SELECT O.game_id, O.home_team_odds, O.away_team_odds, C.home_score, C.away_score
+    FROM Odds AS O
+    INNER JOIN CurrentSchedule AS C ON O.game_id = C.game_id
+    ORDER BY O.game_id ASC
+"""
+
+# set once per worker process by initSweepWorker, so the arrays are sent to each worker once
+# instead of with every strategy
+_season_arrays = None
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def modelFilesMTime(model_name, feature_method):
+    # the exact files scoreCurrentSeason loads, so retraining deep_mlp doesn't invalidate mlp
+    paths = [
+        f"training/model_files/{model_name}_model_{feature_method}.pkl",
+        f"training/model_files/{model_name}_model_{feature_method}.pt",
+        f"training/model_files/feature_names_{feature_method}.pkl",
+        f"training/model_files/scaler_{feature_method}.pkl"
+    ]
+    return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=0)
+
+def selectScoredGamesFingerprint(conn):
+    rows = conn.execute(SELECT_SCORED_GAMES_FINGERPRINT).fetchall()
+    return {"odds_count": len(rows), "odds_hash": hashlib.sha1(repr(rows).encode()).hexdigest()}
+
+def loadSeasonProbabilities(model_name, feature_method, refresh=False):
+    """
+    Returns the model's probabilities for every current season game with odds, scoring the season
+    only when the cached copy is missing or the model, FeatureStore or the games' odds and scores
+    changed since it was written.
+
+    :param model_name: Model name (e.g. "xgboost", "mlp")
+    :param feature_method: "diff" or "raw"
+    :param refresh: Rescore the season even if the cache is up to date
+    :returns: Dictionary of arrays: game_id, home_proba, away_proba, home_odds, away_odds, home_won
+    """
+    path = os.path.join(PROBABILITY_CACHE_DIR, f"{model_name}_{feature_method}.npz")
+
+    conn = connect(readonly=True)
+    try:
+        fingerprint = selectFeatureStoreFingerprint(conn)
+        fingerprint.update(selectScoredGamesFingerprint(conn))
+    finally:
+        conn.close()
+    fingerprint["model_mtime"] = modelFilesMTime(model_name, feature_method)
+
+    if not refresh and os.path.exists(path):
+        cached = np.load(path, allow_pickle=False)
+        if json.loads(str(cached["fingerprint"])) == fingerprint:
+            return {key: cached[key] for key in cached.files if key != "fingerprint"}
+
+    # torch / tabnet are only needed when the season actually has to be scored
+    from modelDevelopment.evaluating.testOnCurrentSeason import scoreCurrentSeason
+
+    print(f"Scoring current season with {model_name} ({feature_method})")
+    df = scoreCurrentSeason(model_name, feature_method)
+    # odds are parsed once here so the sweep never touches strings
+    arrays = {
+        "game_id": df["game_id"].to_numpy(dtype=np.int64),
+        "home_proba": df["home_proba"].to_numpy(dtype=np.float64),
+        "away_proba": df["away_proba"].to_numpy(dtype=np.float64),
+        "home_odds": parseMoneyLineArray(df["home_team_odds"]),
+        "away_odds": parseMoneyLineArray(df["away_team_odds"]),
+        "home_won": (df["home_score"] > df["away_score"]).to_numpy()
+    }
+
+    os.makedirs(PROBABILITY_CACHE_DIR, exist_ok=True)
+    np.savez(path, fingerprint=json.dumps(fingerprint), **arrays)
+    return arrays
+
+def strategyGrid(min_rois=DEFAULT_MIN_ROIS, max_rois=DEFAULT_MAX_ROIS, unit_multipliers=DEFAULT_UNIT_MULTIPLIERS, sides=DEFAULT_SIDES):
+    return [
+        {"min_roi": min_roi, "max_roi": max_roi, "unit_multiplier": unit_multiplier, "side": side}
+        for min_roi, max_roi, unit_multiplier, side in itertools.product(min_rois, max_rois, unit_multipliers, sides)
+        if min_roi < max_roi
+    ]
+
+def initSweepWorker(season_arrays):
+    global _season_arrays
+    _season_arrays = season_arrays
+
+def evaluateStrategies(strategies):
+    """
+    Backtests a batch of strategies against the season arrays of this worker.
+
+    :param strategies: List of strategy dicts from strategyGrid
+    :returns: List of summary dicts, one per strategy
+    """
+    arrays = _season_arrays
+    summaries = []
+    for strategy in strategies:
+        result = runBacktest(
+            arrays["home_proba"], arrays["away_proba"], arrays["home_odds"], arrays["away_odds"], arrays["home_won"],
+            **strategy
+        )
+        summaries.append({
+            **strategy,
+            "side": strategy["side"] or "both",
+            "bets": result.total_bets,
+            "wagered": result.total_wagered,
+            "profit": result.total_profit,
+            "roi": result.roi,
+            "hit_rate": result.hit_rate
+        })
+    return summaries
+
+def sweepStrategies(season_arrays, strategies, max_workers=None, batch_size=200):
+    """
+    Backtests every strategy in parallel across a process pool.
+
+    :param season_arrays: Dictionary of arrays from loadSeasonProbabilities
+    :param strategies: List of strategy dicts from strategyGrid
+    :param max_workers: Number of worker processes, defaults to the number of CPUs
+    :param batch_size: Strategies sent to a worker at a time
+    :returns: DataFrame with one row per strategy, ranked by profit
+    """
+    batches = [strategies[i:i + batch_size] for i in range(0, len(strategies), batch_size)]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=initSweepWorker, initargs=(season_arrays,)) as executor:
+        summaries = [summary for batch in executor.map(evaluateStrategies, batches) for summary in batch]
+
+    results = pd.DataFrame(summaries)
+    return results.sort_values(["profit", "roi"], ascending=False, ignore_index=True)
+
+def printSweepResults(results, top=25, min_bets=30):
+    ranked = results[results["bets"] >= min_bets].head(top)
+
+    print(f"\nTOP {len(ranked)} STRATEGIES (of {len(results)}, at least {min_bets} bets):")
+    print(f"{'Min ROI':>8} {'Max ROI':>8} {'Units x':>8} {'Side':>6} {'Bets':>6} {'Wagered':>10} {'Profit':>10} {'ROI':>8} {'Hit Rate':>9}")
+    for _, row in ranked.iterrows():
+        print(
+            f"{row['min_roi']:8} {row['max_roi']:8} {row['unit_multiplier']:8} {row['side']:>6} {row['bets']:6} "
+            f"{row['wagered']:10.2f} {row['profit']:10.2f} {row['roi']:8.2%} {row['hit_rate']:9.2%}"
+        )
+
+def main_sweep(model_name, feature_method, refresh=False, max_workers=None):
+    season_arrays = loadSeasonProbabilities(model_name, feature_method, refresh)
+    strategies = strategyGrid()
+    print(f"Sweeping {len(strategies)} strategies over {len(season_arrays['game_id'])} games")
+    results = sweepStrategies(season_arrays, strategies, max_workers)
+    printSweepResults(results)
+    return results
+
+if __name__ == "__main__":
+    main_sweep("xgboost", "diff")
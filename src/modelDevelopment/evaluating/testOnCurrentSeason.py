@@ -1,5 +1,4 @@
 import sys
-import sqlite3
 import pandas as pd
 import json
 import numpy as np
@@ -15,8 +14,11 @@ from sklearn.preprocessing import StandardScaler
 from pytorch_tabnet.tab_model import TabNetClassifier
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
-from odds.calculateUnitSize import calculateUnitSize, moneyLineToPayout
-from modelDevelopment.utils.featureExtraction import buildFeatures
+# the evaluators run from src/modelDevelopment, their database is the repository's unless MLB_DATABASE_PATH says otherwise
+os.environ.setdefault("MLB_DATABASE_PATH", os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../databases/MLB_Betting.db')))
+from modelDevelopment.evaluating.backtest import runBacktest, printBacktestReport
+from modelDevelopment.utils.featureCache import loadFeatureMatrix
+from database.connection import connect
 
 # MLP
 class MLP(nn.Module):
@@ -51,10 +53,39 @@ class DeepMLP(nn.Module):
     def forward(self, x):
         return self.model(x)
     
-def calculateTotalProfit(model_name, feature_method):
-    db_path = "../../databases/MLB_Betting.db"
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def predictProbabilities(model, model_name, X, chunk_size=8192):
+    """
+    Scores a whole feature matrix at once instead of one game at a time, in chunks so large
+    matrices don't blow up memory on the torch / tabnet side.
+
+    :param model: Loaded model (sklearn style with predict_proba, or a torch nn.Module)
+    :param model_name: Model name as passed to calculateTotalProfit
+    :param X: 2D float32 array of features in the model's feature order
+    :param chunk_size: Maximum number of rows scored per call
+    :returns: Array of shape (games, 2), first column is away win probability, second is home
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    probs = np.empty((len(X), 2), dtype=np.float64)
+
+    for start in range(0, len(X), chunk_size):
+        chunk = X[start:start + chunk_size]
+        if model_name in ["mlp", "deep_mlp"]:
+            with torch.no_grad():
+                probs[start:start + len(chunk)] = torch.softmax(model(torch.from_numpy(chunk)), dim=1).numpy()
+        else:
+            probs[start:start + len(chunk)] = model.predict_proba(chunk)
+
+    return probs
+
+def scoreCurrentSeason(model_name, feature_method):
+    """
+    Loads a trained model and scores every current season game that has odds.
+
+    :param model_name: Model name (e.g. "xgboost", "mlp")
+    :param feature_method: "diff" or "raw"
+    :returns: DataFrame of game info (ids, teams, odds, scores) with home_proba and away_proba columns
+    """
+    conn = connect(readonly=True)
 
     with open(f"training/model_files/feature_names_{feature_method}.pkl", "rb") as f:
         feature_names = pickle.load(f)
@@ -102,243 +133,71 @@ def calculateTotalProfit(model_name, feature_method):
     query = """
         SELECT F.game_id, C.date_time, C.season, C.status_code, 
                O.home_team, O.away_team, O.home_team_odds, O.away_team_odds, 
-               C.home_score, C.away_score, F.features_json
-        FROM Features AS F
+               C.home_score, C.away_score
+        FROM FeatureStore AS F
         INNER JOIN Odds AS O ON F.game_id = O.game_id
         INNER JOIN CurrentSchedule AS C ON F.game_id = C.game_id
         ORDER BY C.date_time ASC;
     """
-    cursor.execute(query)
-    games = cursor.fetchall()
+    game_info = pd.read_sql_query(query, conn)
 
-    df = pd.DataFrame(games, columns=[
-        "game_id", "date_time", "season", "status_code", "home_team", "away_team",
-        "home_team_odds", "away_team_odds", "home_score", "away_score", "features_json"
-    ])
-    df["features_json"] = df["features_json"].apply(json.loads)
-
-    X_all, _, _ = buildFeatures(df, method=feature_method)
-    X_features = X_all[feature_names]
+    # features come from the memory mapped cache, only the rows and columns we need get copied
+    feature_matrix = loadFeatureMatrix(conn, feature_method)
+    X_features = pd.DataFrame(
+        feature_matrix.X[feature_matrix.rows(game_info["game_id"])][:, feature_matrix.columns(feature_names)],
+        columns=feature_names
+    )
 
     if needs_scaling:
         X_scaled = pd.DataFrame(scaler.transform(X_features), columns=feature_names)
     else:
         X_scaled = X_features.astype(np.float32)
 
-    df_final = pd.concat([df, X_scaled], axis=1)
-
-    from odds.calculateUnitSize import calculateUnitSize, moneyLineToPayout
-
-    total_profit, total_bets, correct_bets, incorrect_bets = 0, 0, 0, 0
-    total_wagered, unit_size_won, unit_size_lost, skipped_games = 0, 0, 0, 0
-    home_bets, away_bets, home_profit, away_profit, home_correct, away_correct = 0, 0, 0, 0, 0, 0
-
-    # Confidence bin setup (0.10 to 1.00 in steps of 0.05)
-    bin_edges = np.arange(0.10, 1.01, 0.05)
-
-    bin_stats = {
-        f"{bin_edges[i]:.2f}-{bin_edges[i+1]:.2f}": {
-            "count": 0,
-            "total_profit": 0,
-            "correct": 0,
-            "total_unit_size": 0,
-            "sum_confidence": 0,
-        } for i in range(len(bin_edges) - 1)
-    }
-
-    # Define unit size buckets (adjust as needed)
-    unit_size_buckets = {
-        "0-0.49": {"count": 0, "profit": 0, "correct": 0, "wagered": 0},
-        "0.5-0.99": {"count": 0, "profit": 0, "correct": 0, "wagered": 0},
-        "1-1.99": {"count": 0, "profit": 0, "correct": 0, "wagered": 0},
-        "2-2.99": {"count": 0, "profit": 0, "correct": 0, "wagered": 0},
-        "3+": {"count": 0, "profit": 0, "correct": 0, "wagered": 0},
-    }
-
-    expected_roi_bins = [(0,5), (5,10), (10,15), (15,20), (20,25), (25,30), (30,35), (35,40), (40,45), (45,50),
-                     (50,55), (55,60), (60,65), (65,70), (70,75), (75,80)]
-
-    # Add last bucket for 80+
-    expected_roi_buckets = {
-        f"{low}-{high}": {"count": 0, "profit": 0, "correct": 0, "wagered": 0}
-        for low, high in expected_roi_bins
-    }
-    expected_roi_buckets["80+"] = {"count": 0, "profit": 0, "correct": 0, "wagered": 0}
-
-    for _, row in df_final.iterrows():
-        game_id = row["game_id"]
-        home_team = row["home_team"]
-        away_team = row["away_team"]
-        home_odds = row["home_team_odds"]
-        away_odds = row["away_team_odds"]
-        home_score = row["home_score"]
-        away_score = row["away_score"]
-        
-        features = row[feature_names].values.astype(np.float32).reshape(1, -1)
+    # score every game in one batched call, the loop below only reads the probabilities
+    probs = predictProbabilities(model, model_name, X_scaled.to_numpy(dtype=np.float32))
+    conn.close()
 
-        if model_name in ["mlp", "deep_mlp"]:
-            tensor_input = torch.tensor(features, dtype=torch.float32)
-            with torch.no_grad():
-                probs = torch.softmax(model(tensor_input), dim=1).numpy()[0]
-        elif model_name == "tabnet":
-            probs = model.predict_proba(features)[0]
-        else:
-            probs = model.predict_proba(features)[0]
-        
-        home_proba, away_proba = probs[1], probs[0]
-        
-        teamToBetOn, unit_size, expected_roi = calculateUnitSize(home_proba, away_proba, row["home_team_odds"], row["away_team_odds"])
-        
-        # TODO: mess with the filtering of plays, sweet spot was 35-65 expected ROI
-        # if there is no play for that game or outside the filter range, skip it 
-        if teamToBetOn is None or expected_roi < 35 or expected_roi > 65:
-            skipped_games += 1
-            continue
+    return game_info.assign(away_proba=probs[:, 0], home_proba=probs[:, 1])
+
+def calculateTotalProfit(model_name, feature_method):
+    df_final = scoreCurrentSeason(model_name, feature_method)
+
+    home_won = (df_final["home_score"] > df_final["away_score"]).to_numpy()
+    result = runBacktest(
+        df_final["home_proba"], df_final["away_proba"],
+        df_final["home_team_odds"], df_final["away_team_odds"], home_won
+    )
+
+    # per bet log, the simulation itself already ran above
+    running_profit = np.cumsum(result.profit[result.bets])
+    for i, row_index in enumerate(np.flatnonzero(result.bets)):
+        row = df_final.iloc[row_index]
+        teamToBetOn = "home" if result.side[row_index] == 1 else "away"
+        outcome = "home" if home_won[row_index] else "away"
+        unit_size = result.unit_size[row_index]
+        profit = result.profit[row_index]
 
         print("GAME INFO!, home team + odds + score comes first then away!")
-        print((game_id, home_team, home_odds, home_score, away_team, away_odds, away_score))
+        print((row["game_id"], row["home_team"], row["home_team_odds"], row["home_score"], row["away_team"], row["away_team_odds"], row["away_score"]))
         print()
         print("MODEL PREDICTION PROBABILITIES, first is away, 2nd is home")
        
         print("UNIT SIZE RECOMMENDATION")
         print(f"teamToBetOn = {teamToBetOn}")
         print(f"unit_size = {unit_size}")
-        print(f"expected_roi = {expected_roi}")
+        print(f"expected_roi = {result.expected_roi[row_index]}")
         print()
         print("OUTCOME")
 
-        if teamToBetOn == "home":
-            confidence = home_proba
-        elif teamToBetOn == "away":
-            confidence = away_proba
-        
-        outcome = "home" if row["home_score"] > row["away_score"] else "away"
-        total_bets += 1
-        total_wagered += unit_size
-
         if teamToBetOn == outcome:
-            correct_bets += 1
-            unit_size_won += unit_size
-            profit = unit_size * moneyLineToPayout(row[f"{teamToBetOn}_team_odds"])
-            total_profit += profit
             print("Bet was correct!")
-            if (teamToBetOn == 'home'):
-                print(f"Profitted {profit} units")
-            else:
-                print(f"Profitted {profit} units")
+            print(f"Profitted {profit} units")
         else:
-            incorrect_bets += 1
-            unit_size_lost += unit_size
-            profit = -1 * unit_size
-            total_profit += profit
             print(f"Bet was wrong, lost {unit_size} units")
 
-        if teamToBetOn == "home":
-            home_bets += 1
-            home_profit += profit
-            if teamToBetOn == outcome:
-                home_correct += 1
-        elif teamToBetOn == "away":
-            away_bets += 1
-            away_profit += profit
-            if teamToBetOn == outcome:
-                away_correct += 1
-        
-        if unit_size < 0.5:
-            bucket = "0-0.49"
-        elif unit_size < 1:
-            bucket = "0.5-0.99"
-        elif unit_size < 2:
-            bucket = "1-1.99"
-        elif unit_size < 3:
-            bucket = "2-2.99"
-        else:
-            bucket = "3+"
+        print(f"total running profit is {running_profit[i]}\n\n")
 
-        unit_size_buckets[bucket]["count"] += 1
-        unit_size_buckets[bucket]["profit"] += profit
-        unit_size_buckets[bucket]["wagered"] += unit_size
-        if teamToBetOn == outcome:
-            unit_size_buckets[bucket]["correct"] += 1
-
-        bucket_found = False
-        for low, high in expected_roi_bins:
-            if low <= expected_roi < high:
-                bucket_key = f"{low}-{high}"
-                bucket_found = True
-                break
-        if not bucket_found:
-            bucket_key = "80+"
-
-        # Update bucket stats
-        expected_roi_buckets[bucket_key]["count"] += 1
-        expected_roi_buckets[bucket_key]["profit"] += profit
-        expected_roi_buckets[bucket_key]["wagered"] += unit_size
-        if teamToBetOn == outcome:
-            expected_roi_buckets[bucket_key]["correct"] += 1
-        
-        # Update bin stats
-        for i in range(len(bin_edges) - 1):
-            if bin_edges[i] <= confidence < bin_edges[i + 1]:
-                bin_key = f"{bin_edges[i]:.2f}-{bin_edges[i+1]:.2f}"
-                bin_stats[bin_key]["count"] += 1
-                bin_stats[bin_key]["total_profit"] += profit
-                if teamToBetOn == outcome:
-                    bin_stats[bin_key]["correct"] += 1
-                bin_stats[bin_key]["total_unit_size"] += unit_size
-                bin_stats[bin_key]["sum_confidence"] += confidence
-                break
-            
-        print(f"total running profit is {total_profit}\n\n")
-
-
-    print("\nFINAL STATS")
-    print(f"Model: {model_name}")
-    print(f"Feature Method: {feature_method}")
-    print(f"Total Profit: {total_profit:.2f} units")
-    if total_bets > 0:
-        print(f"Hit Rate: {round(correct_bets / total_bets * 100, 2)}%")
-        print(f"ROI: {total_profit / total_wagered * 100:.2f}%")
-    print(f"Total Bets Placed: {total_bets}")
-    print(f"Amount Wagered: {total_wagered:.2f} units")
-    print(f"Correct Bets: {correct_bets}")
-    print(f"Incorrect Bets: {incorrect_bets}")
-    print(f"Correct Bets Avg Unit Size: {unit_size_won / correct_bets if correct_bets else 0:.2f}")
-    print(f"Wrong Bets Avg Unit Size: {unit_size_lost / incorrect_bets if incorrect_bets else 0:.2f}")
-    print(f"Skipped Games: {skipped_games}")
-    print(f"Home Bets: {home_bets}, Profit: {home_profit:.2f}, Correct: {home_correct}, Hit Rate: {home_correct/home_bets if home_bets else 0:.2%}")
-    print(f"Away Bets: {away_bets}, Profit: {away_profit:.2f}, Correct: {away_correct}, Hit Rate: {away_correct/away_bets if away_bets else 0:.2%}")
-
-    print("\nCONFIDENCE BINNING PROFIT ANALYSIS:")
-    print(f"{'Bin':<11} {'Count':>6} {'Avg Conf':>9} {'Win Rate':>9} {'Total Profit':>13} {'Avg Profit/Bet':>15}")
-    for bin_key, stats in bin_stats.items():
-        count = stats["count"]
-        if count == 0:
-            continue
-        avg_conf = stats["sum_confidence"] / count
-        win_rate = stats["correct"] / count
-        avg_profit_per_bet = stats["total_profit"] / count
-        print(f"{bin_key:<11} {count:6} {avg_conf:9.3f} {win_rate:9.3f} {stats['total_profit']:13.2f} {avg_profit_per_bet:15.4f}")
-
-    print("\nPROFIT BY UNIT SIZE BUCKETS:")
-    print(f"{'Bucket':<10} {'Count':>6} {'Profit':>10} {'Wagered':>10} {'Hit Rate':>10}")
-    for bucket, stats in unit_size_buckets.items():
-        count = stats['count']
-        if count == 0:
-            continue
-        profit = stats['profit']
-        wagered = stats['wagered']
-        correct = stats['correct']
-        hit_rate = correct / count if count else 0
-        print(f"{bucket:<10} {count:6} {profit:10.2f} {wagered:10.2f} {hit_rate:10.2%}")
-
-    print("\nPROFIT BY EXPECTED ROI BUCKETS:")
-    print(f"{'Bucket':<10} {'Count':>6} {'Profit':>10} {'Wagered':>10} {'Hit Rate':>10}")
-    for bucket_key, stats in expected_roi_buckets.items():
-        if stats["count"] == 0:
-            continue
-        hit_rate = stats["correct"] / stats["count"]
-        print(f"{bucket_key:<10} {stats['count']:6} {stats['profit']:10.2f} {stats['wagered']:10.2f} {hit_rate:10.2%}")
+    printBacktestReport(result, model_name, feature_method)
 
 def main_evaluate(model_name, feature_method):
 
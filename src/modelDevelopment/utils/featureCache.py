@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import sqlite3
+import itertools
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+try:
+    from modelDevelopment.utils.featureExtraction import buildFeaturesFromFrame, selectFeatureStoreColumns, loadFeatureStoreFrame, iterFeatureStoreFrames
+except ImportError:
+    # the training notebook runs from modelDevelopment/ without src on the path
+    from utils.featureExtraction import buildFeaturesFromFrame, selectFeatureStoreColumns, loadFeatureStoreFrame, iterFeatureStoreFrames
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# the repository's databases/ wherever the caller runs from (evaluators, notebook, benchmark)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MLB_FEATURE_CACHE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../databases/feature_cache'))
+)
+
+# bump whenever the files written below change layout so old caches get rebuilt
+FEATURE_CACHE_VERSION = 1
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+# anything that changes when engineerFeatures writes to FeatureStore
+SELECT_FEATURE_STORE_FINGERPRINT = """
+    SELECT
+        (SELECT value FROM FeatureStoreMeta WHERE key = 'generation'),
+        COUNT(*),
+        MAX(schema_version)
+    FROM FeatureStore
+"""
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class FeatureMatrix(NamedTuple):
+    X: np.ndarray               # float32 (games, features), memory mapped read-only
+    feature_names: list
+    game_ids: np.ndarray
+    dates: np.ndarray           # game date_time strings
+    seasons: np.ndarray
+    labels: np.ndarray          # 1 if the home team won
+
+    def rows(self, game_ids):
+        # positions of the given game ids in the matrix, in the order they were passed
+        positions = pd.Index(self.game_ids).get_indexer(game_ids)
+        if (positions < 0).any():
+            raise KeyError(f"{(positions < 0).sum()} game ids are not in the feature cache")
+        return positions
+
+    def columns(self, feature_names):
+        index = {feature_name: i for i, feature_name in enumerate(self.feature_names)}
+        return [index[feature_name] for feature_name in feature_names]
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def selectFeatureStoreFingerprint(conn):
+    try:
+        generation, row_count, schema_version = conn.execute(SELECT_FEATURE_STORE_FINGERPRINT).fetchone()
+    except sqlite3.OperationalError:
+        # FeatureStoreMeta only exists once engineerFeatures ran with the feature store
+        generation = None
+        row_count, schema_version = conn.execute("SELECT COUNT(*), MAX(schema_version) FROM FeatureStore").fetchone()
+    return {"generation": generation, "row_count": row_count, "schema_version": schema_version}
+
+def featureCachePaths(cache_dir, feature_method, rolling_prefix, schema_version):
+    name = f"{feature_method}_{rolling_prefix}_v{schema_version}"
+    return {
+        "matrix": os.path.join(cache_dir, f"{name}.npy"),
+        "index": os.path.join(cache_dir, f"{name}.index.npz"),
+        "meta": os.path.join(cache_dir, f"{name}.json")
+    }
+
+def loadFeatureMatrix(conn, feature_method="diff", rolling_prefix="rolling", cache_dir=DEFAULT_CACHE_DIR, rebuild=False):
+    """
+    Returns the feature matrix for every game in FeatureStore, memory mapped from a .npy cache.
+    The cache is (re)built from FeatureStore only when it's missing or FeatureStore changed since,
+    so repeated experiments open it without touching SQLite, JSON or pandas.
+
+    :param conn: SQLite database connection
+    :param feature_method: "diff" or "raw", same as buildFeatures
+    :param rolling_prefix: Which rolling window to use next to the season features (e.g. "rolling", "rolling10")
+    :param cache_dir: Directory the cache files live in
+    :param rebuild: Rebuild the cache even if it's up to date
+    :returns: FeatureMatrix
+    """
+    fingerprint = selectFeatureStoreFingerprint(conn)
+    fingerprint["cache_version"] = FEATURE_CACHE_VERSION
+    paths = featureCachePaths(cache_dir, feature_method, rolling_prefix, fingerprint["schema_version"])
+
+    meta = None
+    if not rebuild and all(os.path.exists(path) for path in paths.values()):
+        with open(paths["meta"], "r") as f:
+            meta = json.load(f)
+        if meta["fingerprint"] != fingerprint:
+            print(f"Feature cache {paths['matrix']} is stale, rebuilding it")
+            meta = None
+
+    if meta is None:
+        meta = buildFeatureMatrixCache(conn, feature_method, rolling_prefix, paths, fingerprint)
+
+    index = np.load(paths["index"], allow_pickle=False)
+    return FeatureMatrix(
+        X=np.load(paths["matrix"], mmap_mode="r"),
+        feature_names=meta["feature_names"],
+        game_ids=index["game_ids"],
+        dates=index["dates"],
+        seasons=index["seasons"],
+        labels=index["labels"]
+    )
+
+def buildFeatureMatrixCache(conn, feature_method, rolling_prefix, paths, fingerprint):
+    """
+    Streams FeatureStore in chunks through buildFeaturesFromFrame straight into the memory mapped
+    .npy file, so building the cache needs memory for one chunk instead of every season at once.
+    Files are written under a temporary name and renamed into place, so an interrupted build
+    never leaves a half written matrix behind.
+
+    :returns: Cache metadata (feature names and the FeatureStore fingerprint it was built from)
+    """
+    os.makedirs(os.path.dirname(paths["matrix"]), exist_ok=True)
+
+    # season features plus the one rolling window that was asked for
+    window_pattern = re.compile(rf"(season|{re.escape(rolling_prefix)})_(home|away)_avg_")
+    columns = [
+        column for column in selectFeatureStoreColumns(conn)
+        if column == "label" or window_pattern.match(column)
+    ]
+    if not any(column.startswith(f"{rolling_prefix}_") for column in columns):
+        raise ValueError(f"FeatureStore has no {rolling_prefix} features")
+
+    feature_columns = ", ".join(f'F."{column}"' for column in columns)
+    query = f"""
+        SELECT F.game_id,
+               COALESCE(O.date_time, C.date_time) AS date_time,
+               COALESCE(O.season, C.season) AS season,
+               {feature_columns}
+        FROM FeatureStore AS F
+        LEFT JOIN OldGames AS O ON F.game_id = O.game_id
+        LEFT JOIN CurrentSchedule AS C ON F.game_id = C.game_id
+        ORDER BY date_time ASC, F.game_id ASC
+    """
+
+    # the row count and the rows have to come from the same snapshot, engineerFeatures may be writing meanwhile
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        num_games = conn.execute("SELECT COUNT(*) FROM FeatureStore").fetchone()[0]
+
+        chunks = iterFeatureStoreFrames(conn, query)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            # no rows, the empty frame still has the columns the feature names come from
+            first_chunk = loadFeatureStoreFrame(conn, query)
+
+        matrix, index, feature_names, position = None, [], None, 0
+        for df in itertools.chain([first_chunk], chunks):
+            X, y, feature_names = buildFeaturesFromFrame(df, method=feature_method)
+
+            if matrix is None:
+                print(f"Building feature cache {paths['matrix']} ({num_games} games, {len(feature_names)} features)")
+                matrix = np.lib.format.open_memmap(paths["matrix"] + ".tmp", mode="w+", dtype=np.float32, shape=(num_games, len(feature_names)))
+
+            matrix[position:position + len(df)] = X.to_numpy(dtype=np.float32)
+            position += len(df)
+
+            index.append((
+                df["game_id"].to_numpy(dtype=np.int64),
+                df["date_time"].fillna("").to_numpy(dtype=str),
+                df["season"].fillna("").astype(str).to_numpy(dtype=str),
+                y.to_numpy(dtype=np.int8)
+            ))
+    finally:
+        if own_transaction:
+            conn.rollback()
+
+    matrix.flush()
+    del matrix
+
+    game_ids, dates, seasons, labels = (np.concatenate(arrays) for arrays in zip(*index))
+    with open(paths["index"] + ".tmp", "wb") as f:
+        np.savez(f, game_ids=game_ids, dates=dates, seasons=seasons, labels=labels)
+
+    meta = {"feature_names": feature_names, "fingerprint": fingerprint}
+    with open(paths["meta"] + ".tmp", "w") as f:
+        json.dump(meta, f)
+
+    # meta goes last, it's what marks the cache as complete
+    os.replace(paths["matrix"] + ".tmp", paths["matrix"])
+    os.replace(paths["index"] + ".tmp", paths["index"])
+    os.replace(paths["meta"] + ".tmp", paths["meta"])
+
+    return meta
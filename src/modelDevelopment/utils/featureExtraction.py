@@ -1,38 +1,87 @@
 import pandas as pd
+import numpy as np
 import re
 
+# FeatureStore columns that aren't features
+FEATURE_STORE_META_COLUMNS = ("game_id", "schema_version")
+
+def selectFeatureStoreColumns(conn):
+    """
+    Returns the typed feature columns of the FeatureStore table (team ids, label and every feature).
+
+    :param conn: SQLite database connection
+    :returns: List of column names
+    """
+    cursor = conn.execute("SELECT name FROM pragma_table_info('FeatureStore')")
+    return [row[0] for row in cursor.fetchall() if row[0] not in FEATURE_STORE_META_COLUMNS]
+
+# rows per DataFrame when a query is streamed with iterFeatureStoreFrames
+DEFAULT_CHUNK_SIZE = 5000
+
+def castFeatureColumns(df, dtype=np.float32):
+    feature_columns = [col for col in df.columns if re.match(r"(season|rolling\d*)_(home|away)_avg_", col)]
+    df[feature_columns] = df[feature_columns].astype(dtype)
+    return df
+
+def loadFeatureStoreFrame(conn, query, params=(), dtype=np.float32):
+    """
+    Runs a query that selects FeatureStore columns and casts the feature columns down to dtype,
+    so the matrix is read straight from typed columns without any per-row JSON parsing.
+
+    :param conn: SQLite database connection
+    :param query: SQL query, the feature columns must keep their FeatureStore names
+    :param params: Query parameters
+    :param dtype: dtype of the feature columns
+    :returns: DataFrame with the query result
+    """
+    return castFeatureColumns(pd.read_sql_query(query, conn, params=params), dtype)
+
+def iterFeatureStoreFrames(conn, query, params=(), chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float32):
+    """
+    Same as loadFeatureStoreFrame, but the rows are fetched chunk_size at a time and handed out as
+    they come, so memory stays at one chunk however many seasons the query covers.
+
+    :returns: Generator of DataFrames of at most chunk_size rows, nothing if the query has no rows
+    """
+    for df in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+        yield castFeatureColumns(df, dtype)
+
 def buildFeatures(df_json, method = "diff"):
 
     # Extract features
     features_df = pd.json_normalize(df_json["features_json"])
+    return buildFeaturesFromFrame(features_df, method)
+
+def buildFeaturesFromFrame(features_df, method = "diff"):
+
     # Extract label
     y = features_df["label"]
 
     if method == "diff":
         diff_cols = []
-        home_cols = [col for col in features_df.columns if re.match(r"(season|rolling)_home_avg_", col)]
+        diff_values = {}
+        # rolling features are prefixed "rolling_" for a single window or "rolling5_", "rolling10_", ... for several
+        home_cols = [col for col in features_df.columns if re.match(r"(season|rolling\d*)_home_avg_", col)]
         for home_col in home_cols:
             away_col = home_col.replace("home", "away")
             diff_col = home_col.replace("_home", "") + "_diff"
-            features_df[diff_col] = features_df[home_col] - features_df[away_col]
+            diff_values[diff_col] = features_df[home_col] - features_df[away_col]
             diff_cols.append(diff_col)
         
-        final_features = features_df[diff_cols]
+        final_features = pd.DataFrame(diff_values, index=features_df.index)
 
         # IF YOU WANT TO DROP IRRELEVANT FEATURES DO IT HERE
       
+        # OPS diffs are just OBP diff + SLG diff, drop them for every season/rolling window
         columns_to_drop = [
-            "season_avg_ops_diff",
-            "season_avg_opponent_ops_diff",
-            "rolling_avg_ops_diff",
-            "rolling_avg_opponent_ops_diff"
+            col for col in diff_cols if re.match(r"(season|rolling\d*)_avg_(opponent_)?ops_diff$", col)
         ]
         final_features = final_features.drop(columns=columns_to_drop)
         
         return final_features, y, list(final_features.columns)
 
     elif method == "raw":
-        all_cols = [col for col in features_df.columns if re.match(r"(season|rolling)_(home|away)_avg_", col)]
+        all_cols = [col for col in features_df.columns if re.match(r"(season|rolling\d*)_(home|away)_avg_", col)]
         final_features = features_df[all_cols]
 
         # IF YOU WANT TO DROP IRRELEVANT FEATURES DO IT HERE
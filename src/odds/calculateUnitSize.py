@@ -1,3 +1,10 @@
+import numpy as np
+
+# only bet when the expected ROI (in %) falls in this window, sweet spot found so far was 35-65
+# (see modelDevelopment/evaluating/sweepStrategies.py to search for better ones)
+MIN_EXPECTED_ROI = 35
+MAX_EXPECTED_ROI = 65
+
 def calculateUnitSize(model_home_confidence, model_away_confidence, home_vegas_odds, away_vegas_odds):
     """
     Given model confidence and Vegas odds, compute expected value (EV) for both teams.
@@ -39,4 +46,51 @@ def moneyLineToPayout(odds):
     if odds < 0:
         return 100 / -odds
     else:
-        return odds / 100
\ No newline at end of file
+        return odds / 100
+
+def parseMoneyLineArray(odds):
+    # "+120" / "-150" strings (or plain numbers) -> float64 array of 120.0 / -150.0
+    odds = np.asarray(odds)
+    if odds.dtype.kind in "USO":
+        odds = np.char.lstrip(np.char.strip(odds.astype(str)), "+")
+    return odds.astype(np.float64)
+
+def moneyLineToPayoutArray(odds):
+    """
+    Array version of moneyLineToPayout, accepts numbers or strings like "+120" / "-150".
+
+    :param odds: Array-like of American moneyline odds
+    :returns: float64 array of net profit per $1 bet
+    """
+    odds = parseMoneyLineArray(odds)
+    payout = odds / 100
+    negative = odds < 0
+    payout[negative] = 100 / -odds[negative]
+    return payout
+
+def calculateUnitSizeArrays(model_home_confidence, model_away_confidence, home_vegas_odds, away_vegas_odds, unit_multiplier=5):
+    """
+    Array version of calculateUnitSize, same EV rule, rounding and tie break (away wins ties),
+    for a whole set of games at once.
+
+    :param unit_multiplier: Unit size is expected ROI times this (calculateUnitSize uses 5)
+    :returns: Tuple of (side, unit_size, expected_roi) arrays, side is 1 for home, 0 for away
+              and -1 when neither side has a positive EV (unit_size and expected_roi are 0 there)
+    """
+    model_home_confidence = np.asarray(model_home_confidence, dtype=np.float64)
+    model_away_confidence = np.asarray(model_away_confidence, dtype=np.float64)
+    home_payout = moneyLineToPayoutArray(home_vegas_odds)
+    away_payout = moneyLineToPayoutArray(away_vegas_odds)
+
+    home_ev = model_home_confidence * home_payout + model_away_confidence * -1
+    away_ev = model_home_confidence * -1 + model_away_confidence * away_payout
+
+    bet = (home_ev > 0) | (away_ev > 0)
+    home = bet & (home_ev > away_ev)
+    side = np.where(bet, home.astype(np.int64), -1)
+
+    roi = np.where(home, home_ev / home_payout, away_ev / away_payout)
+    unit_size = np.where(bet, np.round(roi * unit_multiplier, 3), 0)
+    expected_roi = np.where(bet, np.round(roi * 100, 2), 0)
+
+    return side, unit_size, expected_roi
@@ -0,0 +1,160 @@
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+JOB_PENDING = "pending"
+JOB_DONE = "done"              # odds stored
+JOB_UNMATCHED = "unmatched"    # scraped, but no CurrentSchedule game matches its teams and start time, retried next run
+JOB_FAILED = "failed"          # page didn't load or had no odds, retried until MAX_JOB_ATTEMPTS
+
+MAX_JOB_ATTEMPTS = 3
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+# a date is only listed once, its games are then tracked one by one in OddsScrapeJobs
+CREATE_ODDS_SCRAPE_DATES_TABLE = """
+    CREATE TABLE IF NOT EXISTS OddsScrapeDates (
+        date TEXT PRIMARY KEY,
+        num_games INTEGER,
+        listed_at TEXT
+    )
+    """
+
+CREATE_ODDS_SCRAPE_JOBS_TABLE = """
+    CREATE TABLE IF NOT EXISTS OddsScrapeJobs (
+        date TEXT,
+        sportsbook_game_id TEXT,
+        status TEXT,
+        attempts INTEGER,
+        game_id INTEGER,
+        last_error TEXT,
+        updated_at TEXT,
+        PRIMARY KEY (date, sportsbook_game_id)
+    )
+    """
+
+INSERT_ODDS_SCRAPE_DATE = """
+    INSERT OR REPLACE INTO OddsScrapeDates (date, num_games, listed_at) VALUES (?, ?, ?)
+    """
+
+INSERT_ODDS_SCRAPE_JOB = """
+    INSERT OR IGNORE INTO OddsScrapeJobs (date, sportsbook_game_id, status, attempts, updated_at)
+    VALUES (?, ?, 'pending', 0, ?)
+    """
+
+SELECT_LISTED_DATES = """
+    SELECT date FROM OddsScrapeDates
+    """
+
+SELECT_RUNNABLE_JOBS = """
+    SELECT date, sportsbook_game_id
+    FROM OddsScrapeJobs
+    WHERE status IN ('pending', 'failed') AND attempts < ?
+    ORDER BY date ASC, sportsbook_game_id ASC
+    """
+
+FINISH_ODDS_SCRAPE_JOB = """
+    UPDATE OddsScrapeJobs
+    SET status = ?, attempts = attempts + 1, game_id = ?, last_error = NULL, updated_at = ?
+    WHERE date = ? AND sportsbook_game_id = ?
+    """
+
+FAIL_ODDS_SCRAPE_JOB = """
+    UPDATE OddsScrapeJobs
+    SET status = 'failed', attempts = attempts + 1, last_error = ?, updated_at = ?
+    WHERE date = ? AND sportsbook_game_id = ?
+    """
+
+# games marked done whose odds have since gone missing from Odds
+REQUEUE_MISSING_ODDS = """
+    UPDATE OddsScrapeJobs
+    SET status = 'pending', attempts = 0, updated_at = ?
+    WHERE status = 'done' AND game_id NOT IN (SELECT game_id FROM Odds)
+    """
+
+# unmatched games are scraped again on the next run, after a schedule refresh that may have picked up a
+# rescheduled game, never within the same run since the schedule they're matched against hasn't changed
+REQUEUE_UNMATCHED = """
+    UPDATE OddsScrapeJobs
+    SET status = 'pending', updated_at = ?
+    WHERE status = 'unmatched' AND attempts < ?
+    """
+
+SELECT_JOB_STATUS_COUNTS = """
+    SELECT status, COUNT(*) FROM OddsScrapeJobs GROUP BY status
+    """
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def createOddsJobTables(cursor):
+    cursor.execute(CREATE_ODDS_SCRAPE_DATES_TABLE)
+    cursor.execute(CREATE_ODDS_SCRAPE_JOBS_TABLE)
+
+def utcNow():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def selectListedDates(cursor):
+    cursor.execute(SELECT_LISTED_DATES)
+    return {row[0] for row in cursor.fetchall()}
+
+def enqueueDate(cursor, date, sportsbook_game_ids):
+    """
+    Records the games listed for a date as pending jobs. Jobs that already exist keep their status,
+    so listing a date again never re-scrapes finished games.
+
+    :param cursor: SQLite database cursor
+    :param date: Game day as "YYYY-MM-DD"
+    :param sportsbook_game_ids: sportsbookreview game ids listed that day
+    :returns: None
+    """
+    now = utcNow()
+    cursor.executemany(INSERT_ODDS_SCRAPE_JOB, [(date, game_id, now) for game_id in sportsbook_game_ids])
+    cursor.execute(INSERT_ODDS_SCRAPE_DATE, (date, len(sportsbook_game_ids), now))
+
+def selectRunnableJobs(cursor, dates, max_attempts=MAX_JOB_ATTEMPTS):
+    """
+    :param dates: Only jobs of these game days are returned
+    :returns: List of (date, sportsbook game id) that are pending, or failed fewer than max_attempts times
+    """
+    dates = set(dates)
+    cursor.execute(SELECT_RUNNABLE_JOBS, (max_attempts,))
+    return [(date, game_id) for date, game_id in cursor.fetchall() if date in dates]
+
+def finishJob(cursor, date, sportsbook_game_id, status, game_id=None):
+    cursor.execute(FINISH_ODDS_SCRAPE_JOB, (status, game_id, utcNow(), date, sportsbook_game_id))
+
+def failJob(cursor, date, sportsbook_game_id, error):
+    cursor.execute(FAIL_ODDS_SCRAPE_JOB, (str(error), utcNow(), date, sportsbook_game_id))
+
+def resetJobs(cursor, dates):
+    # forgets the queue of these dates, they are listed and scraped from scratch on the next run
+    cursor.executemany("DELETE FROM OddsScrapeJobs WHERE date = ?", [(date,) for date in dates])
+    cursor.executemany("DELETE FROM OddsScrapeDates WHERE date = ?", [(date,) for date in dates])
+
+def requeueMissingOdds(cursor, max_attempts=MAX_JOB_ATTEMPTS):
+    """
+    Puts back in the queue the games marked done whose odds have gone missing from Odds, and the
+    unmatched games that were scraped fewer than max_attempts times.
+
+    :param cursor: SQLite database cursor
+    :param max_attempts: Times a game is tried before it's left unmatched
+    :returns: Number of jobs requeued
+    """
+    now = utcNow()
+    cursor.execute(REQUEUE_MISSING_ODDS, (now,))
+    requeued = cursor.rowcount
+    cursor.execute(REQUEUE_UNMATCHED, (now, max_attempts))
+    return requeued + cursor.rowcount
+
+def selectJobStatusCounts(cursor):
+    cursor.execute(SELECT_JOB_STATUS_COUNTS)
+    return dict(cursor.fetchall())
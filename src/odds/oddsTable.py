@@ -0,0 +1,32 @@
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+# the Odds table on its own, so writers that don't scrape (e.g. the synthetic seasons) don't pull in Playwright
+
+CREATE_ODDS_TABLE = """
+    CREATE TABLE IF NOT EXISTS Odds (
+        game_id INTEGER PRIMARY KEY,
+        home_team TEXT,
+        away_team TEXT,
+        home_team_odds TEXT,
+        away_team_odds TEXT
+    )
+    """
+
+INSERT_INTO_ODDS = """
+    INSERT OR IGNORE INTO Odds (
+        game_id,
+        home_team,
+        away_team,
+        home_team_odds,
+        away_team_odds
+        ) VALUES (?, ?, ?, ?, ?)
+    """
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def createOddsTable(cursor):
+    cursor.execute(CREATE_ODDS_TABLE)
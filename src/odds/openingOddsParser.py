@@ -0,0 +1,344 @@
+import re
+import json
+from datetime import datetime
+import pytz
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# ---------------------------------#
+#      SQL AND GLOBAL STATEMENTS   #
+# ---------------------------------#
+
+# parsing of the line history pages on its own, so it can be tested on saved pages without Playwright
+
+# abbreviations saveOddsToDB matches against, mapped to the team names CurrentSchedule stores
+ABBR_TO_TEAM_NAME = {
+    'LAA': 'Los Angeles Angels',
+    'SD': 'San Diego Padres',
+    'SF': 'San Francisco Giants',
+    'ATH': 'Athletics',
+    'SEA': 'Seattle Mariners',
+    'NYY': 'New York Yankees',
+    'PHI': 'Philadelphia Phillies',
+    'CHC': 'Chicago Cubs',
+    'WAS': 'Washington Nationals',
+    'MIL': 'Milwaukee Brewers',
+    'TOR': 'Toronto Blue Jays',
+    'CLE': 'Cleveland Guardians',
+    'MIA': 'Miami Marlins',
+    'ATL': 'Atlanta Braves',
+    'BOS': 'Boston Red Sox',
+    'TEX': 'Texas Rangers',
+    'AZ': 'Arizona Diamondbacks',
+    'CIN': 'Cincinnati Reds',
+    'BAL': 'Baltimore Orioles',
+    'MIN': 'Minnesota Twins',
+    'LAD': 'Los Angeles Dodgers',
+    'HOU': 'Houston Astros',
+    'KC': 'Kansas City Royals',
+    'STL': 'St. Louis Cardinals',
+    'COL': 'Colorado Rockies',
+    'PIT': 'Pittsburgh Pirates',
+    'CHW': 'Chicago White Sox',
+    'TB': 'Tampa Bay Rays',
+    'NYM': 'New York Mets',
+    'DET': 'Detroit Tigers'
+}
+
+# other abbreviations the sportsbooks use for the same teams
+TEAM_ABBR_ALIASES = {
+    'ARI': 'AZ',
+    'CWS': 'CHW',
+    'WSH': 'WAS',
+    'OAK': 'ATH',
+    'SDP': 'SD',
+    'SFG': 'SF',
+    'KCR': 'KC',
+    'TBR': 'TB'
+}
+
+# fields of a team object in the page's JSON state that can hold its abbreviation or name, most specific first
+TEAM_NAME_FIELDS = ('shortName', 'abbreviation', 'fullName', 'name', 'nickName', 'displayName')
+
+# the page's embedded Next.js state, read straight from the HTML without building a DOM
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+OPENER_PATTERN = re.compile(r'opener', re.IGNORECASE)
+ODDS_PATTERN = re.compile(r'[+-]\d+')
+TITLE_DATE_PATTERN = re.compile(r'([A-Za-z]+,\s+[A-Za-z]+\s+\d{1,2},\s+\d{4}\s+-\s+\d{1,2}:\d{2}\s+[AP]M\s+[A-Z]{3})')
+
+SPORTSBOOK = 'fanduel'
+
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def normalize_team_abbreviation(team):
+    """
+    Maps a team as the page shows it (abbreviation, alias, full name or nickname) to the
+    abbreviation ABBR_TO_TEAM_NAME knows, so the scraped game can be matched in CurrentSchedule.
+
+    :param team: Team text from the page
+    :returns: Key of ABBR_TO_TEAM_NAME, or None if the team isn't recognized
+    """
+    if not isinstance(team, str):
+        return None
+
+    team = team.strip()
+    if team.upper() in ABBR_TO_TEAM_NAME:
+        return team.upper()
+    if team.upper() in TEAM_ABBR_ALIASES:
+        return TEAM_ABBR_ALIASES[team.upper()]
+
+    lowered = team.lower()
+    if not lowered:
+        return None
+    for abbreviation, team_name in ABBR_TO_TEAM_NAME.items():
+        if team_name.lower() == lowered:
+            return abbreviation
+
+    # a nickname ("White Sox") only counts if a single team ends with it
+    matches = [abbreviation for abbreviation, team_name in ABBR_TO_TEAM_NAME.items() if team_name.lower().endswith(' ' + lowered)]
+    return matches[0] if len(matches) == 1 else None
+
+def team_abbreviation(team_view):
+    # first field of the team object that names a known team
+    for field in TEAM_NAME_FIELDS:
+        abbreviation = normalize_team_abbreviation(team_view.get(field))
+        if abbreviation is not None:
+            return abbreviation
+    return None
+
+def convert_api_date_to_iso(date_str):
+
+    try:
+        # Remove weekday (e.g., 'Sunday, ') if it exists
+        if ',' in date_str:
+            date_str = date_str.split(',', 1)[1].strip()
+        
+        # Strip timezone string (e.g., remove "EDT")
+        date_str = re.sub(r'\s+[A-Z]{2,4}$', '', date_str).strip()
+
+        # Parse naive datetime (no timezone info)
+        dt_naive = datetime.strptime(date_str, "%B %d, %Y - %I:%M %p")
+
+        # Localize to US Eastern time
+        eastern = pytz.timezone("US/Eastern")
+        dt_localized = eastern.localize(dt_naive)
+
+        # Convert to UTC
+        dt_utc = dt_localized.astimezone(pytz.utc)
+
+        # Format to ISO string
+        return dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    except Exception as e:
+        print(f"Could not convert date: {date_str} — {e}")
+        return None
+    
+def extract_game_date(page_html):
+    try:
+        soup = BeautifulSoup(page_html, HTML_PARSER)
+        return find_game_date(soup)
+    except Exception as e:
+        print(f"Error extracting game date: {str(e)}")
+        return None
+
+def find_game_date(soup):
+    # Look for div with id="gameDate"
+    game_date_div = soup.find('div', id='gameDate')
+    if game_date_div:
+        date_text = game_date_div.get_text(strip=True)
+        return date_text
+    
+    # Extract from title tag as fallback
+    title_tag = soup.find('title')
+    if title_tag:
+        title_text = title_tag.get_text()
+        # Look for date pattern in title (e.g., "Sunday, July 13, 2025 - 4:10 PM EDT")
+        date_pattern = TITLE_DATE_PATTERN.search(title_text)
+        if date_pattern:
+            date_text = date_pattern.group(1)
+            return date_text
+    
+    print("Could not find game date")
+    return None
+
+def extract_opening_odds(page_html):
+    """
+    Reads the opening moneyline of a game from its line history page. The JSON state embedded in
+    the page is tried first, the HTML is only parsed (once) when that doesn't have the game, the
+    odds or teams that map to ABBR_TO_TEAM_NAME. Teams are returned as ABBR_TO_TEAM_NAME keys.
+
+    :param page_html: HTML of the line history page
+    :returns: Dictionary with game_date, away_team, away_odds, home_team, home_odds or None
+    """
+    opening_odds = extract_opening_odds_from_next_data(page_html)
+    if opening_odds is not None:
+        return opening_odds
+
+    return extract_opening_odds_from_html(page_html)
+
+def extract_opening_odds_from_next_data(page_html, sportsbook=SPORTSBOOK):
+    match = NEXT_DATA_PATTERN.search(page_html)
+    if not match:
+        return None
+
+    try:
+        next_data = json.loads(match.group(1))
+    except ValueError:
+        return None
+
+    game_view, odds_view, money_line_view = None, None, None
+    for path, node in walk_json(next_data):
+        if game_view is None and is_game_view(node):
+            game_view = node
+        if is_opening_odds_view(node, sportsbook):
+            # money line odds are preferred over any other market with an opener for the sportsbook
+            if 'money' in path.lower():
+                money_line_view = node
+            elif odds_view is None:
+                odds_view = node
+        if game_view is not None and money_line_view is not None:
+            break
+
+    odds_view = money_line_view or odds_view
+    if game_view is None or odds_view is None:
+        return None
+
+    try:
+        away_team = team_abbreviation(game_view['awayTeam'])
+        home_team = team_abbreviation(game_view['homeTeam'])
+        # a game that can't be matched to CurrentSchedule is left to the HTML parse
+        if away_team is None or home_team is None:
+            print(f"Unknown teams in page data: {game_view['awayTeam']} @ {game_view['homeTeam']}")
+            return None
+
+        opening_line = odds_view['openingLine']
+        return {
+            'game_date': convert_iso_date_to_utc(game_view['startDate']),
+            'away_team': away_team,
+            'away_odds': format_money_line(opening_line['awayOdds']),
+            'home_team': home_team,
+            'home_odds': format_money_line(opening_line['homeOdds'])
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def walk_json(node, path=''):
+    # yields (path, dict) for every object in the JSON, depth first
+    if isinstance(node, dict):
+        yield path, node
+        for key, value in node.items():
+            yield from walk_json(value, f"{path}/{key}")
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            yield from walk_json(value, f"{path}/{index}")
+
+def is_game_view(node):
+    return (
+        isinstance(node.get('homeTeam'), dict) and isinstance(node.get('awayTeam'), dict)
+        and any(field in node['homeTeam'] for field in TEAM_NAME_FIELDS)
+        and any(field in node['awayTeam'] for field in TEAM_NAME_FIELDS) and 'startDate' in node
+    )
+
+def is_opening_odds_view(node, sportsbook):
+    opening_line = node.get('openingLine')
+    if not isinstance(opening_line, dict) or sportsbook not in str(node.get('sportsbook', '')).lower():
+        return False
+
+    # moneylines are never between -100 and +100, which rules out spreads and totals given as points
+    try:
+        return all(abs(float(opening_line[side])) >= 100 for side in ('homeOdds', 'awayOdds'))
+    except (KeyError, TypeError, ValueError):
+        return False
+
+def format_money_line(odds):
+    odds = int(float(odds))
+    return f"+{odds}" if odds > 0 else str(odds)
+
+def convert_iso_date_to_utc(date_str):
+    dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+
+    # the site shows US Eastern times, assume those when no offset is given
+    if dt.tzinfo is None:
+        dt = pytz.timezone("US/Eastern").localize(dt)
+
+    return dt.astimezone(pytz.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def extract_opening_odds_from_html(page_html):
+    try:
+        soup = BeautifulSoup(page_html, HTML_PARSER)
+        
+        # Look for "Opener" text in the HTML (using 'string' instead of deprecated 'text')
+        opener_elements = soup.find_all(string=OPENER_PATTERN)
+        if not opener_elements:
+            print("Could not find 'Opener' text in the page")
+            return None
+        
+        # Find the parent container that contains the opener
+        opener_section = None
+        for opener_text in opener_elements:
+            parent = opener_text.parent
+            # Walk up the DOM to the container that holds the odds table, i.e. both teams,
+            # a header row with a bold label isn't enough
+            for _ in range(10):
+                if parent and len(find_teams(parent)) >= 2:
+                    opener_section = parent
+                    break
+                parent = parent.parent if parent else None
+            if opener_section:
+                break
+        
+        if not opener_section:
+            print("Could not locate opener section with both teams")
+            return None
+        
+        teams = find_teams(opener_section)
+        
+        away_team = teams[0]  # First team is typically away
+        home_team = teams[1]  # Second team is typically home
+        
+        # Find odds patterns (+/- followed by numbers)
+        section_text = opener_section.get_text()
+        odds_matches = ODDS_PATTERN.findall(section_text)
+        
+        if len(odds_matches) < 2:
+            print("Could not find sufficient odds data")
+            return None
+        
+        # Use the first two odds found (this worked in your test)
+        away_odds = odds_matches[0]
+        home_odds = odds_matches[1]
+
+        # same soup, the page isn't parsed a second time for the date
+        game_date = convert_api_date_to_iso(find_game_date(soup))
+        
+        opening_odds = {
+            'game_date': game_date,
+            'away_team': away_team,
+            'away_odds': away_odds,
+            'home_team': home_team,
+            'home_odds': home_odds
+        }
+        
+        return opening_odds
+        
+    except Exception as e:
+        print(f"Error extracting opening odds: {str(e)}")
+        return None
+
+def find_teams(section):
+    # team abbreviations in bold elements, only the ones that name a known team
+    teams = []
+    for bold_elem in section.find_all('b'):
+        team = normalize_team_abbreviation(bold_elem.get_text(strip=True))
+        if team is not None:
+            teams.append(team)
+    return teams
@@ -0,0 +1,194 @@
+import os
+import re
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+ODDS_BY_DATE_URL = "https://www.sportsbookreview.com/betting-odds/mlb-baseball/?date={date}"
+LINE_HISTORY_URL = "https://www.sportsbookreview.com/betting-odds/mlb-baseball/line-history/{game_id}/"
+
+GAME_LINK_PATTERN = re.compile(r'^/scores/mlb-baseball/matchup/(\d+)/$')
+NO_ODDS_TEXT = "No odds available at this time for this league"
+COOKIE_ACCEPT_BUTTON = '#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll'
+
+# pages (tabs) scraping at once, all in the same browser
+DEFAULT_POOL_SIZE = int(os.environ.get("ODDS_SCRAPER_POOL_SIZE", 4))
+
+# the odds are plain text in the page, none of this is needed to read them
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_URL_PATTERN = re.compile(
+    r"google-analytics|googletagmanager|doubleclick|googlesyndication|facebook|hotjar|segment\.(io|com)|"
+    r"scorecardresearch|quantserve|taboola|outbrain|amazon-adsystem|adnxs|criteo|newrelic|nr-data|sentry"
+)
+
+# ----------------------------- #
+#     CLASSES START HERE        #
+# ----------------------------- #
+
+class OddsScraperEngine:
+    """
+    One headless Chromium kept alive for a whole odds backfill, with a fixed pool of pages that
+    scrape dates and games concurrently. Images, fonts and analytics / ad requests are aborted
+    before they're sent, which is most of the page weight.
+
+    Usage (see runOddsJobs in odds/fetchBettingOdds.py, which queues every game as a job):
+        async with OddsScraperEngine(pool_size=4) as engine:
+            sportsbook_game_ids = await engine.fetchGameIds(date)
+            html = await engine.fetchGamePage(sportsbook_game_ids[0])
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, headless=True, block_resources=True):
+        """
+        :param pool_size: Number of pages loading at the same time
+        :param headless: Run Chromium without a window
+        :param block_resources: Abort image, font, media and tracking requests
+        """
+        self.pool_size = pool_size
+        self.headless = headless
+        self.block_resources = block_resources
+
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.pages = None
+
+    async def start(self):
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        self.context = await self.browser.new_context()
+
+        if self.block_resources:
+            await self.context.route("**/*", blockHeavyRequests)
+
+        self.pages = asyncio.Queue()
+        for _ in range(self.pool_size):
+            self.pages.put_nowait(await self.context.new_page())
+
+        logger.debug(f"Odds scraper started with {self.pool_size} pages")
+        return self
+
+    async def close(self):
+        if self.browser is not None:
+            await self.browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+        self.browser, self.playwright = None, None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @asynccontextmanager
+    async def page(self):
+        # waits for a free page, so at most pool_size navigations are ever in flight
+        page = await self.pages.get()
+        try:
+            yield page
+        finally:
+            self.pages.put_nowait(page)
+
+    async def fetchGameIds(self, date):
+        """
+        :param date: Game day as "YYYY-MM-DD"
+        :returns: List of sportsbookreview game ids listed for that day, empty if there are no odds
+        """
+        async with self.page() as page:
+            await page.goto(ODDS_BY_DATE_URL.format(date=date))
+            await acceptCookies(page)
+
+            if await page.get_by_text(NO_ODDS_TEXT).count():
+                print(f"No odds available for {date}")
+                return []
+
+            if await page.query_selector('#leagues') is None:
+                print("Error: Element with id 'leagues' not found!")
+                return []
+
+            hrefs = await page.eval_on_selector_all('#leagues a[href]', 'links => links.map(link => link.getAttribute("href"))')
+
+        game_ids = sorted({match.group(1) for match in map(GAME_LINK_PATTERN.match, hrefs) if match})
+        print(f"Saved {len(game_ids)} game hrefs for {date}")
+        return game_ids
+
+    async def fetchGamePage(self, game_id):
+        """
+        Opens the line history of a game on the money line tab with FanDuel selected.
+
+        :param game_id: sportsbookreview game id
+        :returns: HTML of the page
+        """
+        async with self.page() as page:
+            await page.goto(LINE_HISTORY_URL.format(game_id=game_id))
+            await clickMoneyLineTab(page)
+            await selectFanduelSportsbook(page)
+            return await page.content()
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+async def blockHeavyRequests(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_PATTERN.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def acceptCookies(page):
+    # the banner only shows up once per browser context, don't wait for it when it isn't there
+    button = page.locator(COOKIE_ACCEPT_BUTTON)
+    if await button.count():
+        try:
+            await button.click(timeout=5000)
+        except Exception:
+            print("Cookie banner not found or already accepted.")
+
+async def clickMoneyLineTab(page):
+    try:
+        await page.evaluate('''() => {
+            const moneyLineBtn = document.querySelector('li[data-format="money-line"]');
+            if (moneyLineBtn) {
+                moneyLineBtn.click();
+                return true;
+            }
+            return false;
+        }''')
+    except Exception:
+        print("Couldn't click on Money Line tab.")
+
+async def selectFanduelSportsbook(page):
+    fanduel_selected = False
+
+    try:
+        # Make sure dropdown is open
+        dropdown_button = await page.query_selector('button[data-toggle="dropdown"]')
+        if dropdown_button:
+            # Check if dropdown is already expanded
+            is_expanded = await dropdown_button.get_attribute('aria-expanded')
+            if is_expanded != 'true':
+                await dropdown_button.click(timeout=3000)
+                await page.wait_for_timeout(1000)
+
+        # Look for FanDuel logo in dropdown menu items
+        dropdown_items = await page.query_selector_all('ul.dropdown-menu li, ul.dropdown-menu a, ul.dropdown-menu button')
+
+        for item in dropdown_items:
+            fanduel_img = await item.query_selector('img[alt*="FanDuel"], img[src*="fanduel"], img[alt*="fanduel"]')
+            if fanduel_img:
+                await item.click()
+                fanduel_selected = True
+                break
+
+    except Exception as e:
+        print(f"Couldn't select fanduel odds: {str(e)}")
+
+    return fanduel_selected
@@ -1,7 +1,11 @@
 import requests
-import sqlite3
-from datetime import date, datetime
+import os
+from datetime import date, datetime, timedelta, timezone
 import logging 
+from scheduleUpdater.scheduleUpsert import scheduleGameRows, upsertSchedule, scheduleHasSeason
+from mlbApi.httpCache import HTTPCache
+from database.migrations import migrateScheduleTable, localToday
+from database.connection import connect
 
 logger = logging.getLogger(__name__)
 
@@ -23,84 +27,102 @@ CREATE_CURRENT_SCHEDULE_TABLE = """
         away_score INTEGER,
         status_code TEXT,
         venue_id INTEGER,
-        day_night TEXT
+        day_night TEXT,
+        local_game_date TEXT
     )
     """
 
-INSERT_INTO_CURRENT_SCHEDULE = """
-    INSERT OR IGNORE INTO CurrentSchedule (
-        game_id,
-        season,
-        game_type,
-        date_time,
-        home_team_id,
-        home_team,
-        away_team_id,
-        away_team,
-        home_score,
-        away_score,
-        status_code,
-        venue_id,
-        day_night
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+# when the whole season was last pulled and diffed, windowed refreshes only cover the days around today
+CREATE_SCHEDULE_REFRESH_LOG_TABLE = """
+    CREATE TABLE IF NOT EXISTS ScheduleRefreshLog (
+        season TEXT PRIMARY KEY,
+        last_full_refresh TEXT
+    )
+    """
+
+SELECT_LAST_FULL_REFRESH = """
+    SELECT last_full_refresh FROM ScheduleRefreshLog WHERE season = ?
     """
 
-UPDATE_CURRENT_SCHEDULE = """
-    UPDATE CurrentSchedule
-    SET
-        season = ?,
-        game_type = ?,
-        date_time = ?,
-        home_team_id = ?,
-        home_team = ?,
-        away_team_id = ?,
-        away_team = ?,
-        home_score = ?,
-        away_score = ?,
-        status_code = ?,
-        venue_id = ?,
-        day_night = ?
-    WHERE game_id = ?
+UPSERT_LAST_FULL_REFRESH = """
+    INSERT INTO ScheduleRefreshLog (season, last_full_refresh) VALUES (?, ?)
+    ON CONFLICT(season) DO UPDATE SET last_full_refresh = excluded.last_full_refresh
     """
 
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# days before and after today pulled by a windowed refresh, only those games can still change
+SCHEDULE_WINDOW_DAYS = int(os.environ.get("SCHEDULE_WINDOW_DAYS", 3))
+
+# how often the whole season is reconciled anyway (rescheduled games far out, missed days, ...)
+FULL_RECONCILIATION_HOURS = float(os.environ.get("SCHEDULE_FULL_RECONCILIATION_HOURS", 24))
+
 # ----------------------------- #
 #     FUNCTIONS START HERE      #
 # ----------------------------- #
 
-def fetchAndUpdateCurrentSchedule(season, base_url):
+def fetchAndUpdateCurrentSchedule(season, base_url, full_refresh=None, window_days=SCHEDULE_WINDOW_DAYS,
+                                  full_reconciliation_hours=FULL_RECONCILIATION_HOURS):
     """
     Fetches the current MLB schedule for a given season from the MLB API and updates the local SQLite database.
     It creates the CurrentSchedule table if it doesn't exist, inserts new games, and updates existing games if necessary.
 
+    By default only the games from window_days before to window_days after today are pulled,
+    and the whole season is pulled and diffed once every full_reconciliation_hours (or when
+    the season isn't in the table yet).
+
     :param season: Season year as a string (e.g., "2024")
     :param base_url: Base URL of the MLB API
-    :returns: None
+    :param full_refresh: True to pull the whole season, False for the window around today, None to decide from the last full refresh
+    :param window_days: Number of days before and after today a windowed refresh covers
+    :param full_reconciliation_hours: Hours between two full season refreshes
+    :returns: Dictionary with the number of inserted, updated and unchanged games, or None if the update failed
     """
     try:
 
-        conn = sqlite3.connect("databases/MLB_Betting.db")
+        conn = connect()
         cursor = conn.cursor()
 
         logger.debug("Creating CurrentSchedule table if it doesn't exist")
 
         createCurrentScheduleTable(cursor)
+        cursor.execute(CREATE_SCHEDULE_REFRESH_LOG_TABLE)
         
         cursor.execute("BEGIN TRANSACTION;")
 
-        logger.debug("Attempting to store current MLB schedule in DB")
+        if full_refresh is None:
+            full_refresh = needsFullRefresh(cursor, season, full_reconciliation_hours)
+
+        logger.debug(f"Attempting to store current MLB schedule in DB ({'full season' if full_refresh else f'{window_days} days around today'})")
         
         params = {
             "sportId": 1,               # MLB
             "season": season,   # Season
             "gameType": "R",            # Regular season
         }
+
+        # game days are US Eastern (see local_game_date), a late game on a UTC host is still today's
+        if not full_refresh:
+            today = date.fromisoformat(localToday())
+            params["startDate"] = (today - timedelta(days=window_days)).strftime("%Y-%m-%d")
+            params["endDate"] = (today + timedelta(days=window_days)).strftime("%Y-%m-%d")
         
-        all_season_dates = fetchCurrentScheduleFromAPI(base_url, params)
+        http_cache = HTTPCache()
+        all_season_dates, changed = fetchCurrentScheduleFromAPI(base_url, params, http_cache)
 
-        last_regular_season_day = all_season_dates[-1]["date"]
-        today_date = date.today().strftime("%Y-%m-%d")
+        # nothing to diff if the API returned the exact same window as last time,
+        # a full refresh always diffs since it's what reconciles the table
+        if not full_refresh and not changed:
+            logger.debug("Current MLB schedule unchanged since last fetch, skipping DB update")
+            conn.commit()
+            return {"inserted": 0, "updated": 0, "unchanged": len(scheduleGameRows(all_season_dates))}
+
+        if (full_refresh and all_season_dates):
+            last_regular_season_day = all_season_dates[-1]["date"]
+            today_date = localToday()
 
-        if (all_season_dates):
             if (today_date > last_regular_season_day):
                 # TODO: fetch the playoff games
                 logger.debug("Need to fetch playoff games")
@@ -108,53 +130,21 @@ def fetchAndUpdateCurrentSchedule(season, base_url):
                 logger.debug("Playoffs not starting yet")
 
 
-        entries_added = 0
-        entries_updated = 0
-        # iterate through each day
-        for day in all_season_dates:
-
-            # get all the games on that day
-            games = day.get("games", [])
-
-            for game in games:
-
-                home_team_score = game.get("teams", {}).get("home", {}).get("score", None)
-                away_team_score = game.get("teams", {}).get("away", {}).get("score", None)
-
-                game_data = (game["gamePk"], game["season"], game["gameType"], game["gameDate"], 
-                            game["teams"]["home"]["team"]["id"], game["teams"]["home"]["team"]["name"],
-                            game["teams"]["away"]["team"]["id"], game["teams"]["away"]["team"]["name"],
-                            home_team_score, away_team_score, game["status"]["detailedState"], 
-                            game["venue"]["id"], game["dayNight"])
-
-                # Check if entry with gamePk already exists in DB
-                cursor.execute(
-                    "SELECT * FROM CurrentSchedule WHERE game_id = ?",
-                    (game["gamePk"],)
-                )
+        # diff the whole payload against the DB in one pass instead of one SELECT per game
+        counts = upsertSchedule(cursor, "CurrentSchedule", scheduleGameRows(all_season_dates))
 
-                # get the fetched entry
-                fetched_entry = cursor.fetchone()
-
-                if fetched_entry:
-
-                    # skip if the entry wasn't updated in API
-                    if (fetched_entry == game_data):
-                        continue
-                    else:
-                        # update the current schedule table
-                        updateCurrentSchedule(game_data, cursor)
-
-                        entries_updated += 1
-
-                else:
-                    insertIntoCurrentSchedule(game_data, cursor)
-                    entries_added += 1
+        if full_refresh:
+            cursor.execute(UPSERT_LAST_FULL_REFRESH, (season, datetime.now(timezone.utc).isoformat()))
         
         conn.commit()
+        # only now the payload counts as stored, a rolled back upsert gets retried next run
+        http_cache.commit()
         logger.debug("Successfully stored and updated current MLB schedule in DB")
-        logger.debug(f"Added {entries_added} entries to current MLB schedule DB")
-        logger.debug(f"Updated {entries_updated} entries in current MLB schedule DB")
+        logger.debug(f"Added {counts['inserted']} entries to current MLB schedule DB")
+        logger.debug(f"Updated {counts['updated']} entries in current MLB schedule DB")
+        logger.debug(f"{counts['unchanged']} entries in current MLB schedule DB were already up to date")
+
+        return counts
     
     except requests.exceptions.HTTPError as http_err:
         logger.error(f"HTTP error occurred while fetching current MLB schedule API data: {http_err}")
@@ -165,6 +155,27 @@ def fetchAndUpdateCurrentSchedule(season, base_url):
     finally:
         conn.close()
 
+def needsFullRefresh(cursor, season, full_reconciliation_hours):
+    """
+    Whether the whole season should be pulled instead of the window around today: the season was
+    never stored, or the last full refresh is older than full_reconciliation_hours.
+
+    :param cursor: SQLite database cursor
+    :param season: Season year as a string (e.g., "2024")
+    :param full_reconciliation_hours: Hours between two full season refreshes
+    :returns: True if a full refresh is due
+    """
+    if not scheduleHasSeason(cursor, "CurrentSchedule", season):
+        return True
+
+    cursor.execute(SELECT_LAST_FULL_REFRESH, (season,))
+    row = cursor.fetchone()
+    if row is None:
+        return True
+
+    last_full_refresh = datetime.fromisoformat(row[0])
+    return datetime.now(timezone.utc) - last_full_refresh >= timedelta(hours=full_reconciliation_hours)
+
 def createCurrentScheduleTable(cursor):
     """
     Creates the CurrentSchedule table in the SQLite database if it does not already exist.
@@ -173,53 +184,25 @@ def createCurrentScheduleTable(cursor):
     :returns: None
     """
     cursor.execute(CREATE_CURRENT_SCHEDULE_TABLE)
+    migrateScheduleTable(cursor, "CurrentSchedule")
      
-def fetchCurrentScheduleFromAPI(base_url, params):
+def fetchCurrentScheduleFromAPI(base_url, params, http_cache=None):
     """
     Fetches the current MLB schedule data from the MLB API.
 
     :param base_url: Base URL of the MLB API
     :param params: Dictionary of parameters to send with the API request
-    :returns: List of daily schedules (each containing games and metadata) from the API response
+    :param http_cache: Optional HTTPCache to revalidate against instead of always downloading
+    :returns: Tuple of (list of daily schedules (each containing games and metadata) from the API response,
+              whether the schedule changed since the last fetch)
     """
+    if http_cache is not None:
+        endpoint_type = "schedule_window" if "startDate" in params else "schedule"
+        response = http_cache.get(base_url + "schedule", params=params, endpoint_type=endpoint_type)
+        return response.data.get("dates", []), response.changed
+
     response = requests.get(base_url + "schedule", params=params)
     data = response.json()
     all_season_dates = data.get("dates", [])
 
-    return all_season_dates
-
-def updateCurrentSchedule(game_data, cursor):
-    """
-    Updates an existing game entry in the CurrentSchedule table with new data.
-
-    :param game_data: Tuple containing game information to update
-    :param cursor: SQLite database cursor
-    :returns: None
-    """
-    updated_values = (
-        game_data[1],  # season
-        game_data[2],  # game_type
-        game_data[3],  # date_time
-        game_data[4],  # home_team_id
-        game_data[5],  # home_team
-        game_data[6],  # away_team_id
-        game_data[7],  # away_team
-        game_data[8],  # home_score
-        game_data[9],  # away_score
-        game_data[10], # status_code
-        game_data[11], # venue_id
-        game_data[12], # day_night
-        game_data[0]   # id for WHERE clause
-    )
-
-    cursor.execute(UPDATE_CURRENT_SCHEDULE, updated_values)
-
-def insertIntoCurrentSchedule(game_data, cursor):
-    """
-    Inserts a new game entry into the CurrentSchedule table.
-
-    :param game_data: Tuple containing game information to insert
-    :param cursor: SQLite database cursor
-    :returns: None
-    """
-    cursor.execute(INSERT_INTO_CURRENT_SCHEDULE, game_data)
\ No newline at end of file
+    return all_season_dates, True
@@ -1,7 +1,12 @@
 import requests
-import sqlite3
 from datetime import datetime
 import logging 
+from concurrent.futures import ThreadPoolExecutor
+from scheduleUpdater.scheduleUpsert import scheduleGameRows, upsertSchedule, scheduleHasSeason
+from featureEngineering.fetchBoxScores import createPooledSession
+from mlbApi.httpCache import HTTPCache
+from database.migrations import migrateScheduleTable
+from database.connection import connect
 
 logger = logging.getLogger(__name__)
 
@@ -23,184 +28,105 @@ CREATE_OLD_GAMES_TABLE = """
         away_score INTEGER,
         status_code TEXT,
         venue_id INTEGER,
-        day_night TEXT
+        day_night TEXT,
+        local_game_date TEXT
     )
     """
 
-UPDATE_OLD_GAMES = """
-    UPDATE OldGames
-    SET
-        season = ?,
-        game_type = ?,
-        date_time = ?,
-        home_team_id = ?,
-        home_team = ?,
-        away_team_id = ?,
-        away_team = ?,
-        home_score = ?,
-        away_score = ?,
-        status_code = ?,
-        venue_id = ?,
-        day_night = ?
-    WHERE game_id = ?
-    """
-
-INSERT_INTO_OLD_GAMES = """
-    INSERT OR IGNORE INTO OldGames (
-            game_id,
-            season,
-            game_type,
-            date_time,
-            home_team_id,
-            home_team,
-            away_team_id,
-            away_team,
-            home_score,
-            away_score,
-            status_code,
-            venue_id,
-            day_night
-            ) VALUES (
-            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-        );
-    """
-
 # ----------------------------- #
 #     FUNCTIONS START HERE      #
 # ----------------------------- #
 
-def fetchAndUpdateOldSeason(season, base_url):
-
+def fetchAndUpdateOldSeasons(seasons, base_url, max_workers=None):
     """
-    Fetches the full schedule for a specified MLB season from the API and stores or updates
-    the schedule data in the OldGames SQLite database table.
+    Loads several old seasons at once: every season's schedule is downloaded concurrently, then
+    all of them are written through a single connection in one transaction. A full rebuild takes
+    about as long as the slowest season download instead of the sum of all of them.
 
-    :param season: Season year as a string (e.g., "2015")
+    :param seasons: List of season years as strings (e.g., ["2015", "2016"])
     :param base_url: Base URL of the MLB API for requests
-    :return: None
+    :param max_workers: Number of seasons downloaded at the same time, defaults to one per season
+    :return: Dictionary mapping season -> inserted/updated/unchanged counts, or None if the update failed
     """
+    seasons = list(seasons)
+    if not seasons:
+        return {}
+    max_workers = max_workers or len(seasons)
 
     try:
 
-        conn = sqlite3.connect("databases/MLB_Betting.db")
+        conn = connect()
         cursor = conn.cursor()
- 
-        logger.debug("Creating OldGames table if it doesn't exist")
+
+        logger.debug(f"Fetching {len(seasons)} MLB season schedules with {max_workers} workers")
+
+        session = createPooledSession(max_workers)
+        http_cache = HTTPCache(session=session)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {season: executor.submit(fetchOldSeasonSchedule, http_cache, base_url, season) for season in seasons}
+                season_responses = {season: future.result() for season, future in futures.items()}
+        finally:
+            session.close()
 
         createOldGamesTable(cursor)
 
         cursor.execute("BEGIN TRANSACTION;")
 
-        logger.debug(f"Attempting to store {season} MLB schedule in DB")
-
-        params = {
-            "sportId": 1,               # MLB
-            "season": season,           # Season
-            "gameType": "R",            # Regular season
-        }
-        
-        response = requests.get(base_url + "schedule", params=params)
-        data = response.json()
-        all_season_dates = data.get("dates", [])
-
-        # TODO: eventually fetch playoff games from old seasons
-
-        entries_added = 0
-        entries_updated = 0
-        # iterate through each day
-        for day in all_season_dates:
-
-            # get all the games on that day
-            games = day.get("games", [])
-
-            for game in games:
-
-                home_team_score = game.get("teams", {}).get("home", {}).get("score", None)
-                away_team_score = game.get("teams", {}).get("away", {}).get("score", None)
-
-                game_data = (game["gamePk"], game["season"], game["gameType"], game["gameDate"], 
-                            game["teams"]["home"]["team"]["id"], game["teams"]["home"]["team"]["name"],
-                            game["teams"]["away"]["team"]["id"], game["teams"]["away"]["team"]["name"],
-                            home_team_score, away_team_score, game["status"]["detailedState"], 
-                            game["venue"]["id"], game["dayNight"])
-
-                # Check if entry with gamePk already exists in DB
-                cursor.execute(
-                    "SELECT * FROM OldGames WHERE game_id = ?",
-                    (game["gamePk"],)
-                )
-
-                fetched_entry = cursor.fetchone()
-
-                if fetched_entry:
-
-                    # skip if the entry wasn't updated in API
-                    if (fetched_entry == game_data):
-                        continue
-                    else:
-                    
-                        updateOldGamesTable(game_data, cursor)
-                        entries_updated += 1
-
-                else:
-                    insertIntoOldGamesTable(game_data, cursor)
-                    entries_added += 1
-        
+        season_counts = {}
+        for season, (all_season_dates, changed) in season_responses.items():
+            game_rows = scheduleGameRows(all_season_dates)
+
+            # a finished season whose payload didn't change since the last load has nothing to diff
+            if not changed and scheduleHasSeason(cursor, "OldGames", season):
+                season_counts[season] = {"inserted": 0, "updated": 0, "unchanged": len(game_rows)}
+                continue
+
+            season_counts[season] = upsertSchedule(cursor, "OldGames", game_rows)
+            logger.debug(f"{season} MLB schedule: {season_counts[season]}")
+
         conn.commit()
-        logger.debug(f"Successfully stored and updated {season} MLB schedule in DB")
-        logger.debug(f"Added {entries_added} entries to {season} MLB schedule DB")
-        logger.debug(f"Updated {entries_updated} entries in {season} MLB schedule DB")
-    
+        # only now the schedules count as stored, a rolled back upsert gets retried next run
+        http_cache.commit()
+        logger.debug(f"Successfully stored and updated {len(seasons)} MLB season schedules in DB")
+
+        return season_counts
+
     except requests.exceptions.HTTPError as http_err:
-        logger.error(f"HTTP error occurred while fetching {season} MLB schedule API data: {http_err}")
+        logger.error(f"HTTP error occurred while fetching old MLB schedules API data: {http_err}")
         conn.rollback()
     except Exception as e:
-        logger.error(f"Other error occurred while saving {season} MLB schedule to DB: {e}")
+        logger.error(f"Other error occurred while saving old MLB schedules to DB: {e}")
         conn.rollback()
     finally:
         conn.close()
-    
-def createOldGamesTable(cursor):
-    """
-    Creates the OldGames table in the SQLite database if it does not exist.
 
-    :param cursor: SQLite database cursor
-    :return: None
+def fetchOldSeasonSchedule(http_cache, base_url, season):
     """
-    cursor.execute(CREATE_OLD_GAMES_TABLE)
+    Downloads the regular season schedule of a single season, through the on-disk HTTP cache.
 
-def updateOldGamesTable(game_data, cursor):
+    :param http_cache: HTTPCache used for the request
+    :param base_url: Base URL of the MLB API for requests
+    :param season: Season year as a string (e.g., "2015")
+    :return: Tuple of (list of daily schedules from the API response, whether it changed since the last fetch)
     """
-    Updates an existing game record in OldGames with the provided data.
+    params = {
+        "sportId": 1,               # MLB
+        "season": season,           # Season
+        "gameType": "R",            # Regular season
+    }
 
-    :param game_data: Tuple containing game data corresponding to the OldGames schema
-    :param cursor: SQLite database cursor
-    :return: None
-    """
-    updated_values = (
-        game_data[1],  # season
-        game_data[2],  # game_type
-        game_data[3],  # date_time
-        game_data[4],  # home_team_id
-        game_data[5],  # home_team
-        game_data[6],  # away_team_id
-        game_data[7],  # away_team
-        game_data[8],  # home_score
-        game_data[9],  # away_score
-        game_data[10], # status_code
-        game_data[11], # venue_id
-        game_data[12], # day_night
-        game_data[0]   # id for WHERE clause
-    )
+    response = http_cache.get(base_url + "schedule", params=params, endpoint_type="schedule_old")
 
-    cursor.execute(UPDATE_OLD_GAMES, updated_values)
+    # TODO: eventually fetch playoff games from old seasons
+    return response.data.get("dates", []), response.changed
 
-def insertIntoOldGamesTable(game_data, cursor):
+def createOldGamesTable(cursor):
     """
-    Inserts a new game record into OldGames table.
+    Creates the OldGames table in the SQLite database if it does not exist.
 
-    :param game_data: Tuple containing game data corresponding to the OldGames schema
     :param cursor: SQLite database cursor
     :return: None
     """
-    cursor.execute(INSERT_INTO_OLD_GAMES, game_data)
\ No newline at end of file
+    cursor.execute(CREATE_OLD_GAMES_TABLE)
+    migrateScheduleTable(cursor, "OldGames")
@@ -0,0 +1,143 @@
+import logging
+from database.migrations import localGameDate
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------- #
+#       GLOBAL STATEMENTS       #
+# ----------------------------- #
+
+# OldGames and CurrentSchedule share the same layout
+SCHEDULE_COLUMNS = (
+    "game_id",
+    "season",
+    "game_type",
+    "date_time",
+    "home_team_id",
+    "home_team",
+    "away_team_id",
+    "away_team",
+    "home_score",
+    "away_score",
+    "status_code",
+    "venue_id",
+    "day_night",
+    "local_game_date"
+)
+
+# ----------------------------- #
+#        SQL STATEMENTS         #
+# ----------------------------- #
+
+SELECT_SCHEDULE_GAMES = """
+    SELECT {columns} FROM {table} WHERE game_id IN ({placeholders})
+    """
+
+# stays well under SQLite's limit on the number of host parameters
+SELECT_BATCH_SIZE = 500
+
+# only touches the row when something actually changed
+UPSERT_SCHEDULE = """
+    INSERT INTO {table} ({columns}) VALUES ({placeholders})
+    ON CONFLICT(game_id) DO UPDATE SET
+        {assignments}
+    WHERE ({current}) IS NOT ({excluded})
+    """
+
+# ----------------------------- #
+#     FUNCTIONS START HERE      #
+# ----------------------------- #
+
+def scheduleGameRows(all_season_dates):
+    """
+    Flattens the dates of a schedule API response into one tuple per game, in SCHEDULE_COLUMNS order.
+    A game that shows up on several dates (e.g. postponed) keeps its last entry, the same one the
+    row by row updates used to end up with.
+
+    :param all_season_dates: "dates" list of the MLB API schedule response
+    :returns: Dictionary mapping game id -> game data tuple
+    """
+    game_rows = {}
+    for day in all_season_dates:
+
+        # get all the games on that day
+        for game in day.get("games", []):
+
+            home_team_score = game.get("teams", {}).get("home", {}).get("score", None)
+            away_team_score = game.get("teams", {}).get("away", {}).get("score", None)
+
+            game_rows[game["gamePk"]] = (game["gamePk"], game["season"], game["gameType"], game["gameDate"],
+                        game["teams"]["home"]["team"]["id"], game["teams"]["home"]["team"]["name"],
+                        game["teams"]["away"]["team"]["id"], game["teams"]["away"]["team"]["name"],
+                        home_team_score, away_team_score, game["status"]["detailedState"],
+                        game["venue"]["id"], game["dayNight"], localGameDate(game["gameDate"]))
+
+    return game_rows
+
+def scheduleHasSeason(cursor, table, season):
+    # an unchanged API payload can only be skipped if it actually made it into the table before
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table} WHERE season = ?)", (season,))
+    return bool(cursor.fetchone()[0])
+
+def selectScheduleRows(cursor, table, game_ids):
+    """
+    Reads the stored rows of the given games, a few hundred ids per query. Only the games in the
+    payload are read, so a windowed refresh of a few dozen games costs a single small query.
+
+    :returns: Dictionary mapping game id -> stored row tuple
+    """
+    game_ids = list(game_ids)
+    existing_rows = {}
+    for start in range(0, len(game_ids), SELECT_BATCH_SIZE):
+        batch = game_ids[start:start + SELECT_BATCH_SIZE]
+        statement = SELECT_SCHEDULE_GAMES.format(
+            columns=", ".join(SCHEDULE_COLUMNS), table=table, placeholders=", ".join(["?"] * len(batch))
+        )
+        cursor.execute(statement, batch)
+        existing_rows.update((row[0], row) for row in cursor.fetchall())
+    return existing_rows
+
+def upsertScheduleStatement(table):
+    updated_columns = SCHEDULE_COLUMNS[1:]
+    return UPSERT_SCHEDULE.format(
+        table=table,
+        columns=", ".join(SCHEDULE_COLUMNS),
+        placeholders=", ".join(["?"] * len(SCHEDULE_COLUMNS)),
+        assignments=",\n        ".join(f"{column} = excluded.{column}" for column in updated_columns),
+        current=", ".join(f"{table}.{column}" for column in updated_columns),
+        excluded=", ".join(f"excluded.{column}" for column in updated_columns)
+    )
+
+def upsertSchedule(cursor, table, game_rows):
+    """
+    Writes a schedule into OldGames or CurrentSchedule in bulk. The stored rows of the games in
+    the payload are read once and diffed in memory, then only new and changed games are written
+    with a single executemany upsert.
+
+    :param cursor: SQLite database cursor
+    :param table: "OldGames" or "CurrentSchedule"
+    :param game_rows: Dictionary mapping game id -> game data tuple (see scheduleGameRows)
+    :returns: Dictionary with the number of inserted, updated and unchanged games
+    """
+    existing_rows = selectScheduleRows(cursor, table, game_rows.keys())
+
+    inserted, updated, changed_rows = 0, 0, []
+    for game_id, game_data in game_rows.items():
+        fetched_entry = existing_rows.get(game_id)
+
+        # skip if the entry wasn't updated in API
+        if fetched_entry == game_data:
+            continue
+
+        if fetched_entry is None:
+            inserted += 1
+        else:
+            updated += 1
+        changed_rows.append(game_data)
+
+    if changed_rows:
+        cursor.executemany(upsertScheduleStatement(table), changed_rows)
+
+    counts = {"inserted": inserted, "updated": updated, "unchanged": len(game_rows) - len(changed_rows)}
+    logger.debug(f"{table}: {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
@@ -1,6 +1,8 @@
 import requests
 import sqlite3
 import logging 
+from mlbApi.httpCache import HTTPCache
+from database.connection import connect
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,7 @@ def fetchMLBTeams(base_url):
     """
 
     try:
-        conn = sqlite3.connect("databases/MLB_Betting.db")
+        conn = connect()
         cursor = conn.cursor()
 
         logger.debug("Creating Teams table if it doesn't exist")
@@ -50,12 +52,20 @@ def fetchMLBTeams(base_url):
 
         cursor.execute("BEGIN TRANSACTION;")
 
-        mlb_teams = fetchTeamsFromAPI(base_url)
+        http_cache = HTTPCache()
+        mlb_teams, changed = fetchTeamsFromAPI(base_url, http_cache)
+
+        # teams barely ever change, skip the inserts if the payload is the same as last time
+        if not changed and cursor.execute("SELECT EXISTS (SELECT 1 FROM Teams)").fetchone()[0]:
+            logger.debug("MLB Teams unchanged since last fetch")
+            mlb_teams = []
 
         for mlb_team in mlb_teams:
             insertIntoTable(mlb_team, cursor)
 
         conn.commit()
+        # only now the teams count as stored, a rolled back insert gets retried next run
+        http_cache.commit()
         
         logger.debug("MLB Teams successfully initialized in DB")
 
@@ -92,16 +102,23 @@ def insertIntoTable(mlb_team, cursor):
     team_to_insert = (mlb_team["id"], mlb_team["name"], mlb_team["abbreviation"], mlb_team["shortName"])
     cursor.execute(INSERT_INTO_TEAMS, team_to_insert)
 
-def fetchTeamsFromAPI(base_url):
+def fetchTeamsFromAPI(base_url, http_cache=None):
     """
     Fetches the list of MLB teams from the MLB API.
 
     :param base_url: Base URL of the MLB API
-    :returns: List of dictionaries, each representing an MLB team filtered by sport name 'Major League Baseball'
+    :param http_cache: Optional HTTPCache to read the teams from instead of always downloading
+    :returns: Tuple of (list of dictionaries, each representing an MLB team filtered by sport name 'Major League Baseball',
+              whether the teams changed since the last fetch)
     """
-    response = requests.get(base_url + "teams")
-    data = response.json()
+    if http_cache is not None:
+        response = http_cache.get(base_url + "teams", endpoint_type="teams")
+        data, changed = response.data, response.changed
+    else:
+        response = requests.get(base_url + "teams")
+        data, changed = response.json(), True
+
     all_teams = data.get("teams")
     mlb_teams = [team for team in all_teams if team.get("sport", {}).get("name") == 'Major League Baseball']
 
-    return mlb_teams
\ No newline at end of file
+    return mlb_teams, changed
@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+# the pipeline imports its packages from src/, the same way main.py is run
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    Empty database in a temporary working directory, used by every connect() without a path.
+
+    :returns: Path of the database file
+    """
+    from database import connection
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CURRENT_SEASON", raising=False)
+    db_path = str(tmp_path / "MLB_Betting.db")
+    monkeypatch.setattr(connection, "DATABASE_PATH", db_path)
+    return db_path
@@ -0,0 +1,59 @@
+import json
+import sqlite3
+import pytest
+from benchmarking.syntheticSeasons import SyntheticLeague, writeSyntheticDatabase
+from featureEngineering.createFeatures import engineerFeatures
+
+SEASON = "2023"
+
+@pytest.fixture
+def league_database(database):
+    writeSyntheticDatabase(SyntheticLeague(num_teams=6, seasons=(SEASON,), games_per_team=40, seed=1), database)
+    return database
+
+def storedFeatures(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        store_columns = [row[1] for row in conn.execute("PRAGMA table_info(FeatureStore)")]
+        rolling_columns = [column for column in store_columns if column.startswith("rolling_")]
+        rolling_nulls = conn.execute(
+            f'SELECT COUNT(*) FROM FeatureStore WHERE "{rolling_columns[0]}" IS NULL'
+        ).fetchone()[0]
+        store = conn.execute(f'SELECT game_id, "{rolling_columns[0]}" FROM FeatureStore ORDER BY game_id').fetchall()
+        features = {game_id: json.loads(features_json) for game_id, features_json in conn.execute("SELECT * FROM Features")}
+    finally:
+        conn.close()
+    return store, rolling_nulls, features
+
+@pytest.mark.parametrize("batch_mode", [True, False])
+def test_switching_windows_and_back_restores_features(league_database, batch_mode):
+    def run(rolling_window_size):
+        engineerFeatures(rolling_window_size, base_url="http://unused", batch_mode=batch_mode, seasons=[SEASON])
+
+    run(5)
+    first_store, first_nulls, first_features = storedFeatures(league_database)
+    assert first_store and first_nulls == 0
+    assert all("rolling_home_avg_ops" in features for features in first_features.values())
+
+    run([3, 5])
+    _, _, multi_features = storedFeatures(league_database)
+    assert all("rolling5_home_avg_ops" in features and "rolling_home_avg_ops" not in features
+               for features in multi_features.values())
+
+    # the checkpoint of the single window is still intact, but the rows aren't its own anymore
+    run(5)
+    store, nulls, features = storedFeatures(league_database)
+    assert nulls == 0
+    assert store == first_store
+    assert features == first_features
+
+def test_unchanged_window_skips_finished_season(league_database):
+    engineerFeatures(5, base_url="http://unused", seasons=[SEASON])
+    conn = sqlite3.connect(league_database)
+    generation = conn.execute("SELECT value FROM FeatureStoreMeta WHERE key = 'generation'").fetchone()[0]
+    conn.close()
+
+    engineerFeatures(5, base_url="http://unused", seasons=[SEASON])
+    conn = sqlite3.connect(league_database)
+    assert conn.execute("SELECT value FROM FeatureStoreMeta WHERE key = 'generation'").fetchone()[0] == generation
+    conn.close()
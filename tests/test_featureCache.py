@@ -0,0 +1,37 @@
+import os
+import json
+import sqlite3
+import numpy as np
+import pandas as pd
+from benchmarking.syntheticSeasons import SyntheticLeague, writeSyntheticDatabase
+from featureEngineering.createFeatures import engineerFeatures
+from modelDevelopment.utils import featureCache
+from modelDevelopment.utils.featureCache import loadFeatureMatrix
+from modelDevelopment.utils.featureExtraction import buildFeatures
+
+REPOSITORY = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def test_default_cache_dir_is_the_repository_databases(database):
+    # the database fixture runs the test from a temporary directory
+    assert os.getcwd() != REPOSITORY
+    assert featureCache.DEFAULT_CACHE_DIR == os.path.join(REPOSITORY, "databases", "feature_cache")
+
+def test_cached_matrix_matches_the_json_features(database, tmp_path):
+    writeSyntheticDatabase(SyntheticLeague(num_teams=6, seasons=("2023",), games_per_team=30, seed=2), database)
+    engineerFeatures(5, base_url="http://unused", seasons=["2023"])
+
+    conn = sqlite3.connect(database)
+    try:
+        feature_matrix = loadFeatureMatrix(conn, "diff", cache_dir=str(tmp_path / "feature_cache"))
+        df = pd.read_sql_query("SELECT game_id, features_json FROM Features ORDER BY game_id", conn)
+    finally:
+        conn.close()
+
+    # what the training notebook built from the JSON blobs before it read the cache
+    df["features_json"] = df["features_json"].apply(json.loads)
+    X_json, y_json, feature_names = buildFeatures(df, method="diff")
+
+    rows = feature_matrix.rows(df["game_id"])
+    assert feature_matrix.feature_names == feature_names
+    np.testing.assert_allclose(np.asarray(feature_matrix.X)[rows], X_json.to_numpy(dtype=np.float32), rtol=1e-5, atol=1e-6)
+    assert (feature_matrix.labels[rows] == y_json.to_numpy()).all()
@@ -0,0 +1,31 @@
+import sqlite3
+import pytest
+from featureEngineering import featureStore
+from featureEngineering.featureStore import createFeatureStoreTable, ensureFeatureStoreColumns, featureStoreRow, exportFeatureStore
+
+def createStore():
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    createFeatureStoreTable(cursor)
+    features = {"home_team_id": 147, "season_home_avg_runs": 4.5, "away_team_id": 111, "season_away_avg_runs": 3.25, "label": 1}
+    ensureFeatureStoreColumns(cursor, list(features))
+    cursor.execute(*featureStoreRow(777001, features))
+    conn.commit()
+    return conn
+
+def test_export_needs_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setattr(featureStore, "HAS_PYARROW", False)
+
+    with pytest.raises(ImportError):
+        exportFeatureStore(createStore(), tmp_path / "features.parquet")
+
+def test_export_writes_float32_features(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pandas as pd
+
+    exportFeatureStore(createStore(), tmp_path / "features.parquet")
+    df = pd.read_parquet(tmp_path / "features.parquet")
+
+    assert df["game_id"].tolist() == [777001]
+    assert str(df["season_home_avg_runs"].dtype) == "float32"
+    assert df["label"].tolist() == [1]
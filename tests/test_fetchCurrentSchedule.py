@@ -0,0 +1,17 @@
+from scheduleUpdater import fetchCurrentSchedule
+
+def test_window_is_centred_on_the_eastern_game_day(database, monkeypatch):
+    requested = []
+
+    def fetchCurrentScheduleFromAPI(base_url, params, http_cache=None):
+        requested.append(params)
+        return [], True
+
+    # 01:30 UTC on July 2nd, still July 1st in New York
+    monkeypatch.setattr(fetchCurrentSchedule, "localToday", lambda: "2025-07-01")
+    monkeypatch.setattr(fetchCurrentSchedule, "fetchCurrentScheduleFromAPI", fetchCurrentScheduleFromAPI)
+
+    fetchCurrentSchedule.fetchAndUpdateCurrentSchedule("2025", "http://unused/", full_refresh=False, window_days=3)
+
+    assert requested[0]["startDate"] == "2025-06-28"
+    assert requested[0]["endDate"] == "2025-07-04"
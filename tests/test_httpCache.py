@@ -0,0 +1,56 @@
+import sqlite3
+import pytest
+from benchmarking.apiFixtures import FixtureStore
+from benchmarking.replayServer import ReplayServer
+from benchmarking.syntheticSeasons import SyntheticLeague, writeSyntheticFixtures
+from mlbApi.httpCache import HTTPCache, ENDPOINT_TTLS
+from scheduleUpdater import fetchOldSeasons
+
+SEASONS = ["2022", "2023"]
+
+@pytest.fixture
+def replay_server(database, tmp_path):
+    fixtures = FixtureStore(str(tmp_path / "mlb_api.zip"))
+    writeSyntheticFixtures(SyntheticLeague(num_teams=4, seasons=SEASONS, games_per_team=6, seed=3), fixtures)
+    server = ReplayServer(FixtureStore(fixtures.path)).start()
+    yield server
+    server.stop()
+
+def test_payload_is_changed_until_committed(replay_server, tmp_path):
+    http_cache = HTTPCache(str(tmp_path / "http_cache"))
+    params = {"sportId": 1, "season": SEASONS[0], "gameType": "R"}
+
+    assert http_cache.get(replay_server.base_url + "schedule", params=params, endpoint_type="schedule_old").changed
+    # still fresh and never committed
+    assert http_cache.get(replay_server.base_url + "schedule", params=params, endpoint_type="schedule_old").changed
+
+    http_cache.commit()
+    response = http_cache.get(replay_server.base_url + "schedule", params=params, endpoint_type="schedule_old")
+    assert not response.changed and response.from_cache
+
+def test_rolled_back_schedule_change_is_retried(replay_server, database, tmp_path, monkeypatch):
+    base_url = replay_server.base_url
+    assert fetchOldSeasons.fetchAndUpdateOldSeasons(SEASONS, base_url) is not None
+
+    # the API starts answering with different results for the same games, and the next load rolls back
+    changed_fixtures = FixtureStore(str(tmp_path / "changed_api.zip"))
+    writeSyntheticFixtures(SyntheticLeague(num_teams=4, seasons=SEASONS, games_per_team=6, seed=4), changed_fixtures)
+    replay_server.fixtures = FixtureStore(changed_fixtures.path)
+    monkeypatch.setitem(ENDPOINT_TTLS, "schedule_old", 0)
+
+    upsertSchedule = fetchOldSeasons.upsertSchedule
+
+    def failingUpsert(cursor, table, game_rows):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(fetchOldSeasons, "upsertSchedule", failingUpsert)
+    assert fetchOldSeasons.fetchAndUpdateOldSeasons(SEASONS, base_url) is None
+
+    # both seasons are already in OldGames, only the payload hash can tell the update never landed
+    monkeypatch.setattr(fetchOldSeasons, "upsertSchedule", upsertSchedule)
+    counts = fetchOldSeasons.fetchAndUpdateOldSeasons(SEASONS, base_url)
+    assert all(season_counts["updated"] > 0 for season_counts in counts.values())
+
+    # once stored, the same payloads skip the upsert
+    counts = fetchOldSeasons.fetchAndUpdateOldSeasons(SEASONS, base_url)
+    assert all(season_counts["inserted"] == season_counts["updated"] == 0 for season_counts in counts.values())
@@ -0,0 +1,36 @@
+import sqlite3
+from odds.oddsJobQueue import (createOddsJobTables, enqueueDate, selectRunnableJobs, finishJob, requeueMissingOdds,
+                               JOB_DONE, JOB_UNMATCHED)
+from odds.oddsTable import createOddsTable
+
+def createQueue():
+    cursor = sqlite3.connect(":memory:").cursor()
+    createOddsTable(cursor)
+    createOddsJobTables(cursor)
+    enqueueDate(cursor, "2025-07-13", ["1001", "1002"])
+    return cursor
+
+def test_unmatched_games_are_retried_on_the_next_run_until_out_of_attempts():
+    cursor = createQueue()
+    finishJob(cursor, "2025-07-13", "1002", JOB_DONE, 777002)
+    cursor.execute("INSERT INTO Odds (game_id) VALUES (777002)")
+
+    for _ in range(2):
+        finishJob(cursor, "2025-07-13", "1001", JOB_UNMATCHED)
+        # not again within the same run
+        assert selectRunnableJobs(cursor, ["2025-07-13"], max_attempts=2) == []
+
+        requeueMissingOdds(cursor, max_attempts=2)
+        runnable = selectRunnableJobs(cursor, ["2025-07-13"], max_attempts=2)
+
+    # scraped twice, left unmatched for good
+    assert runnable == []
+    cursor.execute("SELECT status, attempts FROM OddsScrapeJobs WHERE sportsbook_game_id = '1001'")
+    assert cursor.fetchone() == (JOB_UNMATCHED, 2)
+
+def test_unmatched_game_is_requeued_once():
+    cursor = createQueue()
+    finishJob(cursor, "2025-07-13", "1001", JOB_UNMATCHED)
+
+    assert requeueMissingOdds(cursor) == 1
+    assert selectRunnableJobs(cursor, ["2025-07-13"]) == [("2025-07-13", "1001"), ("2025-07-13", "1002")]
@@ -0,0 +1,71 @@
+import os
+import json
+import sqlite3
+import pytest
+from odds.openingOddsParser import extract_opening_odds, extract_opening_odds_from_next_data, normalize_team_abbreviation, ABBR_TO_TEAM_NAME
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "odds")
+
+# hand-built pages after the site's layout, not recorded ones (see --save-page in fetchBettingOdds),
+# each with the extract_opening_odds result it should give next to it
+PAGES = sorted(name[:-len(".html")] for name in os.listdir(FIXTURES) if name.endswith(".html"))
+
+def readFixture(name, extension):
+    with open(os.path.join(FIXTURES, name + extension), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("page", PAGES)
+def test_hand_built_pages_give_the_opening_moneyline(page):
+    opening_odds = extract_opening_odds(readFixture(page, ".html"))
+
+    assert opening_odds == json.loads(readFixture(page, ".json"))
+    # the teams are what saveOddsToDB looks the game up with
+    assert opening_odds["away_team"] in ABBR_TO_TEAM_NAME
+    assert opening_odds["home_team"] in ABBR_TO_TEAM_NAME
+
+def test_page_without_the_game_in_its_state_falls_back_to_the_html():
+    html = readFixture("html_opener_fallback", ".html")
+
+    assert extract_opening_odds_from_next_data(html) is None
+    assert extract_opening_odds(html) is not None
+
+def test_unknown_teams_in_the_state_fall_back_to_the_html():
+    html = readFixture("next_data_moneyline", ".html").replace('"ARI"', '"XXX"').replace("Arizona Diamondbacks", "Nowhere").replace('"Diamondbacks"', '"Nobodies"')
+
+    assert extract_opening_odds_from_next_data(html) is None
+
+@pytest.mark.parametrize("team, abbreviation", [
+    ("NYY", "NYY"),
+    ("ari", "AZ"),
+    ("CWS", "CHW"),
+    ("WSH", "WAS"),
+    ("OAK", "ATH"),
+    ("Chicago White Sox", "CHW"),
+    ("Red Sox", "BOS"),
+    ("Sox", None),
+    ("TIME", None),
+    ("", None),
+    (None, None),
+])
+def test_normalize_team_abbreviation(team, abbreviation):
+    assert normalize_team_abbreviation(team) == abbreviation
+
+def test_scraped_game_is_matched_in_the_schedule():
+    # fetchBettingOdds needs Playwright for the scraper
+    pytest.importorskip("playwright")
+    from odds.fetchBettingOdds import insertGameOdds
+    from odds.oddsTable import createOddsTable
+    from scheduleUpdater.fetchCurrentSchedule import createCurrentScheduleTable
+
+    conn = sqlite3.connect(":memory:")
+    cursor = conn.cursor()
+    createOddsTable(cursor)
+    createCurrentScheduleTable(cursor)
+    cursor.execute(
+        "INSERT INTO CurrentSchedule (game_id, date_time, home_team, away_team) VALUES (?, ?, ?, ?)",
+        (777001, "2025-07-13T18:10:00Z", "Chicago White Sox", "Arizona Diamondbacks")
+    )
+
+    opening_odds = extract_opening_odds(readFixture("next_data_moneyline", ".html"))
+
+    assert insertGameOdds(cursor, opening_odds) == 777001
@@ -0,0 +1,68 @@
+import os
+import sys
+import types
+import sqlite3
+import pandas as pd
+import pytest
+from benchmarking.syntheticSeasons import SyntheticLeague, writeSyntheticDatabase
+from modelDevelopment.evaluating import sweepStrategies
+
+@pytest.fixture
+def scored_seasons(database, tmp_path, monkeypatch):
+    writeSyntheticDatabase(SyntheticLeague(num_teams=4, seasons=("2025",), games_per_team=10, seed=2), database, current_season="2025")
+    conn = sqlite3.connect(database)
+    conn.execute("CREATE TABLE FeatureStore (game_id INTEGER PRIMARY KEY, schema_version INTEGER)")
+    conn.commit()
+    conn.close()
+
+    # stands in for the trained model, counts how often the season gets scored
+    calls = []
+
+    def scoreCurrentSeason(model_name, feature_method):
+        calls.append(model_name)
+        conn = sqlite3.connect(database)
+        df = pd.read_sql_query("""
+            SELECT O.game_id, O.home_team_odds, O.away_team_odds, C.home_score, C.away_score
+            FROM Odds AS O INNER JOIN CurrentSchedule AS C ON O.game_id = C.game_id
+        """, conn)
+        conn.close()
+        df["home_proba"], df["away_proba"] = 0.5, 0.5
+        return df
+
+    monkeypatch.setitem(sys.modules, "modelDevelopment.evaluating.testOnCurrentSeason",
+                        types.SimpleNamespace(scoreCurrentSeason=scoreCurrentSeason))
+    monkeypatch.setattr(sweepStrategies, "PROBABILITY_CACHE_DIR", str(tmp_path / "probabilities"))
+    return database, calls
+
+def test_cached_probabilities_follow_odds_changes(scored_seasons):
+    database, calls = scored_seasons
+
+    first = sweepStrategies.loadSeasonProbabilities("model", "diff")
+    sweepStrategies.loadSeasonProbabilities("model", "diff")
+    assert len(calls) == 1
+
+    conn = sqlite3.connect(database)
+    game_id = conn.execute("SELECT game_id FROM Odds ORDER BY game_id LIMIT 1").fetchone()[0]
+    conn.execute("UPDATE Odds SET home_team_odds = '+999' WHERE game_id = ?", (game_id,))
+    conn.commit()
+    conn.close()
+
+    corrected = sweepStrategies.loadSeasonProbabilities("model", "diff")
+    assert len(calls) == 2
+    assert corrected["home_odds"][list(corrected["game_id"]).index(game_id)] == 999
+    assert len(corrected["game_id"]) == len(first["game_id"])
+
+def test_retraining_deep_mlp_keeps_the_mlp_cache(database):
+    # the database fixture runs the test from a temporary directory, relative model paths land there
+    os.makedirs("training/model_files")
+    for name in ("mlp_model_diff.pt", "feature_names_diff.pkl", "scaler_diff.pkl"):
+        open(f"training/model_files/{name}", "w").close()
+        os.utime(f"training/model_files/{name}", (1000, 1000))
+    mlp_mtime = sweepStrategies.modelFilesMTime("mlp", "diff")
+
+    open("training/model_files/deep_mlp_model_diff.pt", "w").close()
+    os.utime("training/model_files/deep_mlp_model_diff.pt", (2000, 2000))
+
+    assert mlp_mtime == 1000
+    assert sweepStrategies.modelFilesMTime("mlp", "diff") == 1000
+    assert sweepStrategies.modelFilesMTime("deep_mlp", "diff") == 2000